@@ -4,11 +4,12 @@ Main build orchestrator for Nxtscape Browser
 """
 
 import os
+import subprocess
 import sys
 import time
 import click
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 
 # Load .env file if it exists
@@ -36,21 +37,50 @@ from utils import (
     log_warning,
     log_error,
     log_success,
+    log_event,
+    start_log_rotation,
+    install_signal_handlers,
     IS_MACOS,
     IS_WINDOWS,
     IS_LINUX,
+    join_paths,
 )
 
 # Import modules
-from modules.clean import clean
+from modules.clean import (
+    clean,
+    clean_stale_outputs,
+    record_touched_paths,
+    CLEAN_MODES,
+)
+from modules.trash import collect_trash, remove_tree
 from modules.git import setup_git, setup_sparkle
-from modules.patches import apply_patches
-from modules.resources import copy_resources
-from modules.chromium_replace import replace_chromium_files, add_file_to_replacements
-from modules.string_replaces import apply_string_replacements
+from modules.patches import apply_patches, get_patch_fingerprint_paths, NEW_PATCHING
+from modules.resources import copy_resources, get_copy_fingerprint
+from modules.chromium_replace import (
+    replace_chromium_files,
+    add_file_to_replacements,
+    get_replacement_pairs,
+)
+from modules.string_replaces import (
+    apply_string_replacements,
+    get_target_paths,
+    get_replacement_table_digest,
+)
 from modules.inject import inject_version
-from modules.configure import configure
-from modules.compile import build
+from modules.configure import configure, get_flags_file, get_gn_args_digest
+from modules.fingerprint import get_fingerprint_store
+from modules.pipeline import Pipeline, Step
+from modules.journal import BuildJournal, JOURNAL_FILE
+from modules.compile import build, write_version_file
+from modules.artifact_store import ArtifactStore, load_artifact_store
+from modules.progress import set_verbose
+from modules.build_logs import logs_command
+from modules.compiler_cache import (
+    CompilerCache,
+    load_compiler_cache,
+    setup_compiler_cache,
+)
 from modules.gcs import upload_package_artifacts, upload_signed_artifacts, handle_upload_dist
 
 # Platform-specific imports
@@ -116,6 +146,477 @@ from modules.slack import (
 )
 
 
+def _notify_step(enabled: bool, message: str) -> None:
+    """Send a Slack build step notification if enabled"""
+    if enabled:
+        notify_build_step(message)
+
+
+def _package_type() -> str:
+    """Human readable package type for notifications"""
+    return "DMG" if IS_MACOS else "installer" if IS_WINDOWS else "AppImage"
+
+
+# Source preparation steps that every configure step waits for
+PREPARE_STEPS = ["replace", "strings", "sparkle", "patches", "resources"]
+PREPARE_WORKERS = 4
+
+
+def _package_artifacts(
+    ctx: BuildContext, architecture: Optional[str] = None
+) -> List[Path]:
+    """Packages in dist/<version> built for an architecture (default: ctx's)"""
+    dist_dir = ctx.get_dist_dir()
+    if not dist_dir.exists():
+        return []
+    architecture = architecture or ctx.architecture
+    arch_tokens = {
+        "x64": ("x64", "x86_64", "amd64"),
+        "arm64": ("arm64", "aarch64"),
+    }.get(architecture, (architecture,))
+    return [
+        path
+        for path in dist_dir.iterdir()
+        if path.suffix in (".dmg", ".exe", ".zip", ".AppImage", ".deb")
+        and any(token in path.name for token in arch_tokens)
+    ]
+
+
+def create_build_pipeline(
+    contexts: List[BuildContext],
+    clean_flag: bool,
+    git_setup_flag: bool,
+    apply_patches_flag: bool,
+    build_flag: bool,
+    sign_flag: bool,
+    package_flag: bool,
+    upload_gcs: bool,
+    gn_flags_file: Optional[Path],
+    certificate_name: Optional[str],
+    slack_notifications: bool,
+    patch_interactive: bool,
+    patch_commit: bool,
+    all_gcs_uris: List[str],
+    force: bool = False,
+    resume: bool = False,
+    targeted_build: bool = False,
+    compiler_cache: Optional[CompilerCache] = None,
+    artifact_store: Optional[ArtifactStore] = None,
+    clean_mode: str = "full",
+    universal: bool = False,
+) -> Pipeline:
+    """Express the build as a DAG of fingerprinted steps
+
+    Source preparation runs once against the first context; configure,
+    compile, sign, package and upload run per architecture. Each stage runs
+    for one architecture at a time, but different stages overlap: arch N is
+    signed, packaged and uploaded while arch N+1 compiles. A universal
+    build merges, signs, packages and uploads once every arch is done.
+    Completed steps are written to dist/<version>/build_journal.json so --resume can pick
+    up from the first incomplete step.
+    """
+    ctx = contexts[0]
+    architectures = [c.architecture for c in contexts]
+    notify = slack_notifications
+    build_key = {
+        "chromium_version": ctx.chromium_version,
+        "nxtscape_version": ctx.nxtscape_version,
+        "build_type": ctx.build_type,
+        "architectures": architectures,
+        "steps": [
+            clean_flag,
+            git_setup_flag,
+            apply_patches_flag,
+            build_flag,
+            sign_flag,
+            package_flag,
+            upload_gcs,
+            universal,
+        ],
+    }
+    journal = BuildJournal(ctx.get_dist_dir() / JOURNAL_FILE, build_key, resume)
+    pipeline = Pipeline(
+        get_fingerprint_store(ctx),
+        force=force,
+        journal=journal,
+        max_workers=max(PREPARE_WORKERS, len(contexts)),
+    )
+
+    def run_clean():
+        clean(ctx, mode=clean_mode)
+        _notify_step(notify, "Completed cleaning build artifacts")
+
+    def run_git_setup():
+        setup_git(ctx)
+        _notify_step(notify, "Completed Git setup and Chromium source")
+
+    def run_patches():
+        apply_patches(ctx, interactive=patch_interactive, commit_each=patch_commit)
+
+    def run_resources():
+        # Fails the step, so nothing is built from a half-copied tree
+        if not copy_resources(
+            ctx, commit_each=patch_commit, architectures=architectures
+        ):
+            return False
+        _notify_step(notify, "Completed applying patches and copying resources")
+
+    pipeline.add(Step("clean", run_clean, enabled=clean_flag))
+    pipeline.add(
+        Step("git_setup", run_git_setup, deps=["clean"], enabled=git_setup_flag)
+    )
+    # Source preparation steps declare the paths they write so that those
+    # with disjoint write sets run concurrently; overlapping ones keep this
+    # registration order. Committing steps also write the git index.
+    git_dir = [join_paths(ctx.chromium_src, ".git")] if patch_commit else []
+    pipeline.add(
+        Step(
+            "replace",
+            lambda: replace_chromium_files(ctx),
+            deps=["git_setup"],
+            inputs=lambda: [src for src, _ in get_replacement_pairs(ctx)],
+            outputs=lambda: [dst for _, dst in get_replacement_pairs(ctx)],
+            extra=ctx.build_type,
+            enabled=apply_patches_flag,
+            writes=lambda: [dst for _, dst in get_replacement_pairs(ctx)],
+            group_output=True,
+        )
+    )
+    # Targets are rewritten in place, so their recorded hashes double as the
+    # inputs: if they still match, the replacements are already applied
+    pipeline.add(
+        Step(
+            "strings",
+            lambda: apply_string_replacements(ctx),
+            deps=["git_setup"],
+            outputs=lambda: get_target_paths(ctx),
+            extra=get_replacement_table_digest(),
+            enabled=apply_patches_flag,
+            writes=lambda: get_target_paths(ctx),
+            group_output=True,
+        )
+    )
+    pipeline.add(
+        Step(
+            "sparkle",
+            lambda: setup_sparkle(ctx),
+            deps=["git_setup"],
+            enabled=apply_patches_flag and IS_MACOS,
+            writes=lambda: [ctx.get_sparkle_dir()],
+            group_output=True,
+        )
+    )
+
+    # Interactive runs may skip patches, so their outputs can't be trusted.
+    # They also prompt on the console, so they write the whole checkout
+    # (running alone) and stream their output.
+    patches_step = Step(
+        "patches",
+        run_patches,
+        deps=["git_setup"],
+        enabled=apply_patches_flag,
+        writes=lambda: [ctx.chromium_src],
+    )
+    if NEW_PATCHING and not patch_interactive:
+        patches_step.inputs = lambda: get_patch_fingerprint_paths(ctx)[0]
+        patches_step.outputs = lambda: get_patch_fingerprint_paths(ctx)[1]
+        patches_step.writes = lambda: get_patch_fingerprint_paths(ctx)[1] + git_dir
+        patches_step.group_output = True
+    pipeline.add(patches_step)
+
+    pipeline.add(
+        Step(
+            "resources",
+            run_resources,
+            deps=["git_setup"],
+            inputs=lambda: get_copy_fingerprint(ctx, architectures)[0],
+            outputs=lambda: get_copy_fingerprint(ctx, architectures)[1],
+            extra=f"{ctx.build_type}|{','.join(architectures)}",
+            enabled=apply_patches_flag,
+            writes=lambda: get_copy_fingerprint(ctx, architectures)[1] + git_dir,
+            group_output=True,
+        )
+    )
+
+    previous_arch = None
+    for arch_ctx in contexts:
+        add_architecture_steps(
+            pipeline,
+            arch_ctx,
+            previous_arch=previous_arch,
+            build_flag=build_flag,
+            sign_flag=sign_flag,
+            package_flag=package_flag,
+            upload_gcs=upload_gcs,
+            gn_flags_file=gn_flags_file,
+            certificate_name=certificate_name,
+            slack_notifications=slack_notifications,
+            all_gcs_uris=all_gcs_uris,
+            targeted_build=targeted_build,
+            compiler_cache=compiler_cache,
+            artifact_store=artifact_store,
+            clean_stale=clean_flag and clean_mode == "stale",
+        )
+        previous_arch = arch_ctx.architecture
+
+    if universal and len(contexts) > 1:
+        add_universal_steps(
+            pipeline,
+            contexts,
+            sign_flag=sign_flag,
+            package_flag=package_flag,
+            upload_gcs=upload_gcs,
+            slack_notifications=slack_notifications,
+            all_gcs_uris=all_gcs_uris,
+        )
+
+    return pipeline
+
+
+def add_architecture_steps(
+    pipeline: Pipeline,
+    ctx: BuildContext,
+    previous_arch: Optional[str],
+    build_flag: bool,
+    sign_flag: bool,
+    package_flag: bool,
+    upload_gcs: bool,
+    gn_flags_file: Optional[Path],
+    certificate_name: Optional[str],
+    slack_notifications: bool,
+    all_gcs_uris: List[str],
+    targeted_build: bool = False,
+    compiler_cache: Optional[CompilerCache] = None,
+    artifact_store: Optional[ArtifactStore] = None,
+    clean_stale: bool = False,
+) -> None:
+    """Add configure, compile, sign, package and upload steps for one arch
+
+    Each stage waits for the same stage of previous_arch, so two compiles
+    (or two notarizations) never compete for the machine.
+    """
+    arch = ctx.architecture
+    notify = slack_notifications
+
+    def after(stage: str) -> List[str]:
+        return [f"{stage}[{previous_arch}]"] if previous_arch else []
+
+    def run_compile():
+        _notify_step(notify, f"Started building for {arch}")
+        # Targeted builds leave out chromedriver, so they are never stored
+        key = None
+        if artifact_store and not targeted_build:
+            write_version_file(ctx)
+            try:
+                key = artifact_store.key(ctx)
+            except (subprocess.CalledProcessError, OSError) as e:
+                log_warning(f"Artifact store disabled for this build: {e}")
+        if key and artifact_store.restore(ctx, key):
+            _notify_step(notify, f"Restored {arch} build from artifact store")
+            return
+
+        build(ctx, targeted=targeted_build, compiler_cache=compiler_cache)
+        if key:
+            artifact_store.save(ctx, key)
+        _notify_step(notify, f"Completed building for {arch}")
+
+    def run_sign():
+        log_info(f"\n🔏 Signing {arch} build...")
+        _notify_step(notify, f"[{arch}] Started signing")
+        # Pass certificate_name for Windows signing
+        if IS_WINDOWS:
+            sign(ctx, certificate_name)
+        else:
+            sign(ctx)
+        _notify_step(notify, f"[{arch}] Completed signing")
+
+    def run_package():
+        log_info(f"\n📦 Packaging {arch} build...")
+        _notify_step(notify, f"[{arch}] Started {_package_type()} creation")
+        package(ctx)
+        _notify_step(notify, f"[{arch}] Completed {_package_type()} creation")
+
+    def run_upload():
+        success, gcs_uris = upload_package_artifacts(ctx)
+        if not success:
+            log_warning("Failed to upload package artifacts to GCS")
+        elif gcs_uris and notify:
+            notify_gcs_upload(arch, gcs_uris)
+            all_gcs_uris.extend(gcs_uris)
+
+    pipeline.add(
+        Step(
+            f"configure[{arch}]",
+            lambda: configure(ctx, gn_flags_file, compiler_cache),
+            deps=PREPARE_STEPS,
+            inputs=lambda: [get_flags_file(ctx, gn_flags_file)],
+            outputs=lambda: [
+                ctx.get_gn_args_file(),
+                join_paths(ctx.chromium_src, ctx.out_dir, "build.ninja"),
+            ],
+            # Covers the governor's concurrent_links and the compiler cache
+            extra=lambda: get_gn_args_digest(ctx, gn_flags_file, compiler_cache),
+            enabled=build_flag,
+        )
+    )
+    # Stale-output cleaning needs the graph gn gen just wrote
+    pipeline.add(
+        Step(
+            f"clean_stale[{arch}]",
+            lambda: clean_stale_outputs(ctx),
+            deps=[f"configure[{arch}]"],
+            enabled=build_flag and clean_stale,
+        )
+    )
+    # ninja tracks compile inputs itself, so compile is never fingerprinted
+    pipeline.add(
+        Step(
+            f"compile[{arch}]",
+            run_compile,
+            deps=[f"clean_stale[{arch}]"],
+            after=after("compile"),
+            enabled=build_flag,
+            artifacts=lambda: [ctx.get_app_path()],
+        )
+    )
+    pipeline.add(
+        Step(
+            f"sign[{arch}]",
+            run_sign,
+            deps=[f"compile[{arch}]"],
+            after=after("sign"),
+            enabled=sign_flag,
+            artifacts=lambda: [ctx.get_app_path()],
+        )
+    )
+    pipeline.add(
+        Step(
+            f"package[{arch}]",
+            run_package,
+            deps=[f"sign[{arch}]"],
+            after=after("package"),
+            enabled=package_flag,
+            artifacts=lambda: _package_artifacts(ctx),
+        )
+    )
+    pipeline.add(
+        Step(
+            f"upload[{arch}]",
+            run_upload,
+            deps=[f"package[{arch}]"],
+            enabled=package_flag and upload_gcs,
+        )
+    )
+
+
+def get_universal_app_path(ctx: BuildContext) -> Path:
+    """Merged app of a universal build"""
+    return ctx.chromium_src / "out/Default_universal" / ctx.NXTSCAPE_APP_NAME
+
+
+def add_universal_steps(
+    pipeline: Pipeline,
+    contexts: List[BuildContext],
+    sign_flag: bool,
+    package_flag: bool,
+    upload_gcs: bool,
+    slack_notifications: bool,
+    all_gcs_uris: List[str],
+) -> None:
+    """Add merge, sign, package and upload steps for a universal build
+
+    Merging waits for every architecture's steps, so the universal steps
+    run last, and are journaled like the rest for --resume.
+    """
+    ctx = contexts[0]
+    notify = slack_notifications
+    universal_app_path = get_universal_app_path(ctx)
+
+    def run_merge():
+        from modules.merge import merge_architectures
+
+        log_info(f"\n{'='*60}")
+        log_info("🔄 Creating universal binary...")
+        log_info(f"{'='*60}")
+
+        # Clean up old universal output directory if it exists
+        universal_dir = universal_app_path.parent
+        if universal_dir.exists():
+            log_info("🧹 Cleaning up old universal output directory...")
+            remove_tree(universal_dir)
+        universal_dir.mkdir(parents=True, exist_ok=True)
+
+        universalizer_script = ctx.root_dir / "build" / "universalizer_patched.py"
+        if not merge_architectures(
+            contexts[0].get_app_path(),
+            contexts[1].get_app_path(),
+            universal_app_path,
+            universalizer_script,
+        ):
+            raise RuntimeError("Failed to merge architectures into universal binary")
+        _notify_step(notify, "Completed merging architectures into universal binary")
+
+    def run_sign():
+        _notify_step(notify, "[Universal] Started signing and notarization")
+        sign_universal(contexts)
+        _notify_step(notify, "[Universal] Completed signing and notarization")
+
+    def run_package():
+        _notify_step(notify, f"[Universal] Started {_package_type()} creation")
+        package_universal(contexts)
+        _notify_step(notify, f"[Universal] Completed {_package_type()} creation")
+
+    def run_upload():
+        # Upload with the first context, its architecture set to universal
+        original_arch = ctx.architecture
+        ctx.architecture = "universal"
+        try:
+            success, gcs_uris = upload_package_artifacts(ctx)
+        finally:
+            ctx.architecture = original_arch
+        if not success:
+            log_warning("Failed to upload universal package artifacts to GCS")
+        elif gcs_uris and notify:
+            notify_gcs_upload("universal", gcs_uris)
+            all_gcs_uris.extend(gcs_uris)
+
+    last_steps = [f"upload[{c.architecture}]" for c in contexts]
+    pipeline.add(
+        Step(
+            "merge[universal]",
+            run_merge,
+            deps=last_steps,
+            artifacts=lambda: [universal_app_path],
+        )
+    )
+    pipeline.add(
+        Step(
+            "sign[universal]",
+            run_sign,
+            deps=["merge[universal]"],
+            enabled=sign_flag,
+            artifacts=lambda: [universal_app_path],
+        )
+    )
+    pipeline.add(
+        Step(
+            "package[universal]",
+            run_package,
+            deps=["sign[universal]"],
+            enabled=package_flag,
+            artifacts=lambda: _package_artifacts(ctx, "universal"),
+        )
+    )
+    pipeline.add(
+        Step(
+            "upload[universal]",
+            run_upload,
+            deps=["package[universal]"],
+            enabled=package_flag and upload_gcs,
+        )
+    )
+
+
 def build_main(
     config_file: Optional[Path] = None,
     clean_flag: bool = False,
@@ -131,6 +632,10 @@ def build_main(
     patch_interactive: bool = False,
     patch_commit: bool = False,
     upload_gcs: bool = True,  # Default to uploading to GCS
+    force_steps: bool = False,
+    resume: bool = False,
+    targeted_build: bool = False,
+    clean_mode: str = "full",
 ):
     """Main build orchestration"""
     log_info("🚀 Nxtscape Build System")
@@ -158,6 +663,7 @@ def build_main(
     architectures = [arch] if arch else []  # Empty list if no arch specified
     universal = False
     certificate_name = None  # For Windows signing
+    compiler_cache = None
     if config_file:
         config = load_config(config_file)
         log_info(f"📄 Loaded config from: {config_file}")
@@ -172,7 +678,12 @@ def build_main(
             universal = config["build"].get("universal", False)
 
         if "steps" in config:
-            clean_flag = config["steps"].get("clean", clean_flag)
+            clean_setting = config["steps"].get("clean", clean_flag)
+            # `clean: stale` keeps the out dir and removes only stale outputs
+            if clean_setting in CLEAN_MODES:
+                clean_flag, clean_mode = True, clean_setting
+            else:
+                clean_flag = bool(clean_setting)
             git_setup_flag = config["steps"].get("git_setup", git_setup_flag)
             apply_patches_flag = config["steps"].get(
                 "apply_patches", apply_patches_flag
@@ -190,6 +701,8 @@ def build_main(
         if "gn_flags" in config and "file" in config["gn_flags"]:
             gn_flags_file = Path(config["gn_flags"]["file"])
 
+        compiler_cache = load_compiler_cache(config)
+
         # Get chromium_src from config (only if not provided via CLI)
         if (
             not chromium_src_dir
@@ -242,9 +755,19 @@ def build_main(
     log_info(f"📍 Architectures: {architectures}")
     log_info(f"📍 Universal build: {universal}")
     log_info(f"📍 Build type: {build_type}")
+    if targeted_build:
+        log_info("📍 Targeted dev build: linking chrome only")
+        if package_flag:
+            log_warning("Targeted builds skip chromedriver, packages will lack it")
+    if compiler_cache:
+        setup_compiler_cache(compiler_cache, chromium_src)
+    collect_trash(join_paths(chromium_src, "out"))
 
     # Start time for overall build
     start_time = time.time()
+    install_signal_handlers()
+    start_log_rotation()
+    log_event("build_start", build_type=build_type, architectures=architectures)
 
     # Notify build started (if enabled)
     if slack_notifications:
@@ -252,15 +775,10 @@ def build_main(
 
     # Run build steps
     try:
-        built_contexts = []
         all_gcs_uris = []  # Track all uploaded GCS URIs
 
-        # Build each architecture separately
+        built_contexts = []
         for arch_name in architectures:
-            log_info(f"\n{'='*60}")
-            log_info(f"🏗️  Building for architecture: {arch_name}")
-            log_info(f"{'='*60}")
-
             ctx = BuildContext(
                 root_dir=root_dir,
                 chromium_src=chromium_src,
@@ -271,192 +789,55 @@ def build_main(
                 package=package_flag,
                 build=build_flag,
             )
-
-            log_info(f"📍 Chromium: {ctx.chromium_version}")
-            log_info(f"📍 Nxtscape: {ctx.nxtscape_version}")
-            log_info(f"📍 Output directory: {ctx.out_dir}")
-
-            # Clean (only for first architecture to avoid conflicts)
-            if clean_flag and arch_name == architectures[0]:
-                clean(ctx)
-                if slack_notifications:
-                    notify_build_step("Completed cleaning build artifacts")
-
-            # Git setup (only once for first architecture)
-            if git_setup_flag and arch_name == architectures[0]:
-                setup_git(ctx)
-                if slack_notifications:
-                    notify_build_step("Completed Git setup and Chromium source")
-
-            # Apply patches (only once for first architecture)
-            if apply_patches_flag and arch_name == architectures[0]:
-                # First do chromium file replacements
-                replace_chromium_files(ctx)
-
-                # Then apply string replacements
-                apply_string_replacements(ctx)
-
-                # Setup sparkle (macOS only)
-                if IS_MACOS:
-                    setup_sparkle(ctx)
-                else:
-                    log_info("Skipping Sparkle setup (macOS only)")
-
-                # Apply patches
-                apply_patches(
-                    ctx, interactive=patch_interactive, commit_each=patch_commit
-                )
-
-                # Copy resources
-                copy_resources(ctx, commit_each=patch_commit)
-
-                if slack_notifications:
-                    notify_build_step(
-                        "Completed applying patches and copying resources"
-                    )
-
-            # Build for this architecture
-            if build_flag:
-                if slack_notifications:
-                    notify_build_step(f"Started building for {arch_name}")
-                configure(ctx, gn_flags_file)
-                build(ctx)
-
-                # Run post-build tasks
-                # run_postbuild(ctx)
-
-                if slack_notifications:
-                    notify_build_step(f"Completed building for {arch_name}")
-
-            # Sign and package immediately after building each architecture
-            if sign_flag:
-                log_info(f"\n🔏 Signing {ctx.architecture} build...")
-                if slack_notifications:
-                    notify_build_step(f"[{ctx.architecture}] Started signing")
-                # Pass certificate_name for Windows signing
-                if IS_WINDOWS:
-                    sign(ctx, certificate_name)
-                else:
-                    sign(ctx)
-                if slack_notifications:
-                    notify_build_step(f"[{ctx.architecture}] Completed signing")
-
-            if package_flag:
-                log_info(f"\n📦 Packaging {ctx.architecture} build...")
-                if slack_notifications:
-                    package_type = (
-                        "DMG" if IS_MACOS else "installer" if IS_WINDOWS else "AppImage"
-                    )
-                    notify_build_step(
-                        f"[{ctx.architecture}] Started {package_type} creation"
-                    )
-                package(ctx)
-                if slack_notifications:
-                    package_type = (
-                        "DMG" if IS_MACOS else "installer" if IS_WINDOWS else "AppImage"
-                    )
-                    notify_build_step(
-                        f"[{ctx.architecture}] Completed {package_type} creation"
-                    )
-
-                # Upload to GCS after packaging
-                gcs_uris = []
-                if upload_gcs:
-                    success, gcs_uris = upload_package_artifacts(ctx)
-                    if not success:
-                        log_warning("Failed to upload package artifacts to GCS")
-                    elif gcs_uris and slack_notifications:
-                        notify_gcs_upload(ctx.architecture, gcs_uris)
-                        all_gcs_uris.extend(gcs_uris)
-
+            log_info(f"📍 Output directory ({arch_name}): {ctx.out_dir}")
             built_contexts.append(ctx)
 
-        # Handle universal build if requested
-        if len(architectures) > 1 and universal:
-            # Universal build: merge, sign and package
-            log_info(f"\n{'='*60}")
-            log_info("🔄 Creating universal binary...")
-            log_info(f"{'='*60}")
-
-            # Import merge function
-            from modules.merge import merge_architectures
-
-            # Get paths for the built apps
-            arch1_app = built_contexts[0].get_app_path()
-            arch2_app = built_contexts[1].get_app_path()
-
-            # Clean up old universal output directory if it exists
-            universal_dir = built_contexts[0].chromium_src / "out/Default_universal"
-            if universal_dir.exists():
-                log_info("🧹 Cleaning up old universal output directory...")
-                from utils import safe_rmtree
-
-                safe_rmtree(universal_dir)
-
-            # Create fresh universal output path
-            universal_dir.mkdir(parents=True, exist_ok=True)
-            universal_app_path = universal_dir / built_contexts[0].NXTSCAPE_APP_NAME
-
-            # Find universalizer script
-            universalizer_script = root_dir / "build" / "universalizer_patched.py"
-
-            # Merge the architectures
-            if not merge_architectures(
-                arch1_app, arch2_app, universal_app_path, universalizer_script
-            ):
-                raise RuntimeError(
-                    "Failed to merge architectures into universal binary"
-                )
-
-            if slack_notifications:
-                notify_build_step(
-                    "Completed merging architectures into universal binary"
-                )
-
-            if sign_flag:
-                if slack_notifications:
-                    notify_build_step("[Universal] Started signing and notarization")
-                sign_universal(built_contexts)
-                if slack_notifications:
-                    notify_build_step("[Universal] Completed signing and notarization")
-
-            if package_flag:
-                if slack_notifications:
-                    package_type = (
-                        "DMG" if IS_MACOS else "installer" if IS_WINDOWS else "AppImage"
-                    )
-                    notify_build_step(f"[Universal] Started {package_type} creation")
-                package_universal(built_contexts)
-                if slack_notifications:
-                    package_type = (
-                        "DMG" if IS_MACOS else "installer" if IS_WINDOWS else "AppImage"
-                    )
-                    notify_build_step(f"[Universal] Completed {package_type} creation")
-
-                # Upload universal package to GCS
-                universal_gcs_uris = []
-                if upload_gcs:
-                    # Use the first context with universal architecture override
-                    universal_ctx = built_contexts[0]
-                    original_arch = universal_ctx.architecture
-                    universal_ctx.architecture = "universal"
-                    success, universal_gcs_uris = upload_package_artifacts(
-                        universal_ctx
-                    )
-                    if not success:
-                        log_warning(
-                            "Failed to upload universal package artifacts to GCS"
-                        )
-                    elif universal_gcs_uris and slack_notifications:
-                        notify_gcs_upload("universal", universal_gcs_uris)
-                        all_gcs_uris.extend(universal_gcs_uris)
-                    universal_ctx.architecture = original_arch
+        log_info(f"📍 Chromium: {built_contexts[0].chromium_version}")
+        log_info(f"📍 Nxtscape: {built_contexts[0].nxtscape_version}")
+
+        pipeline = create_build_pipeline(
+            built_contexts,
+            clean_flag=clean_flag,
+            git_setup_flag=git_setup_flag,
+            apply_patches_flag=apply_patches_flag,
+            build_flag=build_flag,
+            sign_flag=sign_flag,
+            package_flag=package_flag,
+            upload_gcs=upload_gcs,
+            gn_flags_file=gn_flags_file,
+            certificate_name=certificate_name,
+            slack_notifications=slack_notifications,
+            patch_interactive=patch_interactive,
+            patch_commit=patch_commit,
+            all_gcs_uris=all_gcs_uris,
+            force=force_steps,
+            resume=resume,
+            targeted_build=targeted_build,
+            compiler_cache=compiler_cache,
+            artifact_store=load_artifact_store(config, built_contexts[0]),
+            clean_mode=clean_mode,
+            universal=universal,
+        )
+        # Before any step writes to chromium_src, so clean can undo it all
+        try:
+            record_touched_paths(built_contexts[0], architectures)
+        except OSError as e:
+            log_warning(f"Could not record touched paths: {e}")
+        pipeline.run()
+        failures = pipeline.failures()
+        if failures:
+            pipeline.log_summary()
+            raise RuntimeError(
+                "; ".join(f"{name}: {error}" for name, error in failures.items())
+            )
 
         # Summary
         elapsed = time.time() - start_time
         mins = int(elapsed / 60)
         secs = int(elapsed % 60)
 
+        pipeline.log_summary()
+
         log_info("\n" + "=" * 60)
         log_success(
             f"Build completed for {len(architectures)} architecture(s) in {mins}m {secs}s"
@@ -464,6 +845,7 @@ def build_main(
         if universal and len(architectures) > 1:
             log_success("Universal binary created successfully!")
         log_info("=" * 60)
+        log_event("build_end", status="ok", duration=round(elapsed, 3))
 
         # Notify build success (if enabled)
         if slack_notifications:
@@ -471,17 +853,19 @@ def build_main(
 
     except KeyboardInterrupt:
         log_warning("\nBuild interrupted")
+        log_event("build_end", status="interrupted")
         if slack_notifications:
             notify_build_interrupted()
         sys.exit(130)
     except Exception as e:
         log_error(f"\nBuild failed: {e}")
+        log_event("build_end", status="failed", error=str(e))
         if slack_notifications:
             notify_build_failure(str(e))
         sys.exit(1)
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option(
     "--config",
     "-c",
@@ -489,6 +873,12 @@ def build_main(
     help="Load configuration from YAML file",
 )
 @click.option("--clean", "-C", is_flag=True, default=False, help="Clean before build")
+@click.option(
+    "--clean-mode",
+    type=click.Choice(CLEAN_MODES),
+    default="full",
+    help="full: delete the out dir; stale: keep it, remove only outputs no longer built",
+)
 @click.option("--git-setup", "-g", is_flag=True, default=False, help="Git setup")
 @click.option(
     "--apply-patches", "-p", is_flag=True, default=False, help="Apply patches"
@@ -573,15 +963,44 @@ def build_main(
     type=click.Path(exists=True, path_type=Path),
     help="Upload pre-built artifacts from dist/<version> directory to GCS: --upload-dist dist/61",
 )
+@click.option(
+    "--force",
+    "-f",
+    is_flag=True,
+    default=False,
+    help="Run every enabled step even if its fingerprints are unchanged",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Resume an interrupted build from its first incomplete step",
+)
+@click.option(
+    "--targeted",
+    is_flag=True,
+    default=False,
+    help="Dev build: compile targets owning changed files, then link only chrome",
+)
+@click.option(
+    "--verbose",
+    "-v",
+    is_flag=True,
+    default=False,
+    help="Print every line of ninja and gclient output instead of a status line",
+)
 @click.option(
     "--platform",
     type=click.Choice(["macos", "linux", "win"]),
     default=None,
     help="Override platform for GCS upload (auto-detected if not specified)",
 )
+@click.pass_context
 def main(
+    click_ctx,
     config,
     clean,
+    clean_mode,
     git_setup,
     apply_patches,
     sign,
@@ -598,9 +1017,17 @@ def main(
     patch_commit,
     no_gcs_upload,
     upload_dist,
+    force,
+    resume,
+    targeted,
+    verbose,
     platform,
 ):
     """Simple build system for Nxtscape Browser"""
+    if click_ctx.invoked_subcommand is not None:
+        return
+
+    set_verbose(verbose)
 
     # Validate chromium-src for commands that need it
     if add_replace or merge or string_replace or (not config and chromium_src is None):
@@ -702,8 +1129,15 @@ def main(
         patch_interactive=patch_interactive,
         patch_commit=patch_commit,
         upload_gcs=not no_gcs_upload,  # Invert the flag
+        force_steps=force,
+        resume=resume,
+        targeted_build=targeted,
+        clean_mode=clean_mode,
     )
 
 
+main.add_command(logs_command)
+
+
 if __name__ == "__main__":
     main.main(standalone_mode=False)
@@ -0,0 +1,11 @@
+"""
+pytest setup for the build tests
+
+Points the build logs at a temporary directory before utils is imported,
+so test runs don't leave build_* logs in packages/browseros/logs.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("BROWSEROS_LOG_DIR", tempfile.mkdtemp(prefix="browseros-logs-"))
@@ -43,6 +43,9 @@ class BuildContext:
 
     # Third party
     SPARKLE_VERSION: str = "2.7.0"
+    # sha256 of Sparkle-<version>.tar.xz. Not pinned yet: until it is, the
+    # download is refused unless BROWSEROS_TRUST_FIRST_DOWNLOAD is set
+    SPARKLE_SHA256: str = ""
 
     def __post_init__(self):
         """Load version files and set platform/architecture-specific configurations"""
@@ -235,6 +238,10 @@ class BuildContext:
         """Get distribution output directory with version"""
         return join_paths(self.root_dir, "dist", self.nxtscape_version)
 
+    def get_build_cache_dir(self) -> Path:
+        """Get build cache directory (kept when out/Default_<arch> is cleaned)"""
+        return join_paths(self.chromium_src, "out", ".browseros_cache")
+
     # Dev CLI specific methods
     def get_dev_patches_dir(self) -> Path:
         """Get individual patches directory"""
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Structured build event log
+
+Every log call, command and pipeline step of a build is written as one
+JSON object per line to logs/build_<timestamp>.jsonl. A sidecar index
+(build_<timestamp>.index.json) keeps the byte offset where each step's
+events start, plus the build's failures and slowest commands, so queries
+across many builds only read the small indexes. Finished logs are
+compressed with zstd (gzip if zstandard is not installed) when the next
+build starts. A log counts as finished once its index is closed, or once
+the process that wrote it no longer holds its lock file
+(build_<timestamp>.lock), so logs of running builds are never touched.
+
+This module has no dependency on utils, which imports it. It sits next to
+utils rather than in modules/ because importing anything from modules runs
+modules/__init__, whose modules import utils; utils importing it from there
+would be circular.
+"""
+
+import gzip
+import heapq
+import io
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, IO, Iterator, List, Optional
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".index.json"
+LOCK_SUFFIX = ".lock"
+EVENTS_SUFFIX = ".jsonl"
+COMPRESSED_SUFFIXES = (".zst", ".gz")
+
+# Entries kept in an index
+MAX_FAILURES = 50
+MAX_SLOW_COMMANDS = 20
+
+_STEP_RE = re.compile(r"^(?P<step>[^\[]+)\[(?P<arch>[^\]]+)\]$")
+
+
+def split_step(name: str) -> Dict[str, str]:
+    """Split a pipeline step name like "compile[arm64]" into step and arch"""
+    match = _STEP_RE.match(name)
+    if match:
+        return {"step": name, "arch": match.group("arch")}
+    return {"step": name}
+
+
+def index_path_for(log_path: Path) -> Path:
+    """Sidecar index of an event or text log, compressed or not"""
+    name = log_path.name.split(".", 1)[0]
+    return log_path.with_name(name + INDEX_SUFFIX)
+
+
+def lock_path_for(log_path: Path) -> Path:
+    """Lock file held while a log is being written"""
+    name = log_path.name.split(".", 1)[0]
+    return log_path.with_name(name + LOCK_SUFFIX)
+
+
+def try_lock(path: Path) -> Optional[IO[bytes]]:
+    """Take an exclusive lock on a file without waiting
+
+    Returns:
+        The open lock file (the lock lasts until it is closed), or None
+        if another process holds the lock
+    """
+    lock_file = open(path, "a+b")
+    try:
+        if sys.platform == "win32":
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def is_writer_alive(log_path: Path) -> bool:
+    """Whether the process writing a log still holds its lock"""
+    lock_path = lock_path_for(log_path)
+    if not lock_path.exists():
+        return False
+    lock_file = try_lock(lock_path)
+    if lock_file is None:
+        return True
+    lock_file.close()
+    return False
+
+
+class EventIndex:
+    """Summary of one build's events, updated as they are written"""
+
+    def __init__(self, log_name: str):
+        self.data = {
+            "version": INDEX_VERSION,
+            "log": log_name,
+            "started": None,
+            "ended": None,
+            "status": "incomplete",
+            "closed": False,
+            "events": 0,
+            "steps": {},
+            "failures": [],
+            "slow_commands": [],
+        }
+        self._slow: List = []
+
+    def add(self, event: Dict, offset: int):
+        data = self.data
+        data["events"] += 1
+        if data["started"] is None:
+            data["started"] = event["ts"]
+        data["ended"] = event["ts"]
+
+        kind = event.get("kind")
+        step = event.get("step")
+        if step and step not in data["steps"]:
+            data["steps"][step] = {"offset": offset, "status": None, "duration": None}
+
+        if kind == "step_end":
+            data["steps"][step].update(
+                status=event.get("status"), duration=event.get("duration")
+            )
+            if event.get("status") == "failed":
+                self._failure(event, event.get("error", ""), first_only=True)
+        elif kind == "command_end":
+            if event.get("exit_code") or event.get("error"):
+                message = event.get("error") or f"exit code {event['exit_code']}"
+                self._failure(event, message)
+            duration = event.get("duration") or 0.0
+            entry = (duration, event["ts"], event.get("cmd", ""), step)
+            if len(self._slow) < MAX_SLOW_COMMANDS:
+                heapq.heappush(self._slow, entry)
+            else:
+                heapq.heappushpop(self._slow, entry)
+        elif kind == "log" and event.get("level") == "error":
+            self._failure(event, event.get("msg", "").strip(), first_only=True)
+        elif kind == "build_end":
+            data["status"] = event.get("status", "ok")
+
+    def _failure(self, event: Dict, message: str, first_only: bool = False):
+        """Record a failure; with first_only, only if its step has none yet
+
+        A failing command is followed by error logs and a failed step_end
+        that repeat it, so those only count when nothing failed before.
+        """
+        failures = self.data["failures"]
+        step = event.get("step")
+        if first_only and any(f["step"] == step for f in failures):
+            return
+        if len(failures) < MAX_FAILURES:
+            failures.append(
+                {
+                    "ts": event["ts"],
+                    "kind": event.get("kind"),
+                    "step": event.get("step"),
+                    "cmd": event.get("cmd"),
+                    "message": message,
+                }
+            )
+
+    def snapshot(self) -> Dict:
+        self.data["slow_commands"] = [
+            {"duration": duration, "ts": ts, "cmd": cmd, "step": step}
+            for duration, ts, cmd, step in sorted(self._slow, reverse=True)
+        ]
+        return self.data
+
+
+def write_index(path: Path, data: Dict):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class EventLog:
+    """Append-only JSONL event file with its index"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.index_path = index_path_for(path)
+        self.index = EventIndex(path.name)
+        # Held until close, so rotation leaves this log alone meanwhile
+        self.lock_path = lock_path_for(path)
+        self.lock = try_lock(self.lock_path)
+        self.file = open(path, "ab")
+        self.offset = self.file.tell()
+
+    def write(self, events: List[Dict]):
+        chunks = []
+        save_index = False
+        for event in events:
+            line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+            self.index.add(event, self.offset)
+            self.offset += len(line)
+            chunks.append(line)
+            save_index = save_index or event.get("kind") in ("step_end", "build_end")
+        self.file.write(b"".join(chunks))
+        self.file.flush()
+        # Keep the index current at step boundaries in case the build dies
+        if save_index:
+            write_index(self.index_path, self.index.snapshot())
+
+    def close(self):
+        self.file.close()
+        self.index.data["closed"] = True
+        write_index(self.index_path, self.index.snapshot())
+        if self.lock is not None:
+            self.lock.close()
+            self.lock_path.unlink(missing_ok=True)
+
+
+def open_log(path: Path) -> IO[bytes]:
+    """Open an event or text log for reading, decompressing as needed"""
+    if path.suffix == ".zst":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"zstandard is required to read {path.name}")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_events(path: Path, offset: int = 0) -> Iterator[Dict]:
+    """Events of a log, starting at an offset into the uncompressed stream"""
+    with open_log(path) as raw:
+        stream = io.BufferedReader(raw) if path.suffix == ".zst" else raw
+        if offset and path.suffix == ".jsonl":
+            stream.seek(offset)
+        else:
+            while offset > 0:
+                skipped = len(stream.read(min(offset, 1 << 20)))
+                if not skipped:
+                    break
+                offset -= skipped
+        for line in stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # Torn last line of a killed build
+
+
+def build_index(path: Path) -> Dict:
+    """Rebuild the index of an event log that was never closed"""
+    index = EventIndex(path.name)
+    offset = 0
+    with open_log(path) as raw:
+        stream = io.BufferedReader(raw) if path.suffix == ".zst" else raw
+        for line in stream:
+            try:
+                index.add(json.loads(line), offset)
+            except (ValueError, KeyError):
+                pass
+            offset += len(line)
+    return index.snapshot()
+
+
+def load_index(path: Path) -> Optional[Dict]:
+    """Index of an event log, rebuilt and saved if missing or outdated"""
+    index_path = index_path_for(path)
+    if index_path.exists():
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                data["log"] = path.name
+                return data
+        except (OSError, ValueError):
+            pass
+    try:
+        data = build_index(path)
+    except (OSError, RuntimeError):
+        return None
+    write_index(index_path, data)
+    return data
+
+
+def compress_log(path: Path) -> Path:
+    """Compress a finished log next to itself and remove the original"""
+    suffix = ".zst" if ZSTD_AVAILABLE else ".gz"
+    target = path.with_name(path.name + suffix)
+    tmp_path = target.with_name(target.name + ".tmp")
+    with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+        if ZSTD_AVAILABLE:
+            zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
+        else:
+            with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=6) as gz:
+                while chunk := src.read(1 << 20):
+                    gz.write(chunk)
+    os.replace(tmp_path, target)
+    path.unlink()
+    return target
+
+
+def is_finished(log_path: Path) -> bool:
+    """Whether a build log will not be written to anymore
+
+    True once the writer closed the log's index or stopped holding its
+    lock. Text logs are judged by their build's event log.
+    """
+    if is_writer_alive(log_path):
+        return False
+    index_path = index_path_for(log_path)
+    if index_path.exists():
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("closed") or data.get("status") != "incomplete":
+                return True
+        except (OSError, ValueError):
+            pass
+    # Not closed: finished only if a lock shows the writer is gone
+    return lock_path_for(log_path).exists()
+
+
+def rotate_logs(log_dir: Path, current: str):
+    """Compress every finished build log except the current build's
+
+    Event logs are indexed before compression, since index offsets refer
+    to the uncompressed stream. Leftovers of interrupted runs are removed.
+    """
+    finished = set()
+    for path in sorted(log_dir.glob("build_*")):
+        name = path.name.split(".", 1)[0]
+        if name.startswith(current) or path.suffix not in (EVENTS_SUFFIX, ".log"):
+            continue
+        if path.name.endswith(INDEX_SUFFIX) or not is_finished(path):
+            continue
+        if path.suffix == EVENTS_SUFFIX:
+            if load_index(path) is None:
+                continue
+        finished.add(name)
+        try:
+            compressed = compress_log(path)
+        except OSError:
+            continue
+        if compressed.name.endswith(EVENTS_SUFFIX + compressed.suffix):
+            index_path = index_path_for(path)
+            data = load_index(compressed)
+            if data is not None:
+                write_index(index_path, data)
+
+    for name in finished:
+        # Temporary files and stale locks of builds that are over
+        for leftover in log_dir.glob(f"{name}.*"):
+            if leftover.suffix in (".tmp", LOCK_SUFFIX):
+                leftover.unlink(missing_ok=True)
+
+
+def find_event_logs(log_dir: Path) -> List[Path]:
+    """Event logs in a directory, oldest first"""
+    logs = []
+    for path in log_dir.glob("build_*"):
+        name = path.name
+        if name.endswith(EVENTS_SUFFIX) or any(
+            name.endswith(EVENTS_SUFFIX + suffix) for suffix in COMPRESSED_SUFFIXES
+        ):
+            logs.append(path)
+    return sorted(logs, key=lambda p: p.name)
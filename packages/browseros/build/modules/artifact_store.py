@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Build artifact store module for Nxtscape build system
+
+Keeps copies of the compiled browser keyed by the patched source tree,
+args.gn and architecture, so a build of an already-built tree restores
+the binaries instead of compiling. Enabled from the build YAML:
+
+    artifact_store:
+      dir: ~/.cache/browseros-artifacts   # default: out/.browseros_cache/artifacts
+      max_size_gb: 20
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from context import BuildContext
+from utils import (
+    log_info,
+    log_success,
+    log_warning,
+    join_paths,
+    safe_rmtree,
+    IS_LINUX,
+    IS_MACOS,
+)
+from modules.clean import get_recorded_touched_paths, get_touched_paths
+from modules.fingerprint import get_fingerprint_store, hash_file
+from modules.package_linux import BROWSER_DIRS, BROWSER_FILES
+from modules.patches import get_patch_fingerprint_paths
+
+
+MANIFEST_FILE = "manifest.json"
+DEFAULT_MAX_SIZE_GB = 20
+
+
+def get_build_artifacts(ctx: BuildContext) -> Optional[List[str]]:
+    """Out-dir paths the sign and package steps need from a compile
+
+    Returns:
+        Paths relative to the out dir, or None where packaging needs the
+        full out dir (Windows builds mini_installer with ninja)
+    """
+    if IS_LINUX:
+        return [ctx.NXTSCAPE_APP_NAME] + BROWSER_FILES + BROWSER_DIRS
+    if IS_MACOS:
+        return [ctx.get_app_path().name, "chromedriver"]
+    return None
+
+
+def get_source_id(ctx: BuildContext) -> Dict[str, object]:
+    """Checked-out commit plus the content of every path the pipeline writes
+
+    Covers the paths this configuration writes and those earlier builds
+    recorded, which may still hold their changes. File digests come from
+    the fingerprint store's stat cache, and nothing is written to git.
+    Edits made outside the pipeline are not covered.
+    """
+    head = subprocess.run(
+        ["git", "rev-parse", "HEAD"],
+        cwd=ctx.chromium_src,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+    touched = get_touched_paths(ctx, [ctx.architecture])
+    touched |= get_recorded_touched_paths(ctx)
+    store = get_fingerprint_store(ctx)
+    return {
+        "head": head,
+        "files": {
+            rel_path: store.file_digest(ctx.chromium_src / rel_path)
+            for rel_path in sorted(touched)
+        },
+    }
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if not os.path.islink(file_path):
+                total += os.path.getsize(file_path)
+    return total
+
+
+def _copy_path(src: Path, dst: Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if src.is_dir() and not src.is_symlink():
+        shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True)
+    else:
+        shutil.copy2(src, dst, follow_symlinks=False)
+
+
+class ArtifactStore:
+    """Size-bounded LRU store of compiled browser artifacts"""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def key(self, ctx: BuildContext) -> str:
+        """Key for a build: sources, patches, args.gn and architecture
+
+        Nested gclient repositories are covered by the DEPS pins in the
+        tree; patch files are hashed as well since patches can reach into
+        those repositories.
+        """
+        patch_files, _ = get_patch_fingerprint_paths(ctx)
+        store = get_fingerprint_store(ctx)
+        # Relative paths, so stores shared between checkouts still match
+        patches = {
+            os.path.relpath(path, ctx.root_dir): digest
+            for path, digest in store.digest_map(sorted(patch_files)).items()
+        }
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps(get_source_id(ctx), sort_keys=True).encode())
+        digest.update(hash_file(ctx.get_gn_args_file()).encode())
+        digest.update(ctx.architecture.encode())
+        digest.update(ctx.SPARKLE_VERSION.encode())
+        digest.update(json.dumps(patches, sort_keys=True).encode())
+        return digest.hexdigest()[:32]
+
+    def _entries(self) -> Dict[str, Dict]:
+        entries = {}
+        if not self.root.exists():
+            return entries
+        for entry_dir in self.root.iterdir():
+            manifest = entry_dir / MANIFEST_FILE
+            if not manifest.exists():
+                continue
+            try:
+                with open(manifest, "r", encoding="utf-8") as f:
+                    entries[entry_dir.name] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def _write_manifest(self, entry_dir: Path, manifest: Dict) -> None:
+        tmp_path = entry_dir / f"{MANIFEST_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, entry_dir / MANIFEST_FILE)
+
+    def restore(self, ctx: BuildContext, key: str) -> bool:
+        """Copy a stored build into the out dir
+
+        Returns:
+            True if the key was found and restored
+        """
+        entry_dir = self.root / key
+        manifest_path = entry_dir / MANIFEST_FILE
+        if not manifest_path.exists():
+            return False
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        out_dir = join_paths(ctx.chromium_src, ctx.out_dir)
+        log_info(f"📦 Restoring {ctx.architecture} build from artifact store ({key})")
+        for name in manifest["files"]:
+            target = out_dir / name
+            if target.is_dir() and not target.is_symlink():
+                safe_rmtree(target)
+            elif target.exists() or target.is_symlink():
+                target.unlink()
+            _copy_path(entry_dir / "files" / name, target)
+
+        manifest["last_used"] = time.time()
+        self._write_manifest(entry_dir, manifest)
+        log_success(f"Restored {len(manifest['files'])} artifact(s), skipping compile")
+        return True
+
+    def save(self, ctx: BuildContext, key: str) -> bool:
+        """Snapshot the compiled artifacts of the out dir under a key"""
+        names = get_build_artifacts(ctx)
+        if names is None:
+            return False
+
+        out_dir = join_paths(ctx.chromium_src, ctx.out_dir)
+        present = [name for name in names if (out_dir / name).exists()]
+        if ctx.get_app_path().name not in present:
+            log_warning("Built app not found, not storing artifacts")
+            return False
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry_dir = self.root / key
+        tmp_dir = self.root / f".{key}.tmp"
+        safe_rmtree(tmp_dir)
+        for name in present:
+            _copy_path(out_dir / name, tmp_dir / "files" / name)
+
+        now = time.time()
+        self._write_manifest(
+            tmp_dir,
+            {
+                "architecture": ctx.architecture,
+                "created": now,
+                "last_used": now,
+                "size": _dir_size(tmp_dir),
+                "files": present,
+            },
+        )
+        safe_rmtree(entry_dir)
+        os.replace(tmp_dir, entry_dir)
+        log_info(f"📦 Stored {ctx.architecture} build artifacts ({key})")
+
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """Remove least recently used entries until under the size limit"""
+        entries = sorted(self._entries().items(), key=lambda e: e[1]["last_used"])
+        total = sum(manifest["size"] for _, manifest in entries)
+        # Never evict the newest entry, even if it alone exceeds the limit
+        for key, manifest in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            safe_rmtree(self.root / key)
+            total -= manifest["size"]
+            log_info(f"🧹 Evicted artifact store entry {key}")
+
+
+def load_artifact_store(
+    config: Optional[Dict], ctx: BuildContext
+) -> Optional[ArtifactStore]:
+    """Create the artifact store described by a build config, if any"""
+    if not config or "artifact_store" not in config:
+        return None
+
+    section = config["artifact_store"] or {}
+    root = section.get("dir")
+    root = (
+        Path(root).expanduser()
+        if root
+        else join_paths(ctx.get_build_cache_dir(), "artifacts")
+    )
+    max_gb = section.get("max_size_gb", DEFAULT_MAX_SIZE_GB)
+    return ArtifactStore(root, int(max_gb * 1024**3))
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Build log query module for Nxtscape build system
+
+Answers questions across past builds from the event log indexes, e.g.:
+
+    python build.py logs                     # recent builds
+    python build.py logs --failures          # what failed, and where
+    python build.py logs --slow              # slowest commands
+    python build.py logs --step compile      # compile time per build
+    python build.py logs --show latest --step "compile[arm64]"
+
+Only the small index files are read, except for --show.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import click
+from events import find_event_logs, load_index, read_events
+from utils import LOG_DIR
+
+
+def _format_ts(ts: Optional[float]) -> str:
+    if ts is None:
+        return "-"
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    mins, secs = divmod(int(seconds), 60)
+    return f"{mins}m {secs:02d}s" if mins else f"{seconds:.1f}s"
+
+
+def load_builds(log_dir: Path, last: int) -> List[Tuple[Path, Dict]]:
+    """(event log, index) of the most recent builds, oldest first"""
+    builds = []
+    for path in find_event_logs(log_dir)[-last:]:
+        index = load_index(path)
+        if index is not None:
+            builds.append((path, index))
+    return builds
+
+
+def _build_name(path: Path) -> str:
+    return path.name.split(".", 1)[0]
+
+
+def _step_matches(name: str, pattern: str) -> bool:
+    return name == pattern or name.split("[", 1)[0] == pattern
+
+
+def list_builds(builds: List[Tuple[Path, Dict]]):
+    for path, index in builds:
+        duration = None
+        if index["started"] is not None and index["ended"] is not None:
+            duration = index["ended"] - index["started"]
+        click.echo(
+            f"{_build_name(path)}  {index['status']:<11} "
+            f"{_format_duration(duration):>9}  "
+            f"{len(index['steps'])} steps, {len(index['failures'])} failure(s)"
+        )
+
+
+def list_failures(builds: List[Tuple[Path, Dict]]):
+    found = False
+    for path, index in builds:
+        for failure in index["failures"]:
+            found = True
+            where = failure.get("step") or "-"
+            what = failure.get("cmd") or failure.get("message", "")
+            click.echo(f"{_build_name(path)}  {where}: {what}")
+            if failure.get("cmd") and failure.get("message"):
+                click.echo(f"    {failure['message']}")
+    if not found:
+        click.echo("No failures recorded")
+
+
+def list_slow_commands(builds: List[Tuple[Path, Dict]], count: int):
+    commands = [
+        (command, _build_name(path))
+        for path, index in builds
+        for command in index["slow_commands"]
+    ]
+    commands.sort(key=lambda item: item[0]["duration"], reverse=True)
+    for command, build in commands[:count]:
+        click.echo(
+            f"{_format_duration(command['duration']):>9}  {build}  "
+            f"{command.get('step') or '-'}: {command['cmd'][:120]}"
+        )
+
+
+def list_step_times(builds: List[Tuple[Path, Dict]], pattern: str):
+    for path, index in builds:
+        for name, step in index["steps"].items():
+            if _step_matches(name, pattern):
+                click.echo(
+                    f"{_build_name(path)}  {name:<20} {step.get('status') or '-':<8} "
+                    f"{_format_duration(step.get('duration')):>9}"
+                )
+
+
+def show_build(path: Path, index: Dict, step: Optional[str]):
+    offset = 0
+    if step:
+        matches = [name for name in index["steps"] if _step_matches(name, step)]
+        if not matches:
+            raise click.ClickException(f"No step {step} in {_build_name(path)}")
+        offset = min(index["steps"][name]["offset"] for name in matches)
+
+    for event in read_events(path, offset):
+        if step and not _step_matches(event.get("step") or "", step):
+            continue
+        kind = event["kind"]
+        if kind == "log":
+            detail = f"{event.get('level', '').upper()}: {event.get('msg', '').strip()}"
+        elif kind == "command_end":
+            detail = (
+                f"exit {event.get('exit_code')} after "
+                f"{_format_duration(event.get('duration'))}: {event.get('cmd')}"
+            )
+        else:
+            detail = " ".join(
+                f"{key}={value}"
+                for key, value in event.items()
+                if key not in ("ts", "kind", "step", "arch")
+            )
+        click.echo(f"{_format_ts(event['ts'])} {event.get('step') or '-'} {kind} {detail}")
+
+
+@click.command(name="logs")
+@click.option(
+    "--log-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=LOG_DIR,
+    help="Directory with build logs",
+)
+@click.option("--last", "-n", default=50, help="Number of recent builds to search")
+@click.option("--failures", is_flag=True, help="List failed steps, commands and errors")
+@click.option("--slow", is_flag=True, help="List the slowest commands")
+@click.option("--count", default=20, help="Number of slow commands to list")
+@click.option("--step", help="Step to report on, e.g. compile or compile[arm64]")
+@click.option("--show", help="Print the events of a build (name or 'latest')")
+def logs_command(log_dir, last, failures, slow, count, step, show):
+    """Query structured logs of past builds"""
+    if show:
+        paths = find_event_logs(log_dir)
+        if show != "latest":
+            paths = [path for path in paths if _build_name(path) == show]
+        index = load_index(paths[-1]) if paths else None
+        if index is None:
+            raise click.ClickException(f"Build not found: {show}")
+        show_build(paths[-1], index, step)
+        return
+
+    builds = load_builds(log_dir, last)
+    if not builds:
+        click.echo(f"No build event logs in {log_dir}")
+    elif failures:
+        list_failures(builds)
+    elif slow:
+        list_slow_commands(builds, count)
+    elif step:
+        list_step_times(builds, step)
+    else:
+        list_builds(builds)
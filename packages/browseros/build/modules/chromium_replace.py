@@ -6,27 +6,28 @@ Chromium file replacement module for Nxtscape build system
 import sys
 import shutil
 from pathlib import Path
+from typing import List, Tuple
 from context import BuildContext
 from utils import log_info, log_success, log_error, log_warning
 
 
-def replace_chromium_files(ctx: BuildContext, replacements=None) -> bool:
-    """Replace files in chromium source with custom files from chromium_files directory"""
-    log_info("\n🔄 Replacing chromium files...")
-    log_info(f"  Build type: {ctx.build_type}")
+def select_replacement_files(
+    ctx: BuildContext, log_skips: bool = False
+) -> Tuple[List[Tuple[Path, Path]], int]:
+    """Pick the replacement files for the current build type
 
-    # Source directory containing replacement files
+    Returns:
+        Tuple of ((source file, destination relative path) list, skipped count)
+    """
     replacement_dir = ctx.get_chromium_replace_files_dir()
-
     if not replacement_dir.exists():
-        log_info(f"⚠️  No chromium_files directory found at: {replacement_dir}")
-        return True
+        return [], 0
 
-    replaced_count = 0
+    selected = []
     skipped_count = 0
 
     # Find all files recursively in the replacement directory
-    for src_file in replacement_dir.rglob("*"):
+    for src_file in sorted(replacement_dir.rglob("*")):
         if src_file.is_file():
             # Skip build-type specific files that don't match current build type
             if src_file.suffix in [".debug", ".release"]:
@@ -55,33 +56,63 @@ def replace_chromium_files(ctx: BuildContext, replacements=None) -> bool:
                 if (ctx.build_type == "debug" and debug_variant.exists()) or (
                     ctx.build_type == "release" and release_variant.exists()
                 ):
-                    log_info(
-                        f"    ⏭️  Skipping {relative_path} (using {ctx.build_type} variant instead)"
-                    )
+                    if log_skips:
+                        log_info(
+                            f"    ⏭️  Skipping {relative_path} (using {ctx.build_type} variant instead)"
+                        )
                     skipped_count += 1
                     continue
 
-            # Destination path in actual chromium source
-            dst_file = ctx.chromium_src / dest_relative
-
-            # Check if destination exists
-            if not dst_file.exists():
-                log_error(
-                    f"    Destination file not found in chromium_src: {dest_relative}"
-                )
-                raise FileNotFoundError(
-                    f"Destination file not found in chromium_src: {dest_relative}"
-                )
-
-            try:
-                # Replace the file
-                shutil.copy2(src_file, dst_file)
-                log_info(f"    ✓ Replaced: {relative_path} → {dest_relative}")
-                replaced_count += 1
-
-            except Exception as e:
-                log_error(f"    Error replacing file {relative_path}: {e}")
-                raise
+            selected.append((src_file, dest_relative))
+
+    return selected, skipped_count
+
+
+def get_replacement_pairs(ctx: BuildContext) -> List[Tuple[Path, Path]]:
+    """List (source, destination) paths of the files replaced in chromium_src"""
+    selected, _ = select_replacement_files(ctx)
+    return [(src, ctx.chromium_src / dest) for src, dest in selected]
+
+
+def replace_chromium_files(ctx: BuildContext, replacements=None) -> bool:
+    """Replace files in chromium source with custom files from chromium_files directory"""
+    log_info("\n🔄 Replacing chromium files...")
+    log_info(f"  Build type: {ctx.build_type}")
+
+    # Source directory containing replacement files
+    replacement_dir = ctx.get_chromium_replace_files_dir()
+
+    if not replacement_dir.exists():
+        log_info(f"⚠️  No chromium_files directory found at: {replacement_dir}")
+        return True
+
+    replaced_count = 0
+    selected, skipped_count = select_replacement_files(ctx, log_skips=True)
+
+    for src_file, dest_relative in selected:
+        relative_path = src_file.relative_to(replacement_dir)
+
+        # Destination path in actual chromium source
+        dst_file = ctx.chromium_src / dest_relative
+
+        # Check if destination exists
+        if not dst_file.exists():
+            log_error(
+                f"    Destination file not found in chromium_src: {dest_relative}"
+            )
+            raise FileNotFoundError(
+                f"Destination file not found in chromium_src: {dest_relative}"
+            )
+
+        try:
+            # Replace the file
+            shutil.copy2(src_file, dst_file)
+            log_info(f"    ✓ Replaced: {relative_path} → {dest_relative}")
+            replaced_count += 1
+
+        except Exception as e:
+            log_error(f"    Error replacing file {relative_path}: {e}")
+            raise
 
     log_success(
         f"Replaced {replaced_count} files (skipped {skipped_count} non-matching files)"
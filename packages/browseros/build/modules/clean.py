@@ -3,20 +3,52 @@
 Clean module for Nxtscape build system
 """
 
+import json
 import os
 import shutil
+import subprocess
 from pathlib import Path
+from typing import List, Optional, Set
 from context import BuildContext
-from utils import run_command, log_info, log_success, safe_rmtree
+from utils import (
+    run_command,
+    log_info,
+    log_success,
+    log_warning,
+    safe_rmtree,
+    join_paths,
+    IS_WINDOWS,
+)
+from modules.trash import remove_tree
+from modules.patches import get_patch_fingerprint_paths, NEW_PATCHING
+from modules.chromium_replace import get_replacement_pairs
+from modules.string_replaces import get_target_paths
+from modules.resources import get_copy_fingerprint, get_placed_resource_paths
+from modules.targeted import get_git_status
+from modules.configure import parse_gn_args
 
 
-def clean(ctx: BuildContext) -> bool:
+# Every chromium_src path the pipeline has been configured to write
+TOUCHED_MANIFEST_FILE = "touched_paths.json"
+
+# Directories the full reset runs git clean -x in
+CLEANED_DIRS = ("chrome/", "components/")
+
+# "full" deletes the out dir; "stale" keeps it and removes stale outputs
+# after gn gen (clean_stale_outputs)
+CLEAN_MODES = ("full", "stale")
+
+
+def clean(ctx: BuildContext, mode: str = "full") -> bool:
     """Clean build artifacts"""
     log_info("🧹 Cleaning build artifacts...")
 
     out_path = ctx.chromium_src / ctx.out_dir
-    if out_path.exists():
-        safe_rmtree(out_path)
+    if mode == "stale":
+        log_info("Keeping build directory, stale outputs are removed after gn gen")
+    elif out_path.exists():
+        # Deleting hundreds of GB takes minutes; the rename is instant
+        remove_tree(out_path)
         log_success("Cleaned build directory")
 
     log_info("\n🔀 Resetting git branch and removing all tracked files...")
@@ -38,29 +70,259 @@ def clean_sparkle(ctx: BuildContext) -> bool:
     return True
 
 
+def _manifest_path(ctx: BuildContext) -> Path:
+    return ctx.get_build_cache_dir() / TOUCHED_MANIFEST_FILE
+
+
+def _load_touched(ctx: BuildContext) -> Optional[Set[str]]:
+    path = _manifest_path(ctx)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return set(json.load(f)["paths"])
+    except (OSError, ValueError, KeyError) as e:
+        log_warning(f"Ignoring unreadable touched-path manifest: {e}")
+        return None
+
+
+def _save_touched(ctx: BuildContext, paths: Set[str]) -> None:
+    path = _manifest_path(ctx)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"paths": sorted(paths)}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_touched_paths(ctx: BuildContext, architectures: List[str]) -> Set[str]:
+    """chromium_src paths the current configuration writes, relative posix
+
+    Covers patches, chromium_files replacements, string replacements,
+    chrome/VERSION and copied resources.
+    """
+    paths = list(get_patch_fingerprint_paths(ctx)[1])
+    paths += [dest for _, dest in get_replacement_pairs(ctx)]
+    paths += get_target_paths(ctx)
+    paths.append(ctx.chromium_src / "chrome" / "VERSION")
+    paths += get_copy_fingerprint(ctx, architectures)[1]
+    paths += get_placed_resource_paths(ctx)
+    return {Path(p).relative_to(ctx.chromium_src).as_posix() for p in paths}
+
+
+def get_recorded_touched_paths(ctx: BuildContext) -> Set[str]:
+    """Every path recorded by record_touched_paths, in any earlier build"""
+    return _load_touched(ctx) or set()
+
+
+def record_touched_paths(ctx: BuildContext, architectures: List[str]) -> None:
+    """Add the paths this build is about to write to the manifest
+
+    Paths are never dropped, so files written by patches or resources
+    that have since been removed are still recognized as ours.
+    """
+    if not NEW_PATCHING:
+        return  # Legacy series patches don't list the files they touch
+    touched = _load_touched(ctx) or set()
+    current = get_touched_paths(ctx, architectures)
+    if not current <= touched:
+        _save_touched(ctx, touched | current)
+
+
+def _git_restore(ctx: BuildContext, paths: List[str]) -> None:
+    """Restore tracked paths in the index and worktree from HEAD"""
+    subprocess.run(
+        [
+            "git",
+            "restore",
+            "--source=HEAD",
+            "--staged",
+            "--worktree",
+            "--pathspec-from-file=-",
+            "--pathspec-file-nul",
+        ],
+        cwd=ctx.chromium_src,
+        input="\0".join(paths),
+        text=True,
+        check=True,
+    )
+
+
+def _is_tracked(ctx: BuildContext, paths: List[str]) -> Set[str]:
+    result = subprocess.run(
+        ["git", "ls-files", "-z", "--"] + paths,
+        cwd=ctx.chromium_src,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(filter(None, result.stdout.split("\0")))
+
+
+def _status_pathspecs(touched: Set[str]) -> List[str]:
+    """CLEANED_DIRS plus the touched paths outside them"""
+    return list(CLEANED_DIRS) + sorted(
+        path for path in touched if not path.startswith(CLEANED_DIRS)
+    )
+
+
+def restore_touched_paths(ctx: BuildContext) -> bool:
+    """Undo the pipeline's changes to chromium_src without a full reset
+
+    Restores modified files we touched from HEAD and deletes files we
+    added, including ones .gitignore hides. Returns False, changing
+    nothing, if there is no manifest or git reports changes outside it;
+    the caller then does a full reset.
+
+    Only the touched paths and CLEANED_DIRS are checked, the parts of the
+    tree the full reset would clean. Unlike its git clean -x, ignored
+    files the manifest doesn't list are kept, e.g. __pycache__ left by
+    gn's Python scripts.
+    """
+    touched = _load_touched(ctx)
+    if touched is None:
+        log_info("No touched-path manifest yet, doing a full reset")
+        return False
+
+    try:
+        status = get_git_status(ctx, _status_pathspecs(touched), ignored=True)
+    except (subprocess.CalledProcessError, OSError) as e:
+        log_warning(f"git status failed ({e}), doing a full reset")
+        return False
+
+    modified = [
+        path
+        for path, code in status.items()
+        if code != "!!" or path in touched
+    ]
+    sparkle = ctx.get_sparkle_dir().relative_to(ctx.chromium_src).as_posix() + "/"
+    foreign = [
+        path
+        for path in modified
+        if path not in touched and not path.startswith(sparkle)
+    ]
+    if foreign:
+        log_info(
+            f"Found {len(foreign)} change(s) the build didn't make "
+            f"(e.g. {foreign[0]}), doing a full reset"
+        )
+        return False
+
+    ours = [path for path in modified if path in touched]
+    tracked = _is_tracked(ctx, ours) if ours else set()
+    added = [path for path in ours if path not in tracked]
+
+    # Paths deleted from the worktree are tracked and come back via restore
+    if tracked:
+        _git_restore(ctx, sorted(tracked))
+    for rel_path in added:
+        path = ctx.chromium_src / rel_path
+        if path.is_dir() and not path.is_symlink():
+            safe_rmtree(path)
+        else:
+            path.unlink(missing_ok=True)
+        # Drop directories the removal left empty
+        parent = path.parent
+        while parent != ctx.chromium_src and parent.exists() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+    log_success(f"Restored {len(tracked)} file(s) and removed {len(added)} added file(s)")
+    return True
+
+
 def git_reset(ctx: BuildContext) -> bool:
-    """Reset git branch and clean with exclusions"""
-    os.chdir(ctx.chromium_src)
-    run_command(["git", "reset", "--hard", "HEAD"])
-    os.chdir(ctx.root_dir)
+    """Reset git branch and clean with exclusions
+
+    Restores only the paths the pipeline touched when that is safe, and
+    falls back to reset --hard plus clean otherwise.
+    """
+    if restore_touched_paths(ctx):
+        return True
+
+    run_command(["git", "reset", "--hard", "HEAD"], cwd=ctx.chromium_src)
 
     log_info("\n🧹 Running git clean with exclusions for important directories...")
-    os.chdir(ctx.chromium_src)
     run_command(
         [
             "git",
             "clean",
             "-fdx",
-            "chrome/",
-            "components/",
+            *CLEANED_DIRS,
             "--exclude=third_party/",
             "--exclude=build_tools/",
             "--exclude=uc_staging/",
             "--exclude=buildtools/",
             "--exclude=tools/",
             "--exclude=build/",
-        ]
+        ],
+        cwd=ctx.chromium_src,
     )
-    os.chdir(ctx.root_dir)
     log_success("Git reset and clean complete")
     return True
+
+
+def _args_snapshot_path(ctx: BuildContext) -> Path:
+    return ctx.get_build_cache_dir() / f"clean_args_{ctx.architecture}.json"
+
+
+def changed_gn_args(ctx: BuildContext) -> Optional[List[str]]:
+    """GN args that differ from the last stale clean, or None on first run"""
+    snapshot = _args_snapshot_path(ctx)
+    if not snapshot.exists():
+        return None
+    try:
+        with open(snapshot, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return None
+    current = parse_gn_args(ctx.get_gn_args_file().read_text(encoding="utf-8"))
+    return sorted(
+        name
+        for name in set(previous) | set(current)
+        if previous.get(name) != current.get(name)
+    )
+
+
+def _save_args_snapshot(ctx: BuildContext) -> None:
+    snapshot = _args_snapshot_path(ctx)
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+    args = parse_gn_args(ctx.get_gn_args_file().read_text(encoding="utf-8"))
+    tmp_path = snapshot.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(args, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, snapshot)
+
+
+def clean_stale_outputs(ctx: BuildContext) -> bool:
+    """Remove outputs the current build graph no longer produces
+
+    Runs after gn gen. `ninja -t cleandead` deletes files that earlier
+    builds produced but no edge of build.ninja does anymore (targets that
+    were removed, or that changed GN args no longer build). `ninja -t
+    restat` refreshes the mtimes recorded in .ninja_log.
+
+    GN args apply to the whole build, and nothing maps an arg to the
+    targets it affects, so outputs are not removed per changed arg. The
+    changed args are only reported: an edge whose command changed with
+    them is rebuilt by ninja, which compares every command against the
+    one in .ninja_log, and outputs they drop are removed by cleandead.
+    """
+    out_path = join_paths(ctx.chromium_src, ctx.out_dir)
+    if not join_paths(out_path, "build.ninja").exists():
+        log_info("No build.ninja yet, nothing stale to clean")
+        return True
+
+    changed = changed_gn_args(ctx)
+    if changed:
+        log_info(f"GN args changed since the last clean: {', '.join(changed)}")
+        log_info("  Edges whose commands changed will be rebuilt by ninja")
+
+    ninja_cmd = "ninja.bat" if IS_WINDOWS else "ninja"
+    log_info("🧹 Removing outputs no longer in the build graph...")
+    run_command([ninja_cmd, "-C", ctx.out_dir, "-t", "cleandead"], cwd=ctx.chromium_src)
+    run_command([ninja_cmd, "-C", ctx.out_dir, "-t", "restat"], cwd=ctx.chromium_src)
+
+    _save_args_snapshot(ctx)
+    log_success("Stale outputs cleaned, everything else kept")
+    return True
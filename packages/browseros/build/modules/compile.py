@@ -3,11 +3,11 @@
 Build execution module for Nxtscape build system
 """
 
-import os
-import tempfile
 import shutil
+import subprocess
 import multiprocessing
 from pathlib import Path
+from typing import Optional
 from context import BuildContext
 from utils import (
     run_command,
@@ -15,15 +15,19 @@ from utils import (
     log_success,
     log_warning,
     join_paths,
+    write_if_changed,
     IS_WINDOWS,
     IS_MACOS,
 )
+from modules.governor import MemorySampler, plan_jobs, record_peaks
+from modules.ninja_log import report_build
+from modules.targeted import plan_targeted_build, record_build_sources
+from modules.compiler_cache import CompilerCache, report_stats, zero_stats
+from modules.progress import ninja_progress
 
 
-def build(ctx: BuildContext) -> bool:
-    """Run the actual build"""
-    log_info("\n🔨 Building Nxtscape (this will take a while)...")
-
+def write_version_file(ctx: BuildContext) -> None:
+    """Write chrome/VERSION with nxtscape_chromium_version"""
     # Create VERSION file with nxtscape_chromium_version
     if ctx.nxtscape_chromium_version:
         # Parse the nxtscape_chromium_version back into components
@@ -31,32 +35,90 @@ def build(ctx: BuildContext) -> bool:
         if len(parts) == 4:
             version_content = f"MAJOR={parts[0]}\nMINOR={parts[1]}\nBUILD={parts[2]}\nPATCH={parts[3]}"
 
-            # Create temporary VERSION file
-            with tempfile.NamedTemporaryFile(mode="w", delete=False) as temp_file:
-                temp_file.write(version_content)
-                temp_path = temp_file.name
-
-            # Copy VERSION file to chrome/VERSION
+            # Only touch chrome/VERSION when it changes, since everything
+            # that embeds the version rebuilds when its mtime moves
             chrome_version_path = join_paths(ctx.chromium_src, "chrome", "VERSION")
-            shutil.copy2(temp_path, chrome_version_path)
-
-            # Clean up temp file
-            os.unlink(temp_path)
-
-            log_info(
-                f"Created VERSION file with nxtscape_chromium_version: {ctx.nxtscape_chromium_version}"
-            )
+            if write_if_changed(chrome_version_path, version_content):
+                log_info(
+                    f"Created VERSION file with nxtscape_chromium_version: {ctx.nxtscape_chromium_version}"
+                )
+            else:
+                log_info(
+                    f"VERSION file already at nxtscape_chromium_version: {ctx.nxtscape_chromium_version}"
+                )
     else:
         log_warning("No nxtscape_chromium_version set. Not building")
 
-    os.chdir(ctx.chromium_src)
 
-    # Use default autoninja parallelism (it handles this automatically)
+def build(
+    ctx: BuildContext,
+    targeted: bool = False,
+    compiler_cache: Optional[CompilerCache] = None,
+) -> bool:
+    """Run the actual build
+
+    Args:
+        ctx: Build context
+        targeted: Dev mode: compile the targets owning files changed since
+            the last build first, then link only chrome (no chromedriver)
+        compiler_cache: Cache configured as cc_wrapper, for hit-rate stats
+    """
+    log_info("\n🔨 Building Nxtscape (this will take a while)...")
+
+    write_version_file(ctx)
+
     autoninja_cmd = "autoninja.bat" if IS_WINDOWS else "autoninja"
-    log_info("Using default autoninja parallelism")
+    cmd = [autoninja_cmd, "-C", ctx.out_dir]
+
+    # Size parallelism by memory; fall back to autoninja's own default
+    plan = plan_jobs(ctx)
+    if plan:
+        log_info(f"Memory-aware parallelism: {plan.describe()}")
+        cmd += ["-j", str(plan.jobs), "-l", str(plan.load)]
+    else:
+        log_info("Using default autoninja parallelism")
+
+    if compiler_cache:
+        zero_stats(compiler_cache)
+
+    # Peaks are recorded even if the build fails; an OOM is worth learning from
+    with MemorySampler() as sampler:
+        try:
+            if targeted:
+                # Compile the changed targets first so errors surface early
+                owners = plan_targeted_build(ctx)
+                if owners:
+                    run_command(
+                        cmd + owners, cwd=ctx.chromium_src, progress=ninja_progress()
+                    )
+                run_command(
+                    cmd + ["chrome"], cwd=ctx.chromium_src, progress=ninja_progress()
+                )
+            else:
+                # Build chrome and chromedriver on Windows
+                run_command(
+                    cmd + ["chrome", "chromedriver"],
+                    cwd=ctx.chromium_src,
+                    progress=ninja_progress(),
+                )
+        finally:
+            record_peaks(ctx, sampler.peaks)
+            if compiler_cache:
+                report_stats(compiler_cache)
+
+    # Baseline for the next targeted build. Full builds don't record one;
+    # an older baseline only makes the next targeted build compile more.
+    if targeted:
+        try:
+            record_build_sources(ctx)
+        except (subprocess.CalledProcessError, OSError) as e:
+            log_warning(f"Could not record changed sources: {e}")
 
-    # Build chrome and chromedriver on Windows
-    run_command([autoninja_cmd, "-C", ctx.out_dir, "chrome", "chromedriver"])
+    # The analysis is informational and must never fail the build
+    try:
+        report_build(ctx)
+    except Exception as e:
+        log_warning(f"Could not analyze ninja log: {e}")
 
     # Rename Chromium.app to Nxtscape.app
     app_path = ctx.get_chromium_app_path()
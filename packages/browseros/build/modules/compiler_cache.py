@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Compiler cache module for Nxtscape build system
+
+Wires ccache or sccache into the build through GN's cc_wrapper and reports
+cache hits and misses after each compile. Enabled from the build YAML:
+
+    compiler_cache:
+      tool: ccache          # or sccache
+      dir: ~/.cache/browseros-ccache
+      max_size: 50G
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from utils import log_info, log_warning, log_error
+
+
+SUPPORTED_TOOLS = ("ccache", "sccache")
+
+# Chromium's __DATE__/__TIME__ are already fixed, and patched headers are
+# often written right before compiling, which ccache would refuse to cache
+CCACHE_SLOPPINESS = "time_macros,include_file_mtime,include_file_ctime,file_macro"
+
+
+@dataclass
+class CompilerCache:
+    """Compiler cache settings from the build YAML"""
+
+    tool: str
+    cache_dir: Optional[Path] = None
+    max_size: Optional[str] = None
+
+    def gn_arg(self) -> str:
+        return f'cc_wrapper = "{self.tool}"\n'
+
+
+def load_compiler_cache(config: Optional[Dict]) -> Optional[CompilerCache]:
+    """Read the compiler_cache section of a build config"""
+    if not config or not config.get("compiler_cache"):
+        return None
+
+    section = config["compiler_cache"]
+    tool = section.get("tool", "ccache")
+    if tool not in SUPPORTED_TOOLS:
+        log_error(f"Unsupported compiler cache: {tool}")
+        raise ValueError(f"compiler_cache.tool must be one of {SUPPORTED_TOOLS}")
+    if not shutil.which(tool):
+        log_error(f"{tool} not found in PATH")
+        raise RuntimeError(f"Compiler cache {tool} is not installed")
+
+    cache_dir = section.get("dir")
+    return CompilerCache(
+        tool=tool,
+        cache_dir=Path(cache_dir).expanduser() if cache_dir else None,
+        max_size=section.get("max_size"),
+    )
+
+
+def setup_compiler_cache(cache: CompilerCache, chromium_src: Path) -> None:
+    """Export the cache environment shared by every compile of this build
+
+    Paths are rewritten relative to chromium_src and the compiler's working
+    directory is left out of the hash, so out/Default_<arch> directories
+    and fresh out dirs after a clean share cache entries.
+    """
+    if cache.tool == "ccache":
+        os.environ["CCACHE_BASEDIR"] = str(chromium_src)
+        os.environ["CCACHE_NOHASHDIR"] = "1"
+        os.environ["CCACHE_SLOPPINESS"] = CCACHE_SLOPPINESS
+        os.environ["CCACHE_CPP2"] = "yes"
+        if cache.cache_dir:
+            os.environ["CCACHE_DIR"] = str(cache.cache_dir)
+        if cache.max_size:
+            subprocess.run(
+                ["ccache", f"--max-size={cache.max_size}"],
+                capture_output=True,
+                check=False,
+            )
+    else:
+        os.environ["SCCACHE_BASEDIRS"] = str(chromium_src)
+        if cache.cache_dir:
+            os.environ["SCCACHE_DIR"] = str(cache.cache_dir)
+        if cache.max_size:
+            os.environ["SCCACHE_CACHE_SIZE"] = cache.max_size
+        # The server reads its settings on start, so restart it
+        subprocess.run(
+            ["sccache", "--stop-server"], capture_output=True, check=False
+        )
+
+    log_info(
+        f"🗃️  Using {cache.tool}"
+        + (f" at {cache.cache_dir}" if cache.cache_dir else "")
+        + (f" (max {cache.max_size})" if cache.max_size else "")
+    )
+
+
+def zero_stats(cache: CompilerCache) -> None:
+    """Reset the cache counters so stats cover only the next compile"""
+    subprocess.run([cache.tool, "--zero-stats"], capture_output=True, check=False)
+
+
+def _ccache_stats() -> Optional[Tuple[int, int]]:
+    result = subprocess.run(
+        ["ccache", "--print-stats"], capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        return None  # ccache < 4 has no machine-readable stats
+    counters = {}
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition("\t")
+        if value.strip().isdigit():
+            counters[key] = int(value)
+    hits = counters.get("direct_cache_hit", 0) + counters.get(
+        "preprocessed_cache_hit", 0
+    )
+    return hits, counters.get("cache_miss", 0)
+
+
+def _sccache_stats() -> Optional[Tuple[int, int]]:
+    result = subprocess.run(
+        ["sccache", "--show-stats", "--stats-format=json"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+    try:
+        stats = json.loads(result.stdout)["stats"]
+    except (ValueError, KeyError):
+        return None
+    hits = sum(stats.get("cache_hits", {}).get("counts", {}).values())
+    misses = sum(stats.get("cache_misses", {}).get("counts", {}).values())
+    return hits, misses
+
+
+def report_stats(cache: CompilerCache) -> Optional[Tuple[int, int]]:
+    """Print hits and misses of the compile that just finished
+
+    Returns:
+        (hits, misses), or None if the tool couldn't report them
+    """
+    stats = _ccache_stats() if cache.tool == "ccache" else _sccache_stats()
+    if stats is None:
+        log_warning(f"Could not read {cache.tool} statistics")
+        return None
+
+    hits, misses = stats
+    total = hits + misses
+    rate = 100 * hits / total if total else 0.0
+    log_info(
+        f"🗃️  {cache.tool}: {hits} hits, {misses} misses ({rate:.1f}% hit rate)"
+    )
+    return stats
+
+
+def has_cc_wrapper(args_content: str) -> bool:
+    """Whether GN args already set cc_wrapper"""
+    return re.search(r"^\s*cc_wrapper\s*=", args_content, re.MULTILINE) is not None
@@ -3,43 +3,140 @@
 Build configuration module for Nxtscape build system
 """
 
-import os
+import re
+import hashlib
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from context import BuildContext
-from utils import run_command, log_info, log_error, log_success, join_paths, IS_WINDOWS
+from utils import (
+    run_command,
+    log_info,
+    log_error,
+    log_success,
+    join_paths,
+    write_if_changed,
+    IS_WINDOWS,
+)
+from modules.governor import get_concurrent_links_arg
+from modules.compiler_cache import CompilerCache, has_cc_wrapper
 
 
-def configure(ctx: BuildContext, gn_flags_file: Optional[Path] = None) -> bool:
-    """Configure the build with GN"""
-    log_info(f"\n⚙️  Configuring {ctx.build_type} build for {ctx.architecture}...")
+def get_flags_file(ctx: BuildContext, gn_flags_file: Optional[Path] = None) -> Path:
+    """Resolve the GN flags file for this build"""
+    if gn_flags_file is None:
+        return ctx.get_gn_flags_file()
+    return join_paths(ctx.root_dir, gn_flags_file)
 
-    # Create output directory
+
+def read_gn_inputs(out_path: Path) -> List[Path]:
+    """List the GN files build.ninja was generated from (build.ninja.d)"""
+    depfile = join_paths(out_path, "build.ninja.d")
+    content = depfile.read_text(encoding="utf-8")
+    # "build.ninja: ../../BUILD.gn ../../build/config/BUILD.gn ...", where
+    # spaces inside a path are escaped with a backslash
+    _, _, deps = content.partition(": ")
+    tokens = re.split(r"(?<!\\)\s+", deps.replace("\\\n", " ").strip())
+    return [
+        join_paths(out_path, token.replace("\\ ", " ")) for token in tokens if token
+    ]
+
+
+def parse_gn_args(content: str) -> Dict[str, str]:
+    """Map of arg name to value text for the `name = value` lines of args.gn"""
+    args = {}
+    for line in content.splitlines():
+        line = line.split("#", 1)[0].strip()
+        name, sep, value = line.partition("=")
+        if sep and name.strip().isidentifier():
+            args[name.strip()] = value.strip()
+    return args
+
+
+def gn_gen_reason(ctx: BuildContext) -> Optional[str]:
+    """Why gn gen has to run, or None if build.ninja is up to date"""
     out_path = join_paths(ctx.chromium_src, ctx.out_dir)
-    out_path.mkdir(parents=True, exist_ok=True)
+    build_ninja = join_paths(out_path, "build.ninja")
+    if not build_ninja.exists():
+        return "build.ninja missing"
+    try:
+        inputs = read_gn_inputs(out_path)
+    except (OSError, UnicodeDecodeError):
+        return "build.ninja.d unreadable"
 
-    # Copy build flags
-    if gn_flags_file is None:
-        flags_file = ctx.get_gn_flags_file()
-    else:
-        flags_file = join_paths(ctx.root_dir, gn_flags_file)
+    generated = build_ninja.stat().st_mtime_ns
+    for path in [ctx.get_gn_args_file()] + inputs:
+        try:
+            if path.stat().st_mtime_ns > generated:
+                return f"{path.name} is newer than build.ninja"
+        except FileNotFoundError:
+            return f"{path} missing"
+    return None
+
+
+def render_gn_args(
+    ctx: BuildContext,
+    gn_flags_file: Optional[Path] = None,
+    compiler_cache: Optional[CompilerCache] = None,
+) -> str:
+    """Content of args.gn: the flags file plus per-build arguments"""
+    flags_file = get_flags_file(ctx, gn_flags_file)
 
     if not flags_file.exists():
         log_error(f"GN flags file not found: {flags_file}")
         raise FileNotFoundError(f"GN flags file not found: {flags_file}")
 
-    args_file = ctx.get_gn_args_file()
-
     args_content = flags_file.read_text()
     args_content += f'\ntarget_cpu = "{ctx.architecture}"\n'
+    # Cap parallel links by memory unless the flags file sets it
+    args_content += get_concurrent_links_arg(ctx, args_content)
+    if compiler_cache and not has_cc_wrapper(args_content):
+        args_content += compiler_cache.gn_arg()
+    return args_content
+
+
+def get_gn_args_digest(
+    ctx: BuildContext,
+    gn_flags_file: Optional[Path] = None,
+    compiler_cache: Optional[CompilerCache] = None,
+) -> str:
+    """Hash of the args.gn configure would write"""
+    content = render_gn_args(ctx, gn_flags_file, compiler_cache)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def configure(
+    ctx: BuildContext,
+    gn_flags_file: Optional[Path] = None,
+    compiler_cache: Optional[CompilerCache] = None,
+) -> bool:
+    """Configure the build with GN"""
+    log_info(f"\n⚙️  Configuring {ctx.build_type} build for {ctx.architecture}...")
+
+    # Create output directory
+    out_path = join_paths(ctx.chromium_src, ctx.out_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
+
+    # Copy build flags
+    args_file = ctx.get_gn_args_file()
+    args_content = render_gn_args(ctx, gn_flags_file, compiler_cache)
+
+    # Rewriting an identical args.gn would make ninja rerun gn
+    if write_if_changed(args_file, args_content):
+        log_info(f"Updated {args_file}")
 
-    args_file.write_text(args_content)
+    reason = gn_gen_reason(ctx)
+    if reason is None:
+        log_info("⏭️  Skipping gn gen: build.ninja is newer than all GN inputs")
+        log_success("Build configured")
+        return True
+    log_info(f"Running gn gen ({reason})")
 
     # Run gn gen
-    os.chdir(ctx.chromium_src)
     gn_cmd = "gn.bat" if IS_WINDOWS else "gn"
-    run_command([gn_cmd, "gen", ctx.out_dir, "--fail-on-unused-args"])
+    run_command(
+        [gn_cmd, "gen", ctx.out_dir, "--fail-on-unused-args"], cwd=ctx.chromium_src
+    )
 
     log_success("Build configured")
     return True
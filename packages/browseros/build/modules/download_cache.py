@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Download cache module for Nxtscape build system
+
+Content-addressed cache for third-party downloads (Sparkle, appimagetool).
+Files are stored by sha256, so a download is verified once and then reused
+by every build and checkout on the machine:
+
+    <cache>/urls/<sha256 of url>.json   url -> content sha256
+    <cache>/blobs/<sha256>              downloaded files
+    <cache>/trees/<sha256>/             extracted archives
+
+A download without an expected sha256 is refused unless
+BROWSEROS_TRUST_FIRST_DOWNLOAD is set. Then it is trusted on first use:
+its hash is recorded, and a later download of the same URL with different
+content is rejected, so only pin-less downloads of versioned URLs make
+sense.
+Archives are extracted while they stream in. Cached files are read-only;
+trees are placed with hardlinks (copies where the filesystem refuses them),
+or copied when the placed files get modified, e.g. by codesign.
+
+The cache lives in ~/.cache/browseros/downloads unless
+BROWSEROS_DOWNLOAD_CACHE points elsewhere.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tarfile
+import urllib.request
+from pathlib import Path
+from typing import IO, Optional
+from utils import log_info, log_success, log_warning, safe_rmtree
+
+
+DOWNLOAD_CACHE_ENV = "BROWSEROS_DOWNLOAD_CACHE"
+# Set to accept the first download of a URL that has no pinned sha256
+TRUST_FIRST_DOWNLOAD_ENV = "BROWSEROS_TRUST_FIRST_DOWNLOAD"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "browseros" / "downloads"
+
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 60
+
+
+class _HashingReader:
+    """File-like wrapper that hashes, and optionally saves, what is read"""
+
+    def __init__(self, stream: IO[bytes], copy_to: Optional[IO[bytes]] = None):
+        self.stream = stream
+        self.copy_to = copy_to
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.digest.update(data)
+        self.size += len(data)
+        if self.copy_to is not None:
+            self.copy_to.write(data)
+        return data
+
+    def drain(self) -> None:
+        """Read to the end, e.g. the padding after a tar archive"""
+        while self.read(CHUNK_SIZE):
+            pass
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        safe_rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _make_read_only(path: Path) -> None:
+    """Drop write permission from a file or every file of a tree
+
+    A placed hardlink shares its inode with the cached file, so writes
+    through it would change the cache without changing its hash.
+    """
+    paths = [path] if path.is_file() else [
+        Path(root) / name for root, _, files in os.walk(path) for name in files
+    ]
+    for file_path in paths:
+        if not file_path.is_symlink():
+            mode = file_path.stat().st_mode
+            file_path.chmod(mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def copy_file(src: Path, dst: Path) -> None:
+    """Copy a cached file into a writable file of its own"""
+    shutil.copy2(src, dst)
+    dst.chmod(dst.stat().st_mode | stat.S_IWUSR)
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink a file, or copy it where hardlinks are not possible"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        copy_file(src, dst)
+
+
+def place_tree(tree: Path, dest: Path, hardlink: bool = True) -> None:
+    """Recreate a cached tree at dest
+
+    With hardlink, files share their inode (and read-only mode) with the
+    cache, so nothing may modify them in place. Trees whose files get
+    rewritten after placing, such as signed binaries, need hardlink=False.
+    """
+    place_file = link_or_copy if hardlink else copy_file
+    dest.mkdir(parents=True, exist_ok=True)
+    for root, dirs, files in os.walk(tree):
+        rel = Path(root).relative_to(tree)
+        target_dir = dest / rel
+        for name in list(dirs):
+            src = Path(root) / name
+            if src.is_symlink():
+                # os.walk lists symlinks to directories as directories
+                dirs.remove(name)
+                files.append(name)
+            else:
+                (target_dir / name).mkdir(exist_ok=True)
+        for name in files:
+            src = Path(root) / name
+            target = target_dir / name
+            _remove(target)
+            if src.is_symlink():
+                os.symlink(os.readlink(src), target)
+            else:
+                place_file(src, target)
+
+
+class DownloadCache:
+    """Content-addressed store of downloaded files and extracted archives"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _record_path(self, url: str) -> Path:
+        return self.root / "urls" / f"{_url_key(url)}.json"
+
+    def _known_sha256(self, url: str) -> Optional[str]:
+        path = self._record_path(url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["sha256"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _record(self, url: str, sha256: str) -> None:
+        path = self._record_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "sha256": sha256}, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _expected(self, url: str, sha256: Optional[str]) -> Optional[str]:
+        """The hash a download must have: the given one, else the first seen
+
+        Raises:
+            RuntimeError: No hash is pinned or recorded, and trusting the
+                first download was not asked for
+        """
+        if sha256:
+            return sha256.lower()
+        known = self._known_sha256(url)
+        if known is None:
+            if not os.environ.get(TRUST_FIRST_DOWNLOAD_ENV):
+                raise RuntimeError(
+                    f"No pinned sha256 for {url}; pin it, or set "
+                    f"{TRUST_FIRST_DOWNLOAD_ENV}=1 to trust the first download"
+                )
+            log_warning(f"No pinned sha256 for {url}, trusting this first download")
+        return known
+
+    def _verify(self, url: str, expected: Optional[str], actual: str) -> None:
+        if expected and actual != expected:
+            raise RuntimeError(
+                f"Checksum mismatch for {url}: expected {expected}, got {actual}"
+            )
+
+    def _open(self, url: str):
+        log_info(f"📥 Downloading {url}...")
+        return urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT)
+
+    def fetch(self, url: str, sha256: Optional[str] = None) -> Path:
+        """Path of a verified download of url, downloading it if needed"""
+        expected = self._expected(url, sha256)
+        if expected:
+            blob = self.root / "blobs" / expected
+            if blob.exists():
+                log_info(f"✓ Using cached {url.rsplit('/', 1)[-1]}")
+                return blob
+
+        blobs_dir = self.root / "blobs"
+        blobs_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = blobs_dir / f".{_url_key(url)}.{os.getpid()}.tmp"
+        try:
+            with self._open(url) as response, open(tmp_path, "wb") as f:
+                reader = _HashingReader(response, copy_to=f)
+                reader.drain()
+            actual = reader.digest.hexdigest()
+            self._verify(url, expected, actual)
+            blob = blobs_dir / actual
+            _make_read_only(tmp_path)
+            os.replace(tmp_path, blob)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._record(url, actual)
+        log_success(f"Downloaded {url.rsplit('/', 1)[-1]} ({reader.size} bytes)")
+        return blob
+
+    def fetch_tree(self, url: str, sha256: Optional[str] = None) -> Path:
+        """Extracted tree of a tar archive at url, downloading it if needed
+
+        The archive is decompressed and unpacked as it downloads; only the
+        extracted tree is kept.
+        """
+        expected = self._expected(url, sha256)
+        trees_dir = self.root / "trees"
+        if expected and (trees_dir / expected).is_dir():
+            log_info(f"✓ Using cached {url.rsplit('/', 1)[-1]}")
+            return trees_dir / expected
+
+        trees_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = trees_dir / f".{_url_key(url)}.{os.getpid()}.tmp"
+        safe_rmtree(tmp_dir)
+        try:
+            with self._open(url) as response:
+                reader = _HashingReader(response)
+                # Stream mode: one sequential pass, nothing written but the tree
+                with tarfile.open(fileobj=reader, mode="r|*") as tar:
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extraction_filter = tarfile.data_filter
+                    tar.extractall(tmp_dir)
+                reader.drain()
+            actual = reader.digest.hexdigest()
+            self._verify(url, expected, actual)
+
+            tree = trees_dir / actual
+            _make_read_only(tmp_dir)
+            try:
+                os.rename(tmp_dir, tree)
+            except OSError:
+                if not tree.is_dir():
+                    raise
+                # Another build extracted the same archive meanwhile
+        finally:
+            safe_rmtree(tmp_dir)
+
+        self._record(url, actual)
+        log_success(f"Downloaded and extracted {url.rsplit('/', 1)[-1]}")
+        return tree
+
+
+def get_download_cache() -> DownloadCache:
+    """The machine-wide download cache"""
+    root = os.environ.get(DOWNLOAD_CACHE_ENV)
+    return DownloadCache(Path(root).expanduser() if root else DEFAULT_CACHE_DIR)
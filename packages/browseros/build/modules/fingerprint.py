@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Fingerprint store module for Nxtscape build system
+
+Records content hashes of the inputs and outputs of a build step so that
+the step can be skipped when nothing changed since its last successful run.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from context import BuildContext
+from utils import log_warning
+
+
+FINGERPRINT_FILE = "fingerprints.json"
+
+# One store per file so concurrent callers never overwrite each other's records
+_stores: Dict[str, "FingerprintStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def hash_file(path: Path) -> str:
+    """Return the sha256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FingerprintStore:
+    """On-disk record of input/output content hashes per build step
+
+    File hashes are cached against (size, mtime_ns), so checking an
+    unchanged step costs one stat call per file. Content is only re-read
+    when the stat result differs from the cached one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = {"files": {}, "steps": {}}
+
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._data["files"] = data.get("files", {})
+                self._data["steps"] = data.get("steps", {})
+            except (OSError, ValueError) as e:
+                log_warning(f"Ignoring unreadable fingerprint store {path}: {e}")
+
+    def file_digest(self, path: Path) -> Optional[str]:
+        """Get content hash of a file, or None if it does not exist"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        key = str(path)
+        with self._lock:
+            cached = self._data["files"].get(key)
+            if (
+                cached
+                and cached["size"] == st.st_size
+                and cached["mtime_ns"] == st.st_mtime_ns
+            ):
+                return cached["sha256"]
+
+        digest = hash_file(path)
+        with self._lock:
+            self._data["files"][key] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": digest,
+            }
+        return digest
+
+    def digest_map(self, paths: Iterable[Path]) -> Dict[str, Optional[str]]:
+        """Get content hashes for a set of files keyed by path"""
+        return {str(p): self.file_digest(Path(p)) for p in paths}
+
+    def stale_reason(
+        self,
+        step: str,
+        inputs: Iterable[Path],
+        outputs: Iterable[Path],
+        extra: str = "",
+    ) -> Optional[str]:
+        """Explain why a step must run, or return None if it is up to date
+
+        Args:
+            step: Unique step name
+            inputs: Files the step reads
+            outputs: Files the step writes
+            extra: Any non-file configuration the step depends on
+
+        Returns:
+            Human readable reason, or None when inputs and outputs match
+        """
+        with self._lock:
+            record = self._data["steps"].get(step)
+        if record is None:
+            return "no previous successful run"
+        if record.get("extra") != extra:
+            return "configuration changed"
+
+        for kind, paths in (("input", inputs), ("output", outputs)):
+            current = self.digest_map(paths)
+            previous = record.get(f"{kind}s", {})
+            if set(current) != set(previous):
+                return f"{kind} file set changed"
+            for path, digest in current.items():
+                if digest != previous[path]:
+                    state = "missing" if digest is None else "changed"
+                    return f"{kind} {state}: {path}"
+
+        return None
+
+    def record(
+        self,
+        step: str,
+        inputs: Iterable[Path],
+        outputs: Iterable[Path],
+        extra: str = "",
+    ) -> None:
+        """Record a successful run of a step and persist the store"""
+        entry = {
+            "extra": extra,
+            "inputs": self.digest_map(inputs),
+            "outputs": self.digest_map(outputs),
+        }
+        with self._lock:
+            self._data["steps"][step] = entry
+        self.save()
+
+    def invalidate(self, step: str) -> None:
+        """Forget the last successful run of a step"""
+        with self._lock:
+            removed = self._data["steps"].pop(step, None)
+        if removed is not None:
+            self.save()
+
+    def save(self) -> None:
+        """Atomically write the store to disk"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(tmp_path, self.path)
+
+
+def get_fingerprint_store(ctx: BuildContext) -> FingerprintStore:
+    """Get the shared fingerprint store for a Chromium checkout"""
+    path = ctx.get_build_cache_dir() / FINGERPRINT_FILE
+    with _stores_lock:
+        store = _stores.get(str(path))
+        if store is None:
+            store = FingerprintStore(path)
+            _stores[str(path)] = store
+        return store
@@ -3,26 +3,123 @@
 Git operations module for Nxtscape build system
 """
 
+import json
 import os
 import sys
 import subprocess
 import shutil
-import tarfile
-import urllib.request
+import time
 from pathlib import Path
+from typing import Dict, Optional
 from context import BuildContext
-from utils import run_command, log_info, log_error, log_success, IS_WINDOWS, safe_rmtree
+from utils import (
+    run_command,
+    log_info,
+    log_error,
+    log_success,
+    log_warning,
+    IS_WINDOWS,
+    safe_rmtree,
+)
+from modules.download_cache import get_download_cache, place_tree
+from modules.fingerprint import hash_file
+from modules.progress import format_duration, gclient_progress
+
+
+SYNC_STAMP_FILE = "git_sync_stamp.json"
+
+
+def _sync_stamp_path(ctx: BuildContext) -> Path:
+    return ctx.get_build_cache_dir() / SYNC_STAMP_FILE
+
+
+def _rev_parse(ctx: BuildContext, rev: str) -> Optional[str]:
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", rev],
+        text=True,
+        capture_output=True,
+        cwd=ctx.chromium_src,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def get_sync_state(ctx: BuildContext) -> Optional[Dict[str, Optional[str]]]:
+    """What a gclient sync depends on: checked-out commit, DEPS and .gclient
+
+    Returns:
+        The state, or None if HEAD is not at the configured tag
+    """
+    head = _rev_parse(ctx, "HEAD")
+    tag = _rev_parse(ctx, f"tags/{ctx.chromium_version}^{{commit}}")
+    if head is None or head != tag:
+        return None
+
+    state = {"tag": ctx.chromium_version, "commit": head}
+    # .gclient lives in the directory that contains src/
+    for name, path in (
+        ("deps", ctx.chromium_src / "DEPS"),
+        ("gclient", ctx.chromium_src.parent / ".gclient"),
+    ):
+        state[name] = hash_file(path) if path.exists() else None
+    return state
+
+
+def _load_sync_stamp(ctx: BuildContext) -> Optional[Dict]:
+    path = _sync_stamp_path(ctx)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log_warning(f"Ignoring unreadable git sync stamp: {e}")
+        return None
+
+
+def _save_sync_stamp(ctx: BuildContext, state: Dict, duration: float) -> None:
+    path = _sync_stamp_path(ctx)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**state, "duration": duration}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_synced(ctx: BuildContext) -> bool:
+    """Whether the last successful sync matches the current checkout
+
+    Logs the time the skipped fetch, checkout and sync took last time.
+    """
+    stamp = _load_sync_stamp(ctx)
+    if stamp is None:
+        return False
+    state = get_sync_state(ctx)
+    if state is None or any(stamp.get(key) != value for key, value in state.items()):
+        return False
+
+    saved = format_duration(stamp.get("duration", 0))
+    log_success(
+        f"Chromium already at {ctx.chromium_version} with DEPS synced, "
+        f"skipping fetch and gclient sync (saved ~{saved})"
+    )
+    log_info(f"   Delete {_sync_stamp_path(ctx)} to force a sync")
+    return True
 
 
 def setup_git(ctx: BuildContext) -> bool:
     """Setup git and checkout Chromium"""
     log_info(f"\n🔀 Setting up Chromium {ctx.chromium_version}...")
 
-    os.chdir(ctx.chromium_src)
+    if is_synced(ctx):
+        return True
+
+    # A sync that fails midway leaves the checkout in an unknown state
+    _sync_stamp_path(ctx).unlink(missing_ok=True)
+    start = time.monotonic()
 
     # Fetch all tags and checkout
     log_info("📥 Fetching all tags from remote...")
-    run_command(["git", "fetch", "--tags", "--force"])
+    run_command(["git", "fetch", "--tags", "--force"], cwd=ctx.chromium_src)
 
     # Verify tag exists before checkout
     result = subprocess.run(
@@ -46,16 +143,29 @@ def setup_git(ctx: BuildContext) -> bool:
         raise ValueError(f"Git tag {ctx.chromium_version} not found")
 
     log_info(f"🔀 Checking out tag: {ctx.chromium_version}")
-    run_command(["git", "checkout", f"tags/{ctx.chromium_version}"])
+    run_command(
+        ["git", "checkout", f"tags/{ctx.chromium_version}"], cwd=ctx.chromium_src
+    )
 
     # Sync dependencies
     log_info("📥 Syncing dependencies (this may take a while)...")
     # Windows gclient doesn't support --shallow flag
     if IS_WINDOWS:
-        run_command(["gclient.bat", "sync", "-D", "--no-history", "--shallow"])
+        run_command(
+            ["gclient.bat", "sync", "-D", "--no-history", "--shallow"],
+            cwd=ctx.chromium_src,
+            progress=gclient_progress(),
+        )
     else:
-        run_command(["gclient", "sync", "-D", "--no-history", "--shallow"])
+        run_command(
+            ["gclient", "sync", "-D", "--no-history", "--shallow"],
+            cwd=ctx.chromium_src,
+            progress=gclient_progress(),
+        )
 
+    state = get_sync_state(ctx)
+    if state is not None:
+        _save_sync_stamp(ctx, state, time.monotonic() - start)
     log_success("Git setup complete")
     return True
 
@@ -70,23 +180,12 @@ def setup_sparkle(ctx: BuildContext) -> bool:
     if sparkle_dir.exists():
         safe_rmtree(sparkle_dir)
 
-    sparkle_dir.mkdir(parents=True)
-
-    # Download Sparkle
-    sparkle_url = ctx.get_sparkle_url()
-    sparkle_archive = sparkle_dir / "sparkle.tar.xz"
-
-    # Download using urllib (cross-platform)
-    log_info(f"Downloading Sparkle from {sparkle_url}...")
-    urllib.request.urlretrieve(sparkle_url, sparkle_archive)
-
-    # Extract using tarfile module (cross-platform)
-    log_info("Extracting Sparkle...")
-    with tarfile.open(sparkle_archive, "r:xz") as tar:
-        tar.extractall(sparkle_dir)
-
-    # Clean up
-    sparkle_archive.unlink()
+    # Extracted while downloading, then reused from the download cache.
+    # Copied, not hardlinked: signing rewrites Sparkle's binaries in the app
+    tree = get_download_cache().fetch_tree(
+        ctx.get_sparkle_url(), ctx.SPARKLE_SHA256
+    )
+    place_tree(tree, sparkle_dir, hardlink=False)
 
     log_success("Sparkle setup complete")
     return True
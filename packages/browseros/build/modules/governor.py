@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Memory-aware parallelism governor for Nxtscape build system
+
+Sizes ninja's -j/-l from the machine's memory and core count, using the
+peak memory of compile and link processes measured during earlier builds.
+GN's concurrent_links lands in args.gn, so it only depends on total memory
+and a fixed per-link budget: a value that moved with the measurements
+would regenerate the build files and change every args.gn-keyed cache.
+"""
+
+import json
+import os
+import re
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from context import BuildContext
+from utils import log_warning, IS_LINUX, IS_MACOS
+
+
+HISTORY_FILE = "memory_history.json"
+HISTORY_SAMPLES = 5
+
+GIB_KB = 1024 * 1024
+
+# Peak memory per job when no build has been measured yet
+DEFAULT_PEAK_KB = {"compile": int(1.5 * GIB_KB), "link": 10 * GIB_KB}
+
+# Measured peaks are padded to leave room for heavier-than-seen jobs
+PEAK_MARGIN = 1.2
+
+# Share of memory links may claim when sizing concurrent_links
+LINK_MEMORY_SHARE = 0.5
+
+# Memory assumed per link when sizing concurrent_links; fixed on purpose
+LINK_BUDGET_KB = 10 * GIB_KB
+
+# Process names (as in /proc/<pid>/status) counted for each job class
+JOB_PROCESSES = {
+    "compile": ("clang", "clang++", "clang-cl"),
+    "link": ("ld.lld", "lld", "lld-link", "ld64.lld"),
+}
+
+SAMPLE_INTERVAL = 2.0
+
+
+@dataclass
+class JobPlan:
+    """Parallelism chosen for one build"""
+
+    jobs: int
+    load: int
+    links: int
+    compile_peak_kb: int
+    link_peak_kb: int
+
+    def describe(self) -> str:
+        return (
+            f"-j {self.jobs} -l {self.load}, concurrent_links = {self.links} "
+            f"(compile {self.compile_peak_kb / GIB_KB:.1f} GiB/job, "
+            f"link {self.link_peak_kb / GIB_KB:.1f} GiB/job)"
+        )
+
+
+def read_meminfo() -> Optional[Dict[str, int]]:
+    """Total and available memory in kB, or None if unknown on this platform"""
+    if IS_LINUX:
+        try:
+            values = {}
+            with open("/proc/meminfo", "r", encoding="utf-8") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    values[key] = int(rest.split()[0])
+            return {
+                "total": values["MemTotal"],
+                "available": values.get("MemAvailable", values["MemFree"]),
+            }
+        except (OSError, KeyError, ValueError, IndexError):
+            return None
+
+    if IS_MACOS:
+        try:
+            result = subprocess.run(
+                ["sysctl", "-n", "hw.memsize"], capture_output=True, text=True
+            )
+            total = int(result.stdout.strip()) // 1024
+        except (OSError, ValueError):
+            return None
+        # macOS has no direct MemAvailable; compressed memory makes total
+        # a reasonable approximation for a dedicated build machine
+        return {"total": total, "available": total}
+
+    return None
+
+
+def _history_path(ctx: BuildContext) -> Path:
+    return ctx.get_build_cache_dir() / HISTORY_FILE
+
+
+def load_history(ctx: BuildContext) -> Dict[str, List[int]]:
+    """Peak memory per job class from recent builds"""
+    path = _history_path(ctx)
+    if not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log_warning(f"Ignoring unreadable memory history {path}: {e}")
+        return {}
+
+
+def record_peaks(ctx: BuildContext, peaks: Dict[str, int]) -> None:
+    """Append measured peaks to the history, keeping the last few builds"""
+    if not any(peaks.values()):
+        return
+    history = load_history(ctx)
+    for job_class, peak_kb in peaks.items():
+        if peak_kb > 0:
+            samples = history.get(job_class, []) + [peak_kb]
+            history[job_class] = samples[-HISTORY_SAMPLES:]
+
+    path = _history_path(ctx)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _peak_kb(history: Dict[str, List[int]], job_class: str) -> int:
+    samples = history.get(job_class)
+    if not samples:
+        return DEFAULT_PEAK_KB[job_class]
+    return int(max(samples) * PEAK_MARGIN)
+
+
+def _reserve_kb(total_kb: int) -> int:
+    """Memory kept for the OS, page cache and the build scripts"""
+    return max(4 * GIB_KB, total_kb // 10)
+
+
+def concurrent_links(total_kb: int, cpus: int) -> int:
+    """concurrent_links for a machine, from total memory in whole GiB only"""
+    total_kb = total_kb // GIB_KB * GIB_KB
+    budget = (total_kb - _reserve_kb(total_kb)) * LINK_MEMORY_SHARE
+    links = int(budget // LINK_BUDGET_KB)
+    return max(1, min(cpus, links))
+
+
+def compute_plan(
+    meminfo: Dict[str, int], cpus: int, history: Dict[str, List[int]]
+) -> JobPlan:
+    """Parallelism for given memory, cores and measured peaks"""
+    compile_peak = _peak_kb(history, "compile")
+    link_peak = _peak_kb(history, "link")
+    links = concurrent_links(meminfo["total"], cpus)
+
+    # Compiles share what is available now with links running alongside,
+    # sized by what links were measured to need
+    reserve = _reserve_kb(meminfo["total"])
+    budget = meminfo["available"] - reserve - links * link_peak
+    jobs = max(1, min(cpus, budget // compile_peak))
+
+    return JobPlan(
+        jobs=int(jobs),
+        load=cpus,
+        links=links,
+        compile_peak_kb=compile_peak,
+        link_peak_kb=link_peak,
+    )
+
+
+def plan_jobs(ctx: BuildContext) -> Optional[JobPlan]:
+    """Choose -j, -l and concurrent_links for this machine
+
+    Returns:
+        JobPlan, or None when memory can't be read (autoninja defaults apply)
+    """
+    meminfo = read_meminfo()
+    if meminfo is None:
+        return None
+    return compute_plan(meminfo, os.cpu_count() or 1, load_history(ctx))
+
+
+def get_concurrent_links_arg(ctx: BuildContext, flags_content: str) -> str:
+    """GN args line setting concurrent_links, or "" if not applicable"""
+    if re.search(r"^\s*concurrent_links\s*=", flags_content, re.MULTILINE):
+        return ""
+    meminfo = read_meminfo()
+    if meminfo is None:
+        return ""
+    links = concurrent_links(meminfo["total"], os.cpu_count() or 1)
+    return f"concurrent_links = {links}\n"
+
+
+class MemorySampler:
+    """Tracks peak resident memory of compiler and linker processes
+
+    Reads VmHWM (peak RSS) from /proc while the build runs. Only Linux
+    exposes this; elsewhere the sampler records nothing.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peaks = {job_class: 0 for job_class in JOB_PROCESSES}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        try:
+            entries = os.scandir("/proc")
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry.name}/status", "r") as f:
+                        status = f.read()
+                except OSError:
+                    continue  # Process exited while scanning
+
+                name_match = re.search(r"^Name:\s*(\S+)", status, re.MULTILINE)
+                hwm_match = re.search(r"^VmHWM:\s*(\d+)", status, re.MULTILINE)
+                if not name_match or not hwm_match:
+                    continue
+                for job_class, names in JOB_PROCESSES.items():
+                    if name_match.group(1) in names:
+                        peak = int(hwm_match.group(1))
+                        if peak > self.peaks[job_class]:
+                            self.peaks[job_class] = peak
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "MemorySampler":
+        if IS_LINUX:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Build journal module for Nxtscape build system
+
+Persists which pipeline steps completed, with the artifacts they left
+behind, so an interrupted or failed build can resume where it stopped.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils import log_info, log_warning
+
+
+JOURNAL_FILE = "build_journal.json"
+
+
+def _stat_file(path: Path) -> Optional[Dict]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _directory_markers(path: Path) -> List[Path]:
+    """Files whose stats stand for a directory artifact
+
+    For a macOS bundle: Info.plist, the code signature and the
+    executables in Contents/MacOS, which a rebuild, a re-sign or an
+    interrupted copy all change. Otherwise the directory's own files.
+    """
+    contents = path / "Contents"
+    if (contents / "Info.plist").exists():
+        markers = [
+            contents / "Info.plist",
+            contents / "_CodeSignature" / "CodeResources",
+        ]
+        macos_dir = contents / "MacOS"
+        if macos_dir.is_dir():
+            markers += sorted(macos_dir.iterdir())
+        return markers
+    return sorted(child for child in path.iterdir() if not child.is_dir())
+
+
+def _stat_artifact(path: Path) -> Optional[Dict]:
+    """Record enough about an artifact to tell later whether it changed"""
+    if not path.is_dir():
+        return _stat_file(path)
+    return {
+        "dir": True,
+        "markers": {
+            marker.relative_to(path).as_posix(): _stat_file(marker)
+            for marker in _directory_markers(path)
+        },
+    }
+
+
+class BuildJournal:
+    """Per-build record of completed steps and their artifacts
+
+    The journal is tied to a build key (versions, architectures and enabled
+    steps). Resuming with a different key starts a fresh journal.
+    """
+
+    def __init__(self, path: Path, build_key: Dict, resume: bool = False):
+        self.path = path
+        self.build_key = build_key
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict] = {}
+
+        if resume:
+            self._load()
+        self.save()
+
+    def _load(self) -> None:
+        """Load a previous journal if it belongs to the same build"""
+        if not self.path.exists():
+            log_warning(f"No build journal at {self.path}, starting from scratch")
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log_warning(f"Ignoring unreadable build journal: {e}")
+            return
+
+        if data.get("build_key") != self.build_key:
+            log_warning("Build journal belongs to a different build, starting from scratch")
+            return
+
+        self._steps = data.get("steps", {})
+        log_info(f"📒 Resuming build: {len(self._steps)} step(s) completed previously")
+
+    def completed_intact(self, step: str) -> Optional[str]:
+        """Check a journaled step's artifacts
+
+        Returns:
+            None if the step completed and its artifacts are intact,
+            otherwise the reason it must run again
+        """
+        with self._lock:
+            entry = self._steps.get(step)
+        if entry is None:
+            return "not completed in previous run"
+
+        for path, recorded in entry.get("artifacts", {}).items():
+            current = _stat_artifact(Path(path))
+            if current is None:
+                return f"artifact missing: {path}"
+            if current != recorded:
+                return f"artifact changed: {path}"
+        return None
+
+    def record(self, step: str, artifacts: List[Path]) -> None:
+        """Mark a step complete along with the artifacts it produced"""
+        recorded = {}
+        for path in artifacts:
+            stat = _stat_artifact(Path(path))
+            if stat is not None:
+                recorded[str(path)] = stat
+
+        with self._lock:
+            self._steps[step] = {"completed_at": time.time(), "artifacts": recorded}
+        self.save()
+
+    def save(self) -> None:
+        """Atomically write the journal to disk"""
+        with self._lock:
+            data = {"build_key": self.build_key, "steps": self._steps}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
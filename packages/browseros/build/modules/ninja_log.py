@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Ninja log analyzer for Nxtscape build system
+
+Reads out/Default_<arch>/.ninja_log after a build and reports the critical
+path, the slowest targets and time per directory of the latest build,
+compared with the previous build's summary.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from context import BuildContext
+from utils import log_info, log_warning, join_paths
+
+
+NINJA_LOG = ".ninja_log"
+TOP_N = 20
+
+
+@dataclass
+class Edge:
+    """One command ninja ran, with every output it produced"""
+
+    start_ms: int
+    end_ms: int
+    cmd_hash: str
+    outputs: List[str] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> int:
+        return self.end_ms - self.start_ms
+
+    @property
+    def name(self) -> str:
+        return self.outputs[0] if self.outputs else self.cmd_hash
+
+
+@dataclass
+class LogState:
+    """Position in .ninja_log and the entries of the build being read
+
+    A new build is detected when entry end times go backwards, since ninja
+    times each build from its own start.
+    """
+
+    inode: int = 0
+    offset: int = 0
+    last_end: int = -1
+    entries: Dict[str, List] = field(default_factory=dict)  # output -> entry
+
+    def to_json(self) -> Dict:
+        return {
+            "inode": self.inode,
+            "offset": self.offset,
+            "last_end": self.last_end,
+            "entries": self.entries,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "LogState":
+        return cls(
+            inode=data.get("inode", 0),
+            offset=data.get("offset", 0),
+            last_end=data.get("last_end", -1),
+            entries=data.get("entries", {}),
+        )
+
+
+def read_ninja_log(
+    log_path: Path, state: LogState, new_build: bool = False
+) -> Tuple[LogState, bool]:
+    """Parse entries appended to .ninja_log since the last read
+
+    Ninja recompacts the log from time to time, rewriting it smaller; a
+    replaced or shrunken file is re-read from the start.
+
+    Args:
+        log_path: Path to .ninja_log
+        state: State returned by the previous read
+        new_build: Treat appended entries as a new build. End times only
+            reveal a boundary when the new build's first edge finishes
+            earlier than the previous build's last one.
+
+    Returns:
+        Updated state and whether any new entries were read
+    """
+    st = os.stat(log_path)
+    if st.st_ino != state.inode or st.st_size < state.offset:
+        state = LogState(inode=st.st_ino)
+
+    with open(log_path, "rb") as f:
+        f.seek(state.offset)
+        data = f.read()
+
+    # Ninja may be mid-write; leave a partial last line for the next read
+    complete = data[: data.rfind(b"\n") + 1]
+    state.offset += len(complete)
+
+    new_entries = False
+    for raw_line in complete.decode("utf-8", errors="replace").splitlines():
+        if not raw_line or raw_line.startswith("#"):
+            continue
+        parts = raw_line.split("\t")
+        if len(parts) < 5:
+            continue
+        try:
+            start, end = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        if end < state.last_end or (new_build and not new_entries):
+            state.entries = {}
+        state.last_end = end
+        state.entries[parts[3]] = [start, end, parts[4]]
+        new_entries = True
+
+    return state, new_entries
+
+
+def group_edges(entries: Dict[str, List]) -> List[Edge]:
+    """Combine outputs written by the same command into one edge"""
+    edges: Dict[Tuple[int, int, str], Edge] = {}
+    for output, (start, end, cmd_hash) in entries.items():
+        key = (start, end, cmd_hash)
+        if key not in edges:
+            edges[key] = Edge(start, end, cmd_hash)
+        edges[key].outputs.append(output)
+    for edge in edges.values():
+        edge.outputs.sort()
+    return sorted(edges.values(), key=lambda e: (e.end_ms, e.start_ms))
+
+
+def weighted_durations(edges: List[Edge]) -> Dict[str, float]:
+    """Split wall time between the edges running at each moment
+
+    An edge that ran alone for 10s gets 10s; one of ten edges sharing those
+    10s gets 1s. This reflects how much an edge held up the build better
+    than its raw duration does.
+    """
+    events = []
+    for index, edge in enumerate(edges):
+        events.append((edge.start_ms, 1, index))
+        events.append((edge.end_ms, 0, index))
+    events.sort()
+
+    weighted = [0.0] * len(edges)
+    running = set()
+    last_time = 0
+    for time_ms, is_start, index in events:
+        if running:
+            share = (time_ms - last_time) / len(running)
+            for running_index in running:
+                weighted[running_index] += share
+        last_time = time_ms
+        if is_start:
+            running.add(index)
+        else:
+            running.discard(index)
+
+    return {edge.name: weighted[i] for i, edge in enumerate(edges)}
+
+
+def critical_path(edges: List[Edge]) -> List[Edge]:
+    """Estimate the critical path from timings alone
+
+    Starting from the edge that finished last, repeatedly step to the edge
+    that finished most recently before the current one started. Without
+    the dependency graph this is a heuristic, but the edge that unblocked a
+    step is almost always the last one to finish before it.
+    """
+    if not edges:
+        return []
+    by_end = sorted(edges, key=lambda e: e.end_ms)
+    path = [by_end[-1]]
+    position = len(by_end) - 1
+    while True:
+        current = path[-1]
+        candidate = None
+        while position > 0:
+            position -= 1
+            if by_end[position].end_ms <= current.start_ms:
+                candidate = by_end[position]
+                break
+        if candidate is None:
+            break
+        path.append(candidate)
+    path.reverse()
+    return path
+
+
+def target_directory(output: str) -> str:
+    """Source directory an output belongs to (obj/ and gen/ stripped)"""
+    parts = output.replace("\\", "/").split("/")
+    if parts and parts[0] in ("obj", "gen"):
+        parts = parts[1:]
+    return "/".join(parts[:-1]) or "."
+
+
+def summarize(entries: Dict[str, List], top_n: int = TOP_N) -> Dict:
+    """Summarize one build's ninja log entries"""
+    edges = group_edges(entries)
+    weighted = weighted_durations(edges)
+
+    directories: Dict[str, Dict[str, float]] = {}
+    for edge in edges:
+        directory = directories.setdefault(
+            target_directory(edge.name), {"time_s": 0.0, "weighted_s": 0.0}
+        )
+        directory["time_s"] += edge.duration_ms / 1000
+        directory["weighted_s"] += weighted[edge.name] / 1000
+
+    slowest = sorted(edges, key=lambda e: e.duration_ms, reverse=True)[:top_n]
+    path = critical_path(edges)
+    wall_ms = (
+        max(e.end_ms for e in edges) - min(e.start_ms for e in edges) if edges else 0
+    )
+
+    return {
+        "edges": len(edges),
+        "wall_s": wall_ms / 1000,
+        "cpu_s": sum(e.duration_ms for e in edges) / 1000,
+        "critical_path": [
+            {"target": e.name, "time_s": e.duration_ms / 1000} for e in path
+        ],
+        "critical_path_s": sum(e.duration_ms for e in path) / 1000,
+        "slowest": [
+            {
+                "target": e.name,
+                "time_s": e.duration_ms / 1000,
+                "weighted_s": weighted[e.name] / 1000,
+            }
+            for e in slowest
+        ],
+        "directories": {
+            name: {key: round(value, 3) for key, value in times.items()}
+            for name, times in sorted(
+                directories.items(), key=lambda item: -item[1]["weighted_s"]
+            )
+        },
+    }
+
+
+def diff_summaries(previous: Dict, current: Dict, top_n: int = TOP_N) -> Dict:
+    """Compare two build summaries"""
+    previous_targets = {t["target"]: t["time_s"] for t in previous.get("slowest", [])}
+    target_changes = []
+    for target in current.get("slowest", []):
+        before = previous_targets.get(target["target"])
+        target_changes.append(
+            {
+                "target": target["target"],
+                "time_s": target["time_s"],
+                "delta_s": None if before is None else target["time_s"] - before,
+            }
+        )
+
+    previous_dirs = previous.get("directories", {})
+    current_dirs = current.get("directories", {})
+    dir_changes = []
+    for name in set(previous_dirs) | set(current_dirs):
+        before = previous_dirs.get(name, {}).get("weighted_s", 0.0)
+        after = current_dirs.get(name, {}).get("weighted_s", 0.0)
+        dir_changes.append(
+            {"directory": name, "weighted_s": after, "delta_s": after - before}
+        )
+    dir_changes.sort(key=lambda change: -abs(change["delta_s"]))
+
+    return {
+        "wall_delta_s": current.get("wall_s", 0) - previous.get("wall_s", 0),
+        "critical_path_delta_s": current.get("critical_path_s", 0)
+        - previous.get("critical_path_s", 0),
+        "edges_delta": current.get("edges", 0) - previous.get("edges", 0),
+        "targets": target_changes,
+        "directories": dir_changes[:top_n],
+    }
+
+
+def _delta(seconds: Optional[float]) -> str:
+    return "new" if seconds is None else f"{seconds:+.1f}s"
+
+
+def format_report(
+    summary: Dict, diff: Optional[Dict] = None, top_n: int = 10
+) -> List[str]:
+    """Render a summary (and its diff against the previous build) as text"""
+    lines = [
+        f"📊 Ninja build: {summary['edges']} edges, {summary['wall_s']:.1f}s wall, "
+        f"{summary['cpu_s']:.1f}s CPU",
+    ]
+    if diff:
+        lines[0] += (
+            f" ({_delta(diff['wall_delta_s'])} wall vs previous build, "
+            f"{diff['edges_delta']:+d} edges)"
+        )
+
+    path = summary["critical_path"]
+    lines.append(
+        f"\nCritical path: {len(path)} edges, {summary['critical_path_s']:.1f}s"
+        + (f" ({_delta(diff['critical_path_delta_s'])})" if diff else "")
+    )
+    for step in sorted(path, key=lambda s: -s["time_s"])[:top_n]:
+        lines.append(f"  {step['time_s']:8.1f}s  {step['target']}")
+
+    lines.append("\nSlowest targets:")
+    changes = {t["target"]: t["delta_s"] for t in diff["targets"]} if diff else {}
+    for target in summary["slowest"][:top_n]:
+        suffix = f"  ({_delta(changes[target['target']])})" if diff else ""
+        lines.append(f"  {target['time_s']:8.1f}s  {target['target']}{suffix}")
+
+    lines.append("\nTime per directory (weighted by parallelism):")
+    for name, times in list(summary["directories"].items())[:top_n]:
+        lines.append(f"  {times['weighted_s']:8.1f}s  {name}")
+
+    if diff and diff["directories"]:
+        lines.append("\nLargest changes per directory:")
+        for change in diff["directories"][:top_n]:
+            lines.append(f"  {change['delta_s']:+8.1f}s  {change['directory']}")
+
+    return lines
+
+
+def _load_json(path: Path) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log_warning(f"Ignoring unreadable {path}: {e}")
+        return None
+
+
+def _save_json(path: Path, data: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def analyze_ninja_log(
+    log_path: Path, cache_dir: Path, top_n: int = TOP_N
+) -> Optional[Dict]:
+    """Summarize the latest build in a ninja log and diff it with the last
+
+    Keeps parse state, the latest summary and the one before it in
+    cache_dir, so each call only reads what ninja appended.
+
+    Returns:
+        {"summary": ..., "diff": ...} for the latest build, or None if
+        ninja ran nothing since the last analysis
+    """
+    state_path = cache_dir / "ninja_log_state.json"
+    summary_path = cache_dir / "ninja_summary.json"
+
+    saved = _load_json(state_path)
+    state = LogState.from_json(saved) if saved else LogState()
+    state, new_entries = read_ninja_log(log_path, state, new_build=True)
+    _save_json(state_path, state.to_json())
+    if not new_entries:
+        return None
+
+    summary = summarize(state.entries, top_n)
+    previous = _load_json(summary_path)
+    previous_summary = previous.get("summary") if previous else None
+    diff = None
+    if previous_summary:
+        diff = diff_summaries(previous_summary, summary, top_n)
+
+    report = {"summary": summary, "diff": diff}
+    _save_json(summary_path, report)
+    return report
+
+
+def report_build(ctx: BuildContext, top_n: int = TOP_N) -> Optional[Dict]:
+    """Analyze the ninja log of a context's output directory after a build"""
+    log_path = join_paths(ctx.chromium_src, ctx.out_dir, NINJA_LOG)
+    if not log_path.exists():
+        log_warning(f"No ninja log at {log_path}")
+        return None
+
+    cache_dir = join_paths(ctx.get_build_cache_dir(), f"ninja_{ctx.architecture}")
+    report = analyze_ninja_log(log_path, cache_dir, top_n)
+    if report is None:
+        log_info("📊 Ninja had no work to do")
+        return None
+
+    for line in format_report(report["summary"], report["diff"]):
+        log_info(line)
+    log_info(f"Full report: {cache_dir / 'ninja_summary.json'}")
+    return report
@@ -19,6 +19,36 @@ from utils import (
     safe_rmtree,
     join_paths,
 )
+from modules.download_cache import copy_file, get_download_cache
+
+
+# A tagged release, so the content behind the URL never changes
+APPIMAGETOOL_VERSION = "13"
+APPIMAGETOOL_URL = f"https://github.com/AppImage/AppImageKit/releases/download/{APPIMAGETOOL_VERSION}/appimagetool-x86_64.AppImage"
+# sha256 of the release asset. Not pinned yet: until it is, the download is
+# refused unless BROWSEROS_TRUST_FIRST_DOWNLOAD is set (see download_cache)
+APPIMAGETOOL_SHA256 = ""
+
+# Files and directories from the out dir that make up the browser (besides
+# the browser binary itself, ctx.NXTSCAPE_APP_NAME)
+BROWSER_FILES = [
+    "chrome_crashpad_handler",
+    "chrome_sandbox",
+    "chromedriver",
+    "libEGL.so",
+    "libGLESv2.so",
+    "libvk_swiftshader.so",
+    "libvulkan.so.1",
+    "vk_swiftshader_icd.json",
+    "icudtl.dat",
+    "snapshot_blob.bin",
+    "v8_context_snapshot.bin",
+    "chrome_100_percent.pak",
+    "chrome_200_percent.pak",
+    "resources.pak",
+]
+
+BROWSER_DIRS = ["locales", "MEIPreload", "BrowserOSServer"]
 
 
 # =============================================================================
@@ -42,23 +72,7 @@ def copy_browser_files(
     target_dir.mkdir(parents=True, exist_ok=True)
     out_dir = join_paths(ctx.chromium_src, ctx.out_dir)
 
-    files_to_copy = [
-        ctx.NXTSCAPE_APP_NAME,
-        "chrome_crashpad_handler",
-        "chrome_sandbox",
-        "chromedriver",
-        "libEGL.so",
-        "libGLESv2.so",
-        "libvk_swiftshader.so",
-        "libvulkan.so.1",
-        "vk_swiftshader_icd.json",
-        "icudtl.dat",
-        "snapshot_blob.bin",
-        "v8_context_snapshot.bin",
-        "chrome_100_percent.pak",
-        "chrome_200_percent.pak",
-        "resources.pak",
-    ]
+    files_to_copy = [ctx.NXTSCAPE_APP_NAME] + BROWSER_FILES
 
     for file in files_to_copy:
         src = join_paths(out_dir, file)
@@ -68,8 +82,7 @@ def copy_browser_files(
         else:
             log_warning(f"  ⚠ File not found: {file}")
 
-    dirs_to_copy = ["locales", "MEIPreload", "BrowserOSServer"]
-    for dir_name in dirs_to_copy:
+    for dir_name in BROWSER_DIRS:
         src = join_paths(out_dir, dir_name)
         if Path(src).exists():
             shutil.copytree(src, join_paths(target_dir, dir_name), dirs_exist_ok=True)
@@ -211,24 +224,19 @@ def download_appimagetool(ctx: BuildContext) -> Optional[Path]:
 
     tool_path = Path(join_paths(tool_dir, "appimagetool-x86_64.AppImage"))
 
-    if tool_path.exists():
-        log_info("✓ appimagetool already available")
-        return tool_path
-
-    log_info("📥 Downloading appimagetool...")
-    url = "https://github.com/AppImage/AppImageKit/releases/download/continuous/appimagetool-x86_64.AppImage"
-
-    cmd = ["wget", "-O", str(tool_path), url]
-    result = run_command(cmd, check=False)
-
-    if result.returncode == 0:
-        tool_path.chmod(0o755)
-        log_success("✓ Downloaded appimagetool")
-        return tool_path
-    else:
-        log_error("Failed to download appimagetool")
+    try:
+        cached = get_download_cache().fetch(APPIMAGETOOL_URL, APPIMAGETOOL_SHA256)
+    except (OSError, RuntimeError) as e:
+        log_error(f"Failed to download appimagetool: {e}")
         return None
 
+    # A copy: the cached blob is read-only and chmod would change it too
+    tool_path.unlink(missing_ok=True)
+    copy_file(cached, tool_path)
+    tool_path.chmod(0o755)
+    log_info("✓ appimagetool available")
+    return tool_path
+
 
 def create_appimage(ctx: BuildContext, appdir: Path, output_path: Path) -> bool:
     """Create AppImage from AppDir"""
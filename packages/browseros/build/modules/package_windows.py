@@ -20,6 +20,7 @@ from utils import (
     join_paths,
     IS_WINDOWS,
 )
+from modules.progress import ninja_progress
 
 
 def package(ctx: BuildContext) -> bool:
@@ -76,16 +77,8 @@ def build_mini_installer(ctx: BuildContext) -> bool:
             "mini_installer",
         ]
 
-        # Change to chromium_src directory before running (like compile.py does)
-        import os
-
-        old_cwd = os.getcwd()
-        os.chdir(ctx.chromium_src)
-
-        try:
-            run_command(cmd)
-        finally:
-            os.chdir(old_cwd)
+        # Run from chromium_src without changing the process-wide cwd
+        run_command(cmd, cwd=ctx.chromium_src, progress=ninja_progress())
 
         # Verify the file was created
         if mini_installer_path.exists():
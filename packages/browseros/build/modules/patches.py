@@ -59,6 +59,55 @@ def apply_patches_with_dev_cli(
     return True
 
 
+# Marker files dev_cli extract writes next to patches for deleted, binary
+# and purely renamed files
+PATCH_MARKER_SUFFIXES = (".deleted", ".binary", ".rename")
+
+
+def _find_patch_markers(patches_dir: Path) -> List[Path]:
+    if not patches_dir.exists():
+        return []
+    return sorted(
+        p
+        for p in patches_dir.rglob("*")
+        if p.is_file()
+        and p.name.endswith(PATCH_MARKER_SUFFIXES)
+        and not p.name.startswith(".")
+    )
+
+
+def _marker_targets(ctx: BuildContext, patches_dir: Path, marker: Path) -> List[Path]:
+    """chromium_src files a marker refers to"""
+    targets = [ctx.chromium_src / marker.relative_to(patches_dir).with_suffix("")]
+    if marker.suffix == ".rename":
+        try:
+            content = marker.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return targets
+        for line in content.splitlines():
+            if line.startswith("Renamed from: "):
+                targets.append(ctx.chromium_src / line[len("Renamed from: "):].strip())
+    return targets
+
+
+def get_patch_fingerprint_paths(ctx: BuildContext) -> Tuple[List[Path], List[Path]]:
+    """List the patch and marker files and the chromium_src files they produce
+
+    Files removed by a marker fingerprint as missing, so restoring one
+    makes the step run again.
+    """
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from modules.dev_cli.apply import find_patch_files
+
+    patches_dir = ctx.get_dev_patches_dir()
+    patch_files = find_patch_files(patches_dir)
+    markers = _find_patch_markers(patches_dir)
+    targets = [ctx.chromium_src / p.relative_to(patches_dir) for p in patch_files]
+    for marker in markers:
+        targets += _marker_targets(ctx, patches_dir, marker)
+    return patch_files + markers, targets
+
+
 def apply_patches(
     ctx: BuildContext, interactive: bool = False, commit_each: bool = False
 ) -> bool:
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Build pipeline module for Nxtscape build system
+
+Expresses the build as a DAG of steps. Steps that declare their inputs and
+outputs are skipped when the fingerprint store shows neither changed since
+the step last succeeded. Independent steps can run concurrently, so one
+architecture can be signed, packaged and uploaded while the next compiles,
+and source preparation steps that write disjoint paths run side by side.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Union
+from utils import (
+    log_info,
+    log_success,
+    log_warning,
+    log_error,
+    capture_output,
+    print_block,
+    log_context,
+    log_event,
+    terminate_commands,
+)
+from modules.fingerprint import FingerprintStore
+from modules.journal import BuildJournal
+
+
+# Steps running right now, across pipelines
+_running_steps = 0
+_running_lock = threading.Lock()
+
+
+def running_steps() -> int:
+    """Number of pipeline steps currently running in this process"""
+    return _running_steps
+
+
+@dataclass
+class Step:
+    """A single unit of work in the build pipeline"""
+
+    name: str
+    run: Callable[[], object]
+    deps: List[str] = field(default_factory=list)
+    # Ordering only: wait for these steps but don't depend on their outcome
+    after: List[str] = field(default_factory=list)
+    inputs: Optional[Callable[[], List[Path]]] = None
+    outputs: Optional[Callable[[], List[Path]]] = None
+    # Non-file configuration; a callable is evaluated when it is checked
+    extra: Union[str, Callable[[], str]] = ""
+    enabled: bool = True
+    artifacts: Optional[Callable[[], List[Path]]] = None
+    # Files or directories the step writes. Steps declaring overlapping
+    # write sets never run at the same time and keep registration order.
+    writes: Optional[Callable[[], List[Path]]] = None
+    # Print the step's console output as one block once it finishes
+    group_output: bool = False
+
+    @property
+    def fingerprinted(self) -> bool:
+        """Whether the step declares files to fingerprint"""
+        return self.inputs is not None or self.outputs is not None
+
+    def input_paths(self) -> List[Path]:
+        return self.inputs() if self.inputs else []
+
+    def output_paths(self) -> List[Path]:
+        return self.outputs() if self.outputs else []
+
+    def extra_value(self) -> str:
+        return self.extra() if callable(self.extra) else self.extra
+
+
+@dataclass
+class StepResult:
+    """Outcome of a step for the build summary"""
+
+    status: str  # "ran", "skipped", "resumed", "disabled", "failed", "blocked"
+    reason: str
+    duration: float = 0.0
+
+
+class Pipeline:
+    """Runs steps in dependency order, skipping unchanged ones"""
+
+    def __init__(
+        self,
+        store: Optional[FingerprintStore] = None,
+        force: bool = False,
+        journal: Optional[BuildJournal] = None,
+        max_workers: int = 1,
+    ):
+        self.store = store
+        self.force = force
+        self.journal = journal
+        self.max_workers = max(1, max_workers)
+        self.steps: Dict[str, Step] = {}
+        self.results: Dict[str, StepResult] = {}
+        self._write_sets: Dict[str, Set[str]] = {}
+
+    def add(self, step: Step) -> Step:
+        """Register a step; dependencies must be registered first"""
+        if step.name in self.steps:
+            raise ValueError(f"Duplicate pipeline step: {step.name}")
+        for dep in step.deps + step.after:
+            if dep not in self.steps:
+                raise ValueError(f"Step {step.name} depends on unknown step {dep}")
+        self.steps[step.name] = step
+        return step
+
+    def order(self) -> List[Step]:
+        """Topological order, preferring registration order among ready steps"""
+        remaining = list(self.steps.values())
+        done = set()
+        ordered = []
+        while remaining:
+            for step in remaining:
+                if all(dep in done for dep in step.deps + step.after):
+                    break
+            else:
+                raise ValueError("Pipeline has a dependency cycle")
+            remaining.remove(step)
+            done.add(step.name)
+            ordered.append(step)
+        return ordered
+
+    def stale_reason(self, step: Step) -> Optional[str]:
+        """Why a step has to run, or None if it can be skipped"""
+        if not step.fingerprinted:
+            return "not fingerprinted"
+        if self.force:
+            return "forced"
+        if self.store is None:
+            return "no fingerprint store"
+        return self.store.stale_reason(
+            step.name, step.input_paths(), step.output_paths(), step.extra_value()
+        )
+
+    def resume_reason(self, step: Step) -> Optional[str]:
+        """Why a step cannot be resumed from the journal, or None if it can
+
+        A step resumes only if it completed previously with intact artifacts
+        and none of its dependencies, direct or transitive, had to run again
+        in this build. Disabled or skipped steps in between (such as
+        clean_stale between configure and compile) don't hide a rerun.
+        """
+        if self.journal is None:
+            return "not resuming"
+        seen = set()
+        stack = list(reversed(step.deps))
+        while stack:
+            dep = stack.pop()
+            if dep in seen:
+                continue
+            seen.add(dep)
+            dep_result = self.results.get(dep)
+            if dep_result and dep_result.status == "ran":
+                return f"dependency {dep} ran again"
+            stack.extend(reversed(self.steps[dep].deps))
+        return self.journal.completed_intact(step.name)
+
+    def run_step(self, step: Step) -> StepResult:
+        """Run one step if it is enabled and stale"""
+        if not step.enabled:
+            result = StepResult("disabled", "not enabled for this build")
+            self.results[step.name] = result
+            return result
+
+        reason = self.stale_reason(step)
+        # Changed inputs or outputs outrank the journal: the step completed
+        # in the previous run, but with what it reads now it must run again
+        changed = (
+            step.fingerprinted
+            and self.store is not None
+            and not self.force
+            and reason is not None
+        )
+        if not changed and self.resume_reason(step) is None:
+            log_info(f"\n⏭️  {step.name}: resumed (completed in previous run)")
+            result = StepResult("resumed", "completed in previous run")
+            self.results[step.name] = result
+            return result
+
+        if reason is None:
+            log_info(f"\n⏭️  {step.name}: skipped (inputs and outputs unchanged)")
+            result = StepResult("skipped", "inputs and outputs unchanged")
+            self.results[step.name] = result
+            self._journal(step)
+            return result
+
+        log_info(f"\n▶️  {step.name}: running ({reason})")
+        start = time.time()
+        returned = step.run()
+        duration = time.time() - start
+
+        # Returning False reports failure: dependents are blocked, and
+        # nothing is recorded, so the step runs again next time
+        if returned is False:
+            log_error(f"{step.name} reported failure")
+            result = StepResult("failed", "step reported failure", duration)
+            self.results[step.name] = result
+            return result
+
+        if step.fingerprinted and self.store is not None:
+            self.store.record(
+                step.name, step.input_paths(), step.output_paths(), step.extra_value()
+            )
+
+        result = StepResult("ran", reason, duration)
+        self.results[step.name] = result
+        self._journal(step)
+        return result
+
+    def _journal(self, step: Step) -> None:
+        """Record a completed step in the build journal"""
+        if self.journal is not None:
+            artifacts = step.artifacts() if step.artifacts else []
+            self.journal.record(step.name, artifacts)
+
+    def write_set(self, step: Step) -> Set[str]:
+        """Resolved write paths of a step, computed once per run"""
+        if step.name not in self._write_sets:
+            paths = step.writes() if step.writes else []
+            self._write_sets[step.name] = {str(Path(p).resolve()) for p in paths}
+        return self._write_sets[step.name]
+
+    def writes_overlap(self, first: Step, second: Step) -> bool:
+        """Whether two steps write the same path or one writes inside the other"""
+        if first.writes is None or second.writes is None:
+            return False
+        small, large = sorted(
+            (self.write_set(first), self.write_set(second)), key=len
+        )
+        for path in small:
+            if path in large:
+                return True
+            for parent in Path(path).parents:
+                if str(parent) in large:
+                    return True
+            prefix = os.path.join(path, "")
+            if any(other.startswith(prefix) for other in large):
+                return True
+        return False
+
+    def write_conflict(self, step: Step, unfinished: List[Step]) -> bool:
+        """Whether an earlier unfinished step writes paths this step writes"""
+        if step.writes is None:
+            return False
+        for other in unfinished:
+            if other is step:
+                return False
+            if other.enabled and self.writes_overlap(step, other):
+                return True
+        return False
+
+    def _run_logged(self, step: Step) -> StepResult:
+        """Run a step with its events attributed to it in the event log"""
+        global _running_steps
+        with _running_lock:
+            _running_steps += 1
+        try:
+            with log_context(step.name):
+                log_event("step_start")
+                result = self.run_step(step)
+                log_event(
+                    "step_end",
+                    status=result.status,
+                    reason=result.reason,
+                    duration=round(result.duration, 3),
+                )
+                return result
+        finally:
+            with _running_lock:
+                _running_steps -= 1
+
+    def _run_grouped(self, step: Step) -> StepResult:
+        """Run a step, buffering its console output if it asks for grouping"""
+        if not step.group_output:
+            return self._run_logged(step)
+        with capture_output() as lines:
+            try:
+                return self._run_logged(step)
+            finally:
+                print_block([f"\n──── {step.name} ────"] + lines)
+
+    def failed_dependency(self, step: Step) -> Optional[str]:
+        """Name of a dependency that failed or was blocked, if any"""
+        for dep in step.deps:
+            dep_result = self.results.get(dep)
+            if dep_result and dep_result.status in ("failed", "blocked"):
+                return dep
+        return None
+
+    def run(self) -> None:
+        """Run every step once its dependencies have finished
+
+        Up to max_workers steps run at a time. A failing step does not stop
+        unrelated steps; its dependents are marked blocked and the errors
+        are reported by log_summary() and failures().
+        """
+        pending = self.order()
+        running = {}
+        # Registration order, used to decide which of two conflicting steps
+        # goes first
+        unfinished = list(pending)
+
+        # Not a with block: its exit waits for running steps, which on an
+        # interrupt could be a compile that takes hours
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or running:
+                for step in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    if not all(dep in self.results for dep in step.deps + step.after):
+                        continue
+
+                    failed = self.failed_dependency(step)
+                    if failed:
+                        pending.remove(step)
+                        unfinished.remove(step)
+                        log_warning(f"{step.name}: not run, {failed} failed")
+                        self.results[step.name] = StepResult(
+                            "blocked", f"dependency {failed} failed"
+                        )
+                        continue
+                    if step.enabled and self.write_conflict(step, unfinished):
+                        continue
+                    pending.remove(step)
+                    running[executor.submit(self._run_grouped, step)] = step
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    unfinished.remove(step)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        with log_context(step.name):
+                            log_error(f"{step.name} failed: {e}")
+                            log_event("step_end", status="failed", error=str(e))
+                        self.results[step.name] = StepResult("failed", str(e))
+        except BaseException:
+            terminate_commands()
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+
+    def failures(self) -> Dict[str, str]:
+        """Error message of each step that failed during run()"""
+        return {
+            name: result.reason
+            for name, result in self.results.items()
+            if result.status == "failed"
+        }
+
+    def log_summary(self) -> None:
+        """Print why each step ran or was skipped"""
+        log_info("\n📋 Pipeline summary:")
+        for name, result in self.results.items():
+            if result.status == "ran":
+                mins, secs = divmod(int(result.duration), 60)
+                log_info(f"  ▶️  {name}: ran in {mins}m {secs}s ({result.reason})")
+            elif result.status in ("skipped", "resumed"):
+                log_info(f"  ⏭️  {name}: {result.status} ({result.reason})")
+            elif result.status == "failed":
+                log_error(f"{name}: failed ({result.reason})")
+            elif result.status == "blocked":
+                log_warning(f"{name}: not run ({result.reason})")
+        skipped = sum(
+            1 for r in self.results.values() if r.status in ("skipped", "resumed")
+        )
+        if skipped:
+            log_success(f"Skipped {skipped} unchanged or already completed step(s)")
+        elif not self.results:
+            log_warning("No pipeline steps were run")
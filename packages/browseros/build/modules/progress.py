@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Progress rendering module for Nxtscape build system
+
+Condenses autoninja and gclient output to a single status line with
+throughput and ETA. Lines that matter (compiler output, errors, warnings)
+are still printed in full, and run_command logs every line to the log
+file regardless of what the console shows. When stdout is not a terminal,
+or other pipeline steps are running and printing too, every line is
+printed as is instead.
+"""
+
+import abc
+import re
+import shutil
+import sys
+import time
+from collections import deque
+from typing import Optional, Tuple
+from utils import OutputCapture, console_print, live_console, log_info
+from modules.pipeline import running_steps
+
+# Seconds between status redraws on a terminal
+REDRAW_INTERVAL = 0.2
+
+# Throughput is averaged over this many seconds
+RATE_WINDOW = 60.0
+
+# Lines of hidden output printed when a gclient command fails
+FAILURE_TAIL_LINES = 40
+
+# Print full output instead of a status line (--verbose)
+_verbose = False
+
+
+def set_verbose(verbose: bool):
+    """Print every line of tool output instead of a status line"""
+    global _verbose
+    _verbose = verbose
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressRenderer(abc.ABC):
+    """Turns a tool's status lines into one updating status line
+
+    Subclasses parse their tool's status lines and decide which of the
+    other lines are worth printing.
+    """
+
+    unit = "steps"
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.samples = deque()  # (time, done)
+        self.done = 0
+        self.total = 0
+        self.live = False
+        self.last_render = 0.0
+        # Whether any output went unprinted
+        self.hidden = False
+
+    @abc.abstractmethod
+    def parse(self, line: str) -> Optional[Tuple[int, int, str]]:
+        """(done, total, description) if line is a status line"""
+
+    def is_notable(self, line: str) -> bool:
+        """Whether a non-status line should be printed"""
+        return True
+
+    def rate(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        (t0, d0), (t1, d1) = self.samples[0], self.samples[-1]
+        return (d1 - d0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def status(self, description: str) -> str:
+        percent = 100 * self.done / self.total if self.total else 0.0
+        text = f"[{self.done}/{self.total}] {percent:.1f}%"
+        rate = self.rate()
+        if rate > 0:
+            eta = format_duration((self.total - self.done) / rate)
+            text += f" | {rate:.1f} {self.unit}/s | ETA {eta}"
+        return f"{text} | {description}" if description else text
+
+    def _clear(self):
+        if self.live:
+            sys.stdout.write("\r\033[K")
+            self.live = False
+
+    def _render(self, description: str):
+        now = time.monotonic()
+        if now - self.last_render < REDRAW_INTERVAL and self.done < self.total:
+            return
+        self.last_render = now
+
+        text = self.status(description)
+        columns = shutil.get_terminal_size((120, 24)).columns
+        width = max(40, min(120, columns))
+        sys.stdout.write("\r\033[K" + text[: width - 1])
+        sys.stdout.flush()
+        self.live = True
+
+    def plain(self) -> bool:
+        """Whether to print lines as is rather than keep a status line
+
+        A status line only works on a terminal that no other step writes
+        to; checked per line, as steps start and finish meanwhile.
+        """
+        return not live_console() or running_steps() > 1
+
+    def _update(self, done: int, total: int):
+        if total != self.total:
+            # A new phase (gclient hooks after projects) has its own rate
+            self.samples.clear()
+        self.done, self.total = done, total
+        now = time.monotonic()
+        self.samples.append((now, self.done))
+        while self.samples and now - self.samples[0][0] > RATE_WINDOW:
+            self.samples.popleft()
+
+    def feed(self, line: str):
+        """Handle one line of tool output"""
+        parsed = self.parse(line)
+        if parsed is not None:
+            self._update(parsed[0], parsed[1])
+
+        if self.plain():
+            self._clear()
+            console_print(line)
+        elif parsed is not None:
+            self.hidden = True
+            self._render(parsed[2])
+        elif self.is_notable(line):
+            self._clear()
+            console_print(line)
+        else:
+            self.hidden = True
+
+    def finish(self, returncode: int, capture: OutputCapture):
+        """Close the status line and report the outcome"""
+        self._clear()
+        if self.total:
+            elapsed = format_duration(time.monotonic() - self.start)
+            log_info(f"⏱️  {self.done}/{self.total} {self.unit} in {elapsed}")
+
+
+class NinjaProgress(ProgressRenderer):
+    """autoninja: `[n/N]` status lines, everything else is printed
+
+    Handles both ninja's default NINJA_STATUS and autoninja's
+    `[%r processes, %f/%t @ %o/s : %es ]` format.
+    """
+
+    unit = "edges"
+    STATUS_RE = re.compile(r"^\[[^\]/]*?(\d+)/(\d+)[^\]]*\]\s*(.*)$")
+
+    def parse(self, line: str) -> Optional[Tuple[int, int, str]]:
+        match = self.STATUS_RE.match(line)
+        if not match:
+            return None
+        return int(match.group(1)), int(match.group(2)), match.group(3)
+
+
+class GclientProgress(ProgressRenderer):
+    """gclient sync: project and hook counters, errors and warnings printed"""
+
+    unit = "items"
+    STATUS_RE = re.compile(
+        r"^(Syncing projects|Running hooks):\s+\d+% \(\s*(\d+)/(\d+)\)\s*(.*)$"
+    )
+    NOTABLE_RE = re.compile(r"error|warning|fail|fatal|denied", re.IGNORECASE)
+
+    def parse(self, line: str) -> Optional[Tuple[int, int, str]]:
+        match = self.STATUS_RE.match(line)
+        if not match:
+            return None
+        phase, done, total, item = match.groups()
+        # The last update of a phase ends in ", done."
+        item = item.lstrip(", ")
+        return int(done), int(total), f"{phase}: {item}" if item else phase
+
+    def is_notable(self, line: str) -> bool:
+        return self.NOTABLE_RE.search(line) is not None
+
+    def finish(self, returncode: int, capture: OutputCapture):
+        super().finish(returncode, capture)
+        if returncode != 0 and self.hidden:
+            # Most of gclient's output was hidden; show what led to the failure
+            tail = list(capture.tail)[-FAILURE_TAIL_LINES:]
+            console_print(f"Last {len(tail)} lines of output:")
+            for line in tail:
+                console_print(line)
+
+
+def ninja_progress() -> Optional[NinjaProgress]:
+    """Renderer for an autoninja run, or None in verbose mode"""
+    return None if _verbose else NinjaProgress()
+
+
+def gclient_progress() -> Optional[GclientProgress]:
+    """Renderer for a gclient run, or None in verbose mode"""
+    return None if _verbose else GclientProgress()
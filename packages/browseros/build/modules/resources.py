@@ -3,21 +3,318 @@
 Resource management module for Nxtscape build system
 """
 
+import os
 import sys
 import glob
+import json
 import shutil
 import yaml
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from context import BuildContext
-from utils import log_info, log_success, log_error, log_warning
+from utils import log_info, log_success, log_error, log_warning, get_platform
 
 
-def copy_resources(ctx: BuildContext, commit_each: bool = False) -> bool:
-    """Copy AI extensions and icons based on YAML configuration"""
-    log_info("\n📦 Copying resources...")
+# Upper bound on concurrent copy lanes; copies are I/O bound
+MAX_COPY_WORKERS = 8
+
+# Files placed by sync-mode operations, kept in the build cache directory
+SYNC_MANIFEST_FILE = "resource_sync.json"
+
+# Compiled copy plans, see get_copy_plan
+_plan_cache: Dict[tuple, Tuple[Path, Optional["CopyPlan"]]] = {}
+
+
+@dataclass
+class CopyOperation:
+    """A copy_resources.yaml operation with its globs expanded"""
+
+    name: str
+    source: str
+    destination: str
+    op_type: str
+    sync: bool = True
+    files: List[Tuple[Path, Path]] = field(default_factory=list)
+
+
+@dataclass
+class CopyPlan:
+    """Expanded copy operations and the independent lanes they run in"""
+
+    operations: List[CopyOperation] = field(default_factory=list)
+    lanes: List[List[CopyOperation]] = field(default_factory=list)
+    # (operation name, reason) of operations that don't apply to this build
+    skipped: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class CopyManifest:
+    """Files written by run_copy_plan, grouped by operation name"""
+
+    operations: Dict[str, List[Path]] = field(default_factory=dict)
+    removed: List[Path] = field(default_factory=list)
+    # Names of operations that failed
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def files(self) -> List[Path]:
+        """All written files in operation order"""
+        return [f for files in self.operations.values() for f in files]
+
+
+def _expand_operation(ctx: BuildContext, operation: dict) -> CopyOperation:
+    """Expand a copy operation into its (source, destination) file pairs"""
+    source = operation["source"]
+    op_type = operation.get("type", "directory")
+    src_path = ctx.root_dir / source
+    dst_base = ctx.chromium_src / operation["destination"]
+
+    compiled = CopyOperation(
+        name=operation.get("name", "Unnamed operation"),
+        source=source,
+        destination=operation["destination"],
+        op_type=op_type,
+        sync=operation.get("sync", True),
+    )
+
+    if op_type == "directory":
+        if src_path.is_dir():
+            for file_path in sorted(src_path.rglob("*")):
+                if file_path.is_file():
+                    compiled.files.append(
+                        (file_path, dst_base / file_path.relative_to(src_path))
+                    )
+    elif op_type == "files":
+        for file_path in sorted(glob.glob(str(src_path))):
+            file_path = Path(file_path)
+            if file_path.is_file():
+                compiled.files.append((file_path, dst_base / file_path.name))
+    elif op_type == "file":
+        if src_path.is_file():
+            compiled.files.append((src_path, dst_base))
+    return compiled
+
+
+def _as_list(value) -> List[str]:
+    """Normalize a YAML scalar-or-list selector to a list"""
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _skip_reason(
+    ctx: BuildContext, operation: dict, architectures: List[str]
+) -> Optional[str]:
+    """Explain why an operation does not apply to this build, if it doesn't"""
+    build_type_condition = operation.get("build_type")
+    if build_type_condition and build_type_condition != ctx.build_type:
+        return f"build_type: {build_type_condition}, current: {ctx.build_type}"
+
+    platforms = _as_list(operation.get("platform"))
+    if platforms and get_platform() not in platforms:
+        return f"platform: {', '.join(platforms)}, current: {get_platform()}"
+
+    arch_selectors = _as_list(operation.get("architecture"))
+    if arch_selectors and not set(arch_selectors) & set(architectures):
+        return f"architecture: {', '.join(arch_selectors)}, current: {', '.join(architectures)}"
+
+    return None
+
+
+def compile_copy_plan(
+    ctx: BuildContext,
+    config: dict,
+    architectures: Optional[List[str]] = None,
+) -> CopyPlan:
+    """Expand all copy operations once and group them into independent lanes
+
+    Operations are filtered by their build_type, platform and architecture
+    selectors. An architecture selector matches if any architecture being
+    built matches, so multi-arch builds get every binary they link.
+
+    Operations that write a common destination file end up in the same lane,
+    in configuration order, so the last writer still wins deterministically.
+    Separate lanes share no destinations and may run concurrently.
+
+    Raises:
+        ValueError: if two operations share a name
+    """
+    architectures = architectures or [ctx.architecture]
+    names = set()
+    for operation in config["copy_operations"]:
+        name = operation.get("name", "Unnamed operation")
+        if name in names:
+            raise ValueError(f"Duplicate copy operation name: {name}")
+        names.add(name)
+
+    operations = []
+    skipped = []
+    for operation in config["copy_operations"]:
+        reason = _skip_reason(ctx, operation, architectures)
+        if reason:
+            skipped.append((operation.get("name", "Unnamed operation"), reason))
+            continue
+        operations.append(_expand_operation(ctx, operation))
+
+    # Union operations that share a destination file
+    parent = list(range(len(operations)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    writers: Dict[Path, int] = {}
+    for index, operation in enumerate(operations):
+        for _, dst in operation.files:
+            if dst in writers:
+                parent[find(index)] = find(writers[dst])
+            else:
+                writers[dst] = index
+
+    lanes: Dict[int, List[CopyOperation]] = {}
+    for index, operation in enumerate(operations):
+        lanes.setdefault(find(index), []).append(operation)
+    return CopyPlan(
+        operations=operations, lanes=list(lanes.values()), skipped=skipped
+    )
+
+
+def _is_up_to_date(src: Path, dst: Path) -> bool:
+    """rsync-style quick check: same size and modification time"""
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    return (
+        src_stat.st_size == dst_stat.st_size
+        and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+    )
+
+
+@dataclass
+class _OperationResult:
+    """Outcome of running a single copy operation"""
+
+    written: List[Path] = field(default_factory=list)
+    created: List[Path] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _run_copy_lane(lane: List[CopyOperation]) -> List[Tuple[CopyOperation, _OperationResult]]:
+    """Copy the files of each operation in a lane, in order
+
+    Sync-mode operations only copy files whose size or mtime differ.
+    """
+    results = []
+    for operation in lane:
+        result = _OperationResult()
+        try:
+            for src, dst in operation.files:
+                if operation.sync and _is_up_to_date(src, dst):
+                    continue
+                if not dst.exists():
+                    result.created.append(dst)
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dst)
+                result.written.append(dst)
+        except Exception as e:
+            result.error = str(e)
+        results.append((operation, result))
+    return results
+
+
+def _load_sync_manifest(ctx: BuildContext) -> Dict[str, Dict]:
+    """Load the record of files placed by earlier syncs"""
+    manifest_path = ctx.get_build_cache_dir() / SYNC_MANIFEST_FILE
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (OSError, ValueError) as e:
+        log_warning(f"Ignoring unreadable sync manifest: {e}")
+        return {}
+
+
+def get_placed_resource_paths(ctx: BuildContext) -> List[Path]:
+    """Files earlier sync-mode copies placed in chromium_src"""
+    return [ctx.chromium_src / rel_path for rel_path in _load_sync_manifest(ctx)]
+
+
+def _save_sync_manifest(ctx: BuildContext, placed: Dict[str, Dict]) -> None:
+    """Persist the record of files placed by sync-mode operations"""
+    manifest_path = ctx.get_build_cache_dir() / SYNC_MANIFEST_FILE
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"files": placed}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
 
-    # Load copy configuration
+
+def _prune_stale_files(
+    ctx: BuildContext, placed: Dict[str, Dict], current: set
+) -> List[Path]:
+    """Delete previously placed files that no source maps to anymore
+
+    Only files that did not exist before we first copied them are deleted.
+    Upstream Chromium files we overwrote are left for git reset to restore.
+    """
+    removed = []
+    for rel_path in sorted(set(placed) - current):
+        entry = placed.pop(rel_path)
+        dst = ctx.chromium_src / rel_path
+        if not entry.get("created"):
+            log_info(f"    Leaving overwritten upstream file: {rel_path}")
+            continue
+        try:
+            dst.unlink()
+        except FileNotFoundError:
+            continue
+        removed.append(dst)
+        log_info(f"    🗑️  Removed stale resource: {rel_path}")
+
+        # Drop directories the removal left empty
+        parent = dst.parent
+        while parent != ctx.chromium_src and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    return removed
+
+
+def _report_operation(operation: CopyOperation, result: _OperationResult) -> None:
+    """Log the outcome of a copy operation"""
+    log_info(f"  • {operation.name}")
+    if result.error:
+        log_error(f"    Error: {result.error}")
+    elif not operation.files:
+        if operation.op_type == "directory":
+            log_warning(f"    Source directory not found: {operation.source}")
+        elif operation.op_type == "files":
+            log_warning(f"    No files found matching: {operation.source}")
+        else:
+            log_warning(f"    Source file not found: {operation.source}")
+    elif operation.sync and not result.written:
+        log_info(f"    ✓ Up to date: {operation.source} → {operation.destination}")
+    elif operation.op_type == "directory":
+        log_info(
+            f"    ✓ Synced {len(result.written)}/{len(operation.files)} files: {operation.source} → {operation.destination}"
+        )
+    elif operation.op_type == "files":
+        log_info(
+            f"    ✓ Copied {len(result.written)} files: {operation.source} → {operation.destination}"
+        )
+    else:
+        log_info(f"    ✓ Copied file: {operation.source} → {operation.destination}")
+
+
+def _load_copy_config(ctx: BuildContext) -> Tuple[Path, dict]:
+    """Load copy_resources.yaml"""
     copy_config_path = ctx.get_copy_resources_config()
     if not copy_config_path.exists():
         log_error(f"Copy configuration file not found: {copy_config_path}")
@@ -27,100 +324,171 @@ def copy_resources(ctx: BuildContext, commit_each: bool = False) -> bool:
 
     with open(copy_config_path, "r") as f:
         config = yaml.safe_load(f)
+    return copy_config_path, config
 
-    if "copy_operations" not in config:
-        log_info("⚠️  No copy_operations defined in configuration")
-        return True
+
+def get_copy_plan(
+    ctx: BuildContext, architectures: Optional[List[str]] = None
+) -> Tuple[Path, Optional[CopyPlan]]:
+    """copy_resources.yaml and its compiled plan (None without copy_operations)
+
+    Plans are compiled once per process and configuration; the pipeline
+    asks for the step's inputs, outputs and write set several times.
+    Source files added while the build runs are not picked up.
+    """
+    architectures = sorted(architectures or [ctx.architecture])
+    copy_config_path = ctx.get_copy_resources_config()
+    try:
+        config_mtime = copy_config_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        config_mtime = None
+    key = (
+        str(copy_config_path),
+        config_mtime,
+        str(ctx.root_dir),
+        str(ctx.chromium_src),
+        ctx.build_type,
+        get_platform(),
+        tuple(architectures),
+    )
+    if key not in _plan_cache:
+        copy_config_path, config = _load_copy_config(ctx)
+        plan = None
+        if "copy_operations" in config:
+            plan = compile_copy_plan(ctx, config, architectures)
+        _plan_cache[key] = (copy_config_path, plan)
+    return _plan_cache[key]
+
+
+def get_copy_fingerprint(
+    ctx: BuildContext, architectures: Optional[List[str]] = None
+) -> Tuple[List[Path], List[Path]]:
+    """Inputs and outputs of the resources step"""
+    copy_config_path, plan = get_copy_plan(ctx, architectures)
+    if plan is None:
+        return [copy_config_path], []
+    inputs = [copy_config_path] + [
+        src for op in plan.operations for src, _ in op.files
+    ]
+    outputs = [dst for op in plan.operations for _, dst in op.files]
+    return inputs, outputs
+
+
+def run_copy_plan(
+    ctx: BuildContext, plan: CopyPlan, commit_each: bool = False
+) -> CopyManifest:
+    """Run a compiled copy plan and prune files it no longer places
+
+    Returns:
+        Manifest of every file written and removed, grouped by operation
+    """
+    manifest = CopyManifest()
+    for name, reason in plan.skipped:
+        log_info(f"  ⏭️  Skipping {name} ({reason})")
+
+    results: Dict[int, _OperationResult] = {}
+    workers = max(1, min(MAX_COPY_WORKERS, len(plan.lanes)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for lane_results in executor.map(_run_copy_lane, plan.lanes):
+            for operation, result in lane_results:
+                results[id(operation)] = result
+    for operation in plan.operations:
+        _report_operation(operation, results[id(operation)])
+
+    # Track what sync-mode operations placed, then prune what they no longer place
+    placed = _load_sync_manifest(ctx)
+    current = set()
+    for operation in plan.operations:
+        result = results[id(operation)]
+        if result.error:
+            manifest.failed.append(operation.name)
+            continue
+        manifest.operations[operation.name] = result.written
+        if not operation.sync:
+            continue
+        created = set(result.created)
+        for _, dst in operation.files:
+            rel_path = dst.relative_to(ctx.chromium_src).as_posix()
+            current.add(rel_path)
+            if rel_path not in placed:
+                placed[rel_path] = {"created": dst in created}
+
+    # A failed operation may have left its files half-copied; prune next time
+    if not manifest.failed:
+        manifest.removed = _prune_stale_files(ctx, placed, current)
+    _save_sync_manifest(ctx, placed)
 
     if commit_each:
         log_info(
             "📝 Git commit mode enabled - will create a commit after each resource copy"
         )
-
-    # Process each copy operation
-    for operation in config["copy_operations"]:
-        name = operation.get("name", "Unnamed operation")
-        source = operation["source"]
-        destination = operation["destination"]
-        op_type = operation.get("type", "directory")
-        build_type_condition = operation.get("build_type")
-
-        # Skip operation if build_type condition doesn't match
-        if build_type_condition and build_type_condition != ctx.build_type:
-            log_info(
-                f"  ⏭️  Skipping {name} (build_type: {build_type_condition}, current: {ctx.build_type})"
+        for name, written in manifest.operations.items():
+            if written:
+                commit_resource_copy(name, written, ctx.chromium_src)
+        if manifest.removed:
+            commit_resource_copy(
+                "remove stale resources", manifest.removed, ctx.chromium_src
             )
-            continue
+    return manifest
 
-        # Resolve paths
-        src_path = ctx.root_dir / source
-        dst_base = ctx.chromium_src / destination
 
-        log_info(f"  • {name}")
+def copy_resources(
+    ctx: BuildContext,
+    commit_each: bool = False,
+    architectures: Optional[List[str]] = None,
+) -> bool:
+    """Copy AI extensions and icons based on YAML configuration
 
-        try:
-            if op_type == "directory":
-                # Copy entire directory
-                if src_path.exists() and src_path.is_dir():
-                    dst_path = dst_base
-                    dst_path.mkdir(parents=True, exist_ok=True)
-                    shutil.copytree(src_path, dst_path, dirs_exist_ok=True)
-                    log_info(f"    ✓ Copied directory: {source} → {destination}")
-                    if commit_each:
-                        commit_resource_copy(
-                            name, source, destination, ctx.chromium_src
-                        )
-                else:
-                    log_warning(f"    Source directory not found: {source}")
-
-            elif op_type == "files":
-                # Copy files matching pattern
-                files = glob.glob(str(ctx.root_dir / source))
-                if files:
-                    dst_base.mkdir(parents=True, exist_ok=True)
-                    for file_path in files:
-                        file_path = Path(file_path)
-                        if file_path.is_file():
-                            shutil.copy2(file_path, dst_base)
-                    log_info(
-                        f"    ✓ Copied {len(files)} files: {source} → {destination}"
-                    )
-                    if commit_each:
-                        commit_resource_copy(
-                            name, source, destination, ctx.chromium_src
-                        )
-                else:
-                    log_warning(f"    No files found matching: {source}")
-
-            elif op_type == "file":
-                # Copy single file
-                if src_path.exists() and src_path.is_file():
-                    dst_base.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(src_path, dst_base)
-                    log_info(f"    ✓ Copied file: {source} → {destination}")
-                    if commit_each:
-                        commit_resource_copy(
-                            name, source, destination, ctx.chromium_src
-                        )
-                else:
-                    log_warning(f"    Source file not found: {source}")
+    Args:
+        ctx: Build context
+        commit_each: Create a git commit after each copy operation
+        architectures: All architectures this build produces (defaults to ctx's)
 
-        except Exception as e:
-            log_error(f"    Error: {e}")
+    Returns:
+        True if every copy operation succeeded
+    """
+    log_info("\n📦 Copying resources...")
 
-    log_success("Resources copied")
+    _, plan = get_copy_plan(ctx, architectures)
+    if plan is None:
+        log_info("⚠️  No copy_operations defined in configuration")
+        return True
+
+    manifest = run_copy_plan(ctx, plan, commit_each)
+    if manifest.failed:
+        log_error(f"Failed copy operations: {', '.join(manifest.failed)}")
+        return False
+
+    log_success(
+        f"Resources synced ({len(manifest.files)} written, {len(manifest.removed)} removed)"
+    )
     return True
 
 
-def commit_resource_copy(
-    name: str, source: str, destination: str, chromium_src: Path
-) -> bool:
-    """Create a git commit for the copied resource"""
+def _run_git(
+    cmd: List[str], chromium_src: Path, input: Optional[str] = None
+) -> subprocess.CompletedProcess:
+    """Run a git plumbing command with captured output"""
+    return subprocess.run(
+        cmd, input=input, capture_output=True, text=True, cwd=chromium_src
+    )
+
+
+def commit_resource_copy(name: str, paths: List[Path], chromium_src: Path) -> bool:
+    """Create a git commit for the copied resource
+
+    Only the given paths are staged, through a single update-index call, and
+    the commit is built with write-tree/commit-tree. This keeps the cost
+    proportional to the files copied instead of the size of the Chromium
+    tree. Anything else already staged in the index is committed too.
+    """
     try:
-        # Stage all changes
-        cmd_add = ["git", "add", "-A"]
-        result = subprocess.run(
-            cmd_add, capture_output=True, text=True, cwd=chromium_src
+        # Stage exactly the manifest paths (deleted ones are removed)
+        rel_paths = [Path(p).relative_to(chromium_src).as_posix() for p in paths]
+        result = _run_git(
+            ["git", "update-index", "-z", "--add", "--remove", "--stdin"],
+            chromium_src,
+            input="\0".join(rel_paths) + "\0",
         )
         if result.returncode != 0:
             log_warning(f"Failed to stage changes for resource copy: {name}")
@@ -128,14 +496,37 @@ def commit_resource_copy(
                 log_warning(f"Error: {result.stderr}")
             return False
 
+        result = _run_git(["git", "write-tree"], chromium_src)
+        if result.returncode != 0:
+            log_warning(f"Failed to write tree for resource copy: {name}")
+            if result.stderr:
+                log_warning(f"Error: {result.stderr}")
+            return False
+        tree = result.stdout.strip()
+
+        result = _run_git(["git", "rev-parse", "--verify", "HEAD"], chromium_src)
+        parent = result.stdout.strip() if result.returncode == 0 else None
+
+        if parent:
+            result = _run_git(["git", "rev-parse", f"{parent}^{{tree}}"], chromium_src)
+            if result.stdout.strip() == tree:
+                log_info(f"No changes to commit for resource: {name}")
+                return True
+
         # Create commit message
         commit_message = f"resource: {name.lower()}"
 
-        # Create the commit
-        cmd_commit = ["git", "commit", "-m", commit_message]
-        result = subprocess.run(
-            cmd_commit, capture_output=True, text=True, cwd=chromium_src
-        )
+        # Create the commit and move HEAD to it
+        cmd_commit = ["git", "commit-tree", tree, "-m", commit_message]
+        if parent:
+            cmd_commit[3:3] = ["-p", parent]
+        result = _run_git(cmd_commit, chromium_src)
+        if result.returncode == 0:
+            commit = result.stdout.strip()
+            cmd_update = ["git", "update-ref", "-m", commit_message, "HEAD", commit]
+            if parent:
+                cmd_update.append(parent)
+            result = _run_git(cmd_update, chromium_src)
 
         if result.returncode == 0:
             log_success(f"📝 Created commit for resource: {name}")
@@ -13,6 +13,7 @@ from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 from context import BuildContext
 from utils import (
+    AsyncRunner,
     run_command as utils_run_command,
     log_info,
     log_error,
@@ -273,14 +274,14 @@ def get_signing_options(component_path: Path) -> str:
     return "runtime"
 
 
-def sign_component(
+def codesign_command(
     component_path: Path,
     certificate_name: str,
     identifier: Optional[str] = None,
     options: Optional[str] = None,
     entitlements: Optional[Path] = None,
-) -> bool:
-    """Sign a single component"""
+) -> List[str]:
+    """Build the codesign command line for a component"""
     cmd = ["codesign", "--sign", certificate_name, "--force", "--timestamp"]
 
     if identifier:
@@ -293,7 +294,20 @@ def sign_component(
         cmd.extend(["--entitlements", str(entitlements)])
 
     cmd.append(str(component_path))
+    return cmd
+
 
+def sign_component(
+    component_path: Path,
+    certificate_name: str,
+    identifier: Optional[str] = None,
+    options: Optional[str] = None,
+    entitlements: Optional[Path] = None,
+) -> bool:
+    """Sign a single component"""
+    cmd = codesign_command(
+        component_path, certificate_name, identifier, options, entitlements
+    )
     try:
         run_command(cmd)
         return True
@@ -302,6 +316,36 @@ def sign_component(
         return False
 
 
+def sign_components(
+    batch: List[Tuple[Path, Optional[str], Optional[str], Optional[Path]]],
+    certificate_name: str,
+) -> bool:
+    """Sign independent components in parallel
+
+    Args:
+        batch: (path, identifier, options, entitlements) per component;
+            none of them may contain another
+    """
+    # Two codesign processes must never rewrite the same file
+    unique = {}
+    for item in batch:
+        unique.setdefault(item[0].resolve(), item)
+    batch = list(unique.values())
+
+    cmds = [
+        codesign_command(path, certificate_name, identifier, options, entitlements)
+        for path, identifier, options, entitlements in batch
+    ]
+    results = AsyncRunner().run_all(cmds, check=False)
+
+    success = True
+    for (path, _, _, _), result in zip(batch, results):
+        if result.returncode != 0:
+            log_error(f"Failed to sign {path}: exit code {result.returncode}")
+            success = False
+    return success
+
+
 def sign_all_components(
     app_path: Path,
     certificate_name: str,
@@ -345,6 +389,7 @@ def sign_all_components(
         if ctx:
             entitlements_dirs.append(ctx.get_entitlements_dir())
 
+        batch = []
         for exe in components["executables"]:
             identifier = get_identifier_for_component(exe)
             options = get_signing_options(exe)
@@ -359,16 +404,20 @@ def sign_all_components(
                         entitlements = ent_path
                         break
 
-            if not sign_component(exe, certificate_name, identifier, options, entitlements):
-                return False
+            batch.append((exe, identifier, options, entitlements))
+
+        if not sign_components(batch, certificate_name):
+            return False
 
     # 4. Sign dylibs
     if components["dylibs"]:
         log_info("\n🔏 Signing dynamic libraries...")
-        for dylib in components["dylibs"]:
-            identifier = get_identifier_for_component(dylib)
-            if not sign_component(dylib, certificate_name, identifier):
-                return False
+        batch = [
+            (dylib, get_identifier_for_component(dylib), None, None)
+            for dylib in components["dylibs"]
+        ]
+        if not sign_components(batch, certificate_name):
+            return False
 
     # 5. Sign helper apps
     if components["helpers"]:
@@ -378,6 +427,7 @@ def sign_all_components(
         if ctx:
             entitlements_dirs.append(ctx.get_entitlements_dir())
 
+        batch = []
         for helper in components["helpers"]:
             identifier = get_identifier_for_component(helper)
             options = get_signing_options(helper)
@@ -400,10 +450,10 @@ def sign_all_components(
                         entitlements = ent_path
                         break
 
-            if not sign_component(
-                helper, certificate_name, identifier, options, entitlements
-            ):
-                return False
+            batch.append((helper, identifier, options, entitlements))
+
+        if not sign_components(batch, certificate_name):
+            return False
 
     # 6. Sign frameworks (except the main BrowserOS Framework)
     if components["frameworks"]:
@@ -4,7 +4,9 @@ String replacement module for BrowserOS build system
 """
 
 import re
+import hashlib
 from pathlib import Path
+from typing import List
 from context import BuildContext
 from utils import log_info, log_success, log_error, log_warning
 
@@ -34,6 +36,18 @@ target_files = [
 ]
 
 
+def get_replacement_table_digest() -> str:
+    """Hash of the replacement table and target list"""
+    return hashlib.sha256(
+        repr((branding_replacements, target_files)).encode("utf-8")
+    ).hexdigest()
+
+
+def get_target_paths(ctx: BuildContext) -> List[Path]:
+    """Files in chromium_src the replacements are applied to"""
+    return [ctx.chromium_src / file_path for file_path in target_files]
+
+
 def apply_string_replacements(ctx: BuildContext) -> bool:
     """Apply string replacements to specified files"""
     log_info("\n🔤 Applying string replacements...")
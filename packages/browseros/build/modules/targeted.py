@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Targeted dev build module for Nxtscape build system
+
+Maps the Chromium files changed since the last build to the GN targets
+that own them, so a dev build can compile those targets first and then
+link only chrome.
+"""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+from context import BuildContext
+from utils import log_info, log_warning, join_paths, IS_WINDOWS
+from modules.fingerprint import get_fingerprint_store, hash_file
+
+
+# Target every dev build links in the end
+CHROME_LABEL = "//chrome:chrome"
+
+GN_FILE_SUFFIXES = (".gn", ".gni")
+
+
+def _state_path(ctx: BuildContext) -> Path:
+    return join_paths(ctx.get_build_cache_dir(), f"targeted_{ctx.architecture}.json")
+
+
+def _load_state(ctx: BuildContext) -> Dict:
+    path = _state_path(ctx)
+    if path.exists():
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            log_warning(f"Ignoring unreadable targeted build state: {e}")
+    return {}
+
+
+def _save_state(ctx: BuildContext, state: Dict) -> None:
+    path = _state_path(ctx)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# Paths per git status call, well below command line length limits
+STATUS_PATHSPEC_CHUNK = 500
+
+
+def _git_status(ctx: BuildContext, args: List[str]) -> Dict[str, str]:
+    result = subprocess.run(
+        [
+            "git",
+            "--literal-pathspecs",
+            "status",
+            "--porcelain",
+            "-z",
+            "--untracked-files=all",
+        ]
+        + args,
+        cwd=ctx.chromium_src,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    files = {}
+    entries = iter(result.stdout.split("\0"))
+    for entry in entries:
+        if len(entry) < 4:
+            continue
+        status, path = entry[:2], entry[3:]
+        if "R" in status or "C" in status:
+            next(entries, None)  # Skip the rename/copy source path
+        if not path.startswith("out/"):
+            files[path] = status
+    return files
+
+
+def get_git_status(
+    ctx: BuildContext, pathspecs: Optional[List[str]] = None, ignored: bool = False
+) -> Dict[str, str]:
+    """Porcelain status of changed files in chromium_src, by path
+
+    Args:
+        pathspecs: Only look at these paths (literal, directories recurse)
+        ignored: Also list ignored files, with status "!!"
+    """
+    args = ["--ignored"] if ignored else []
+    if pathspecs is None:
+        return _git_status(ctx, args)
+    files = {}
+    for start in range(0, len(pathspecs), STATUS_PATHSPEC_CHUNK):
+        chunk = pathspecs[start : start + STATUS_PATHSPEC_CHUNK]
+        files.update(_git_status(ctx, args + ["--"] + chunk))
+    return files
+
+
+def get_modified_files(ctx: BuildContext) -> List[str]:
+    """Files git reports as modified, added or deleted in chromium_src"""
+    return list(get_git_status(ctx))
+
+
+def _source_digests(ctx: BuildContext, files: List[str]) -> Dict[str, Optional[str]]:
+    store = get_fingerprint_store(ctx)
+    return {path: store.file_digest(ctx.chromium_src / path) for path in files}
+
+
+def get_changed_files(ctx: BuildContext) -> Optional[List[str]]:
+    """Files whose content changed since the last recorded build
+
+    Returns:
+        Changed paths relative to chromium_src, or None if no build has
+        been recorded yet
+    """
+    baseline = _load_state(ctx).get("sources")
+    if baseline is None:
+        return None
+
+    current = _source_digests(ctx, get_modified_files(ctx))
+    # A deleted file has no digest, so compare membership too
+    changed = [
+        path
+        for path, digest in current.items()
+        if path not in baseline or baseline[path] != digest
+    ]
+    # Files restored to their upstream content since the last build
+    changed += [path for path in baseline if path not in current]
+    return sorted(changed)
+
+
+def record_build_sources(ctx: BuildContext) -> None:
+    """Remember the modified files' content after a successful build"""
+    state = _load_state(ctx)
+    state["sources"] = _source_digests(ctx, get_modified_files(ctx))
+    _save_state(ctx, state)
+    # Persist the hash cache so the next comparison only stats the files
+    get_fingerprint_store(ctx).save()
+
+
+def _gn_refs(ctx: BuildContext, path: str, extra_args: List[str]) -> List[str]:
+    gn_cmd = "gn.bat" if IS_WINDOWS else "gn"
+    result = subprocess.run(
+        [gn_cmd, "refs", ctx.out_dir, f"//{path}", "--testonly=false"] + extra_args,
+        cwd=ctx.chromium_src,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"gn refs failed for {path}: {result.stderr.strip()}")
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+
+def map_files_to_targets(ctx: BuildContext, files: List[str]) -> Dict[str, Dict]:
+    """Map source files to the ninja outputs of the targets that own them
+
+    Uses `gn refs` for the owning targets and `gn refs --all` to tell
+    whether chrome depends on them. Results are cached per args.gn hash,
+    since the build graph only changes with args.gn or GN files (which
+    force a full build anyway).
+
+    Returns:
+        {path: {"owners": [ninja outputs], "chrome": bool}}
+    """
+    state = _load_state(ctx)
+    args_hash = hash_file(ctx.get_gn_args_file())
+    refs = state.get("refs", {})
+    if state.get("args_hash") != args_hash:
+        refs = {}
+
+    uncached = [path for path in files if path not in refs]
+    if uncached:
+        log_info(f"🔎 Resolving GN targets for {len(uncached)} file(s)...")
+    for path in uncached:
+        dependents = _gn_refs(ctx, path, ["--all"])
+        refs[path] = {
+            "owners": _gn_refs(ctx, path, ["--as=output"]),
+            "chrome": CHROME_LABEL in dependents,
+        }
+
+    state["args_hash"] = args_hash
+    state["refs"] = refs
+    _save_state(ctx, state)
+    return {path: refs[path] for path in files}
+
+
+def plan_targeted_build(ctx: BuildContext) -> List[str]:
+    """Ninja outputs owning the files changed since the last build
+
+    Only targets that chrome depends on are returned; changes that only
+    affect tests or other binaries are left out. An empty list means
+    building chrome alone is all that's needed.
+    """
+    changed = get_changed_files(ctx)
+    if changed is None:
+        log_info("🎯 No previous build recorded, building chrome")
+        return []
+    if not changed:
+        log_info("🎯 No source changes since the last build")
+        return []
+
+    unmappable = [
+        path
+        for path in changed
+        if path.endswith(GN_FILE_SUFFIXES) or not (ctx.chromium_src / path).exists()
+    ]
+    if unmappable:
+        log_info(
+            f"🎯 GN files changed or sources removed ({unmappable[0]}), building chrome"
+        )
+        return []
+
+    try:
+        mappings = map_files_to_targets(ctx, changed)
+    except RuntimeError as e:
+        log_warning(f"{e}, building chrome")
+        return []
+
+    outputs = set()
+    for path, mapping in mappings.items():
+        if mapping["chrome"]:
+            outputs.update(mapping["owners"])
+        else:
+            log_info(f"  Not part of chrome, skipping: {path}")
+
+    log_info(f"🎯 {len(changed)} changed file(s) map to {len(outputs)} target(s)")
+    return sorted(outputs)
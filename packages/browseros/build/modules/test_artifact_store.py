@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Test script for the build artifact store
+
+Covers that the key follows every input it is built from, that eviction
+removes the least recently used entries first, and that restoring an
+entry replaces what the out dir holds.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import modules.artifact_store as artifact_store
+from modules.artifact_store import MANIFEST_FILE, ArtifactStore
+
+# Stands in for what get_touched_paths derives from patches and resources
+TOUCHED = {"chrome/a.cc"}
+
+
+class _Context:
+    SPARKLE_VERSION = "2.7.0"
+
+    def __init__(self, root: Path):
+        self.root_dir = root
+        self.chromium_src = root / "src"
+        self.architecture = "arm64"
+        self.out_dir = "out/Default_arm64"
+
+    def get_build_cache_dir(self) -> Path:
+        return self.chromium_src / "out" / ".browseros_cache"
+
+    def get_dev_patches_dir(self) -> Path:
+        return self.root_dir / "chromium_patches"
+
+    def get_gn_args_file(self) -> Path:
+        return self.chromium_src / self.out_dir / "args.gn"
+
+
+def _git(ctx: _Context, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + list(args),
+        cwd=ctx.chromium_src,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _make_checkout(root: Path) -> _Context:
+    ctx = _Context(root)
+    _write(ctx.chromium_src / "chrome" / "a.cc", "original a")
+    _write(ctx.chromium_src / ".gitignore", "out/\n")
+    _git(ctx, "init", "-q")
+    _git(ctx, "add", "-A")
+    _git(ctx, "commit", "-q", "-m", "base")
+    _write(ctx.get_gn_args_file(), "is_debug = false\n")
+    _write(ctx.get_dev_patches_dir() / "chrome" / "a.cc", "diff a")
+    return ctx
+
+
+def test_key_follows_every_input():
+    """Test that HEAD, touched files, args.gn, arch and patches change the key"""
+    get_touched = artifact_store.get_touched_paths
+    get_recorded = artifact_store.get_recorded_touched_paths
+    artifact_store.get_touched_paths = lambda ctx, archs: set(TOUCHED)
+    artifact_store.get_recorded_touched_paths = lambda ctx: set()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            ctx = _make_checkout(Path(tmp))
+            store = ArtifactStore(Path(tmp) / "artifacts", 1024**3)
+            keys = [store.key(ctx)]
+            assert store.key(ctx) == keys[0]
+
+            def changed():
+                key = store.key(ctx)
+                assert key not in keys
+                keys.append(key)
+
+            _write(ctx.chromium_src / "chrome" / "a.cc", "patched a")
+            changed()
+            _write(ctx.chromium_src / "base" / "b.cc", "new upstream file")
+            _git(ctx, "add", "base/b.cc")
+            _git(ctx, "commit", "-q", "-m", "roll")
+            changed()
+            _write(ctx.get_gn_args_file(), "is_debug = true\n")
+            changed()
+            ctx.architecture = "x64"
+            changed()
+            _write(ctx.get_dev_patches_dir() / "chrome" / "a.cc", "diff a, v2")
+            changed()
+            _write(ctx.get_dev_patches_dir() / "base" / "b.cc", "diff b")
+            changed()
+
+            # Files outside the touched set don't count
+            _write(ctx.chromium_src / "base" / "b.cc", "local edit")
+            assert store.key(ctx) == keys[-1]
+    finally:
+        artifact_store.get_touched_paths = get_touched
+        artifact_store.get_recorded_touched_paths = get_recorded
+    print("✓ Artifact key inputs test passed")
+
+
+def _add_entry(store: ArtifactStore, key: str, size: int, last_used: float):
+    entry_dir = store.root / key
+    entry_dir.mkdir(parents=True)
+    store._write_manifest(
+        entry_dir,
+        {
+            "architecture": "arm64",
+            "created": last_used,
+            "last_used": last_used,
+            "size": size,
+            "files": [],
+        },
+    )
+
+
+def test_lru_eviction():
+    """Test that the least recently used entries go first, the newest never"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(Path(tmp) / "artifacts", max_bytes=250)
+        _add_entry(store, "oldest", 100, 1000)
+        _add_entry(store, "older", 100, 2000)
+        _add_entry(store, "recent", 100, 3000)
+        _add_entry(store, "newest", 100, 4000)
+
+        store.evict()
+        assert sorted(os.listdir(store.root)) == ["newest", "recent"]
+
+        # A newest entry over the limit on its own is kept
+        store.max_bytes = 50
+        store.evict()
+        assert os.listdir(store.root) == ["newest"]
+    print("✓ LRU eviction test passed")
+
+
+def _make_entry(store: ArtifactStore, key: str) -> None:
+    """Stored build with a binary, a resource dir and a symlink"""
+    files = store.root / key / "files"
+    _write(files / "browseros", "stored binary")
+    _write(files / "locales" / "en-US.pak", "stored locale")
+    os.symlink("browseros", files / "chrome")
+    (store.root / key).mkdir(exist_ok=True)
+    store._write_manifest(
+        store.root / key,
+        {
+            "architecture": "arm64",
+            "created": 1000,
+            "last_used": 1000,
+            "size": 0,
+            "files": ["browseros", "locales", "chrome"],
+        },
+    )
+
+
+def test_restore_replaces_out_dir_files():
+    """Test that a restore replaces stale outputs and bumps last_used"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        out_dir = ctx.chromium_src / ctx.out_dir
+        store = ArtifactStore(Path(tmp) / "artifacts", 1024**3)
+        _make_entry(store, "abc")
+
+        # Stale outputs of another build, including a file where a
+        # symlink goes and a locale the stored build doesn't have
+        _write(out_dir / "browseros", "stale binary")
+        _write(out_dir / "chrome", "stale file")
+        _write(out_dir / "locales" / "fr.pak", "stale locale")
+
+        assert not store.restore(ctx, "missing")
+        start = time.time()
+        assert store.restore(ctx, "abc")
+
+        assert (out_dir / "browseros").read_text() == "stored binary"
+        assert os.readlink(out_dir / "chrome") == "browseros"
+        assert os.listdir(out_dir / "locales") == ["en-US.pak"]
+        # The store keeps its own copy
+        (out_dir / "browseros").write_text("rebuilt")
+        assert (store.root / "abc" / "files" / "browseros").read_text() == (
+            "stored binary"
+        )
+        manifest = json.loads((store.root / "abc" / MANIFEST_FILE).read_text())
+        assert manifest["last_used"] >= start
+    print("✓ Restore test passed")
+
+
+def run_all_tests():
+    """Run all artifact store tests"""
+    tests = [
+        test_key_follows_every_input,
+        test_lru_eviction,
+        test_restore_replaces_out_dir_files,
+    ]
+
+    print("Running artifact store tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for AsyncRunner
+
+Runs small Python commands standing in for codesign and friends, and covers
+the per-tool concurrency limit, result order, and that a failure with
+check=True cancels the remaining commands and is raised.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import AsyncRunner
+
+# Records when it ran, then exits with the given code
+FAKE_TOOL = """
+import sys, time
+start = time.time()
+time.sleep(float(sys.argv[2]))
+with open(sys.argv[1], "w") as f:
+    f.write(f"{start} {time.time()}")
+print(f"done {sys.argv[1]}")
+sys.exit(int(sys.argv[3]))
+"""
+
+
+def _fake_command(record: Path, seconds: float, exit_code: int = 0):
+    return [sys.executable, "-c", FAKE_TOOL, str(record), str(seconds), str(exit_code)]
+
+
+def _max_overlap(records) -> int:
+    """Most commands that were running at the same moment"""
+    edges = []
+    for record in records:
+        start, end = map(float, record.read_text().split())
+        edges += [(start, 1), (end, -1)]
+    running = peak = 0
+    # Ends sort before starts at the same instant
+    for _, delta in sorted(edges):
+        running += delta
+        peak = max(peak, running)
+    return peak
+
+
+def test_concurrency_limit():
+    """Test that no more than the tool's limit run at once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        records = [Path(tmp) / f"cmd{i}" for i in range(6)]
+        runner = AsyncRunner(limits={"fake": 2})
+        results = runner.run_all(
+            [_fake_command(record, 0.5) for record in records], tool="fake"
+        )
+
+        assert [r.returncode for r in results] == [0] * 6
+        # Results come back in command order
+        assert [r.stdout.strip() for r in results] == [
+            f"done {record}" for record in records
+        ]
+        assert _max_overlap(records) == 2
+    print("✓ Concurrency limit test passed")
+
+
+def test_failure_cancels_remaining():
+    """Test that check=True raises the failure and stops the other commands"""
+    with tempfile.TemporaryDirectory() as tmp:
+        slow = Path(tmp) / "slow"
+        cmds = [
+            _fake_command(Path(tmp) / "fails", 0.1, exit_code=3),
+            _fake_command(slow, 30),
+        ]
+        start = time.time()
+        try:
+            AsyncRunner().run_all(cmds, tool="fake")
+            assert False, "Failing command was not raised"
+        except subprocess.CalledProcessError as e:
+            assert e.returncode == 3
+        assert time.time() - start < 10
+        assert not slow.exists()
+    print("✓ Failure cancellation test passed")
+
+
+def test_failures_returned_without_check():
+    """Test that check=False returns every exit code"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cmds = [
+            _fake_command(Path(tmp) / "ok", 0.1),
+            _fake_command(Path(tmp) / "fails", 0.1, exit_code=1),
+        ]
+        results = AsyncRunner().run_all(cmds, check=False, tool="fake")
+        assert [r.returncode for r in results] == [0, 1]
+    print("✓ Unchecked failures test passed")
+
+
+def run_all_tests():
+    """Run all AsyncRunner tests"""
+    tests = [
+        test_concurrency_limit,
+        test_failure_cancels_remaining,
+        test_failures_returned_without_check,
+    ]
+
+    print("Running AsyncRunner tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
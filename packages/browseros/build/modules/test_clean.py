@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Test script for restoring touched paths
+
+Builds a small git repository standing in for chromium_src and covers
+which changes restore_touched_paths undoes, which it leaves alone, and
+when it defers to a full reset. Also covers the GN args snapshot of the
+stale clean mode and the ninja tools it runs.
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import modules.clean as clean
+from modules.clean import (
+    TOUCHED_MANIFEST_FILE,
+    _save_args_snapshot,
+    changed_gn_args,
+    clean_stale_outputs,
+    restore_touched_paths,
+)
+
+
+class _Context:
+    def __init__(self, root: Path):
+        self.chromium_src = root / "src"
+        self.architecture = "x64"
+        self.out_dir = "out/Default_x64"
+
+    def get_gn_args_file(self) -> Path:
+        return self.chromium_src / self.out_dir / "args.gn"
+
+    def get_build_cache_dir(self) -> Path:
+        return self.chromium_src / "out" / ".browseros_cache"
+
+    def get_sparkle_dir(self) -> Path:
+        return self.chromium_src / "third_party" / "sparkle"
+
+
+def _git(ctx: _Context, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + list(args),
+        cwd=ctx.chromium_src,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _write(ctx: _Context, rel_path: str, content: str) -> None:
+    path = ctx.chromium_src / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _make_checkout(root: Path, touched) -> _Context:
+    """Committed tree with a .gitignore and a touched-path manifest"""
+    ctx = _Context(root)
+    ctx.chromium_src.mkdir()
+    _git(ctx, "init", "-q")
+    _write(ctx, ".gitignore", "out/\n*.gen\n__pycache__/\n")
+    _write(ctx, "chrome/a.cc", "original a")
+    _write(ctx, "base/b.cc", "original b")
+    _write(ctx, "base/other.cc", "original other")
+    _git(ctx, "add", "-A")
+    _git(ctx, "commit", "-q", "-m", "base")
+
+    manifest = ctx.get_build_cache_dir() / TOUCHED_MANIFEST_FILE
+    manifest.parent.mkdir(parents=True)
+    manifest.write_text(json.dumps({"paths": sorted(touched)}))
+    return ctx
+
+
+def test_restore_undoes_only_our_changes():
+    """Test that touched paths are restored and other files are kept"""
+    touched = {"chrome/a.cc", "chrome/new.cc", "chrome/res.gen", "base/b.cc"}
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_checkout(Path(tmp), touched)
+        src = ctx.chromium_src
+        _write(ctx, "chrome/a.cc", "patched a")
+        _write(ctx, "chrome/new.cc", "added by a patch")
+        _write(ctx, "chrome/res.gen", "copied resource, ignored by git")
+        (src / "base" / "b.cc").unlink()
+        _write(ctx, "chrome/__pycache__/x.pyc", "left by gn")
+        # Outside the manifest and the cleaned directories
+        _write(ctx, "base/other.cc", "local edit")
+
+        assert restore_touched_paths(ctx)
+
+        assert (src / "chrome" / "a.cc").read_text() == "original a"
+        assert (src / "base" / "b.cc").read_text() == "original b"
+        assert not (src / "chrome" / "new.cc").exists()
+        assert not (src / "chrome" / "res.gen").exists()
+        assert (src / "chrome" / "__pycache__" / "x.pyc").exists()
+        assert (src / "base" / "other.cc").read_text() == "local edit"
+    print("✓ Restore touched paths test passed")
+
+
+def test_foreign_change_defers_to_full_reset():
+    """Test that a change in chrome/ the build didn't make changes nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_checkout(Path(tmp), {"chrome/a.cc"})
+        _write(ctx, "chrome/a.cc", "patched a")
+        _write(ctx, "chrome/foreign.cc", "not ours")
+
+        assert not restore_touched_paths(ctx)
+        assert (ctx.chromium_src / "chrome" / "a.cc").read_text() == "patched a"
+    print("✓ Foreign change test passed")
+
+
+def test_missing_manifest_defers_to_full_reset():
+    """Test that without a manifest nothing is restored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_checkout(Path(tmp), set())
+        (ctx.get_build_cache_dir() / TOUCHED_MANIFEST_FILE).unlink()
+        _write(ctx, "chrome/a.cc", "patched a")
+
+        assert not restore_touched_paths(ctx)
+        assert (ctx.chromium_src / "chrome" / "a.cc").read_text() == "patched a"
+    print("✓ Missing manifest test passed")
+
+
+def test_changed_gn_args():
+    """Test that added, removed and changed args are reported by name"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        _write(
+            ctx,
+            f"{ctx.out_dir}/args.gn",
+            "is_debug = false\nsymbol_level = 1  # keep it small\nuse_lld = true\n",
+        )
+        assert changed_gn_args(ctx) is None
+
+        _save_args_snapshot(ctx)
+        assert changed_gn_args(ctx) == []
+
+        # Comments and spacing are not changes
+        _write(
+            ctx,
+            f"{ctx.out_dir}/args.gn",
+            "# edited\nis_debug=false\nsymbol_level = 1\nuse_lld = true\n",
+        )
+        assert changed_gn_args(ctx) == []
+
+        _write(
+            ctx,
+            f"{ctx.out_dir}/args.gn",
+            'is_debug = true\nsymbol_level = 1\ncc_wrapper = "ccache"\n',
+        )
+        assert changed_gn_args(ctx) == ["cc_wrapper", "is_debug", "use_lld"]
+
+        # The snapshot is per architecture
+        ctx.architecture = "arm64"
+        assert changed_gn_args(ctx) is None
+    print("✓ Changed GN args test passed")
+
+
+def test_args_snapshot_round_trip():
+    """Test that the snapshot holds the parsed args and bad ones are ignored"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        _write(ctx, f"{ctx.out_dir}/args.gn", 'is_debug = false\ntarget_cpu = "x64"\n')
+        _save_args_snapshot(ctx)
+
+        snapshot = ctx.get_build_cache_dir() / "clean_args_x64.json"
+        assert json.loads(snapshot.read_text()) == {
+            "is_debug": "false",
+            "target_cpu": '"x64"',
+        }
+        assert not list(snapshot.parent.glob("*.tmp"))
+
+        snapshot.write_text("{truncated")
+        assert changed_gn_args(ctx) is None
+    print("✓ Args snapshot round trip test passed")
+
+
+def test_clean_stale_outputs():
+    """Test that ninja's tools run only once build.ninja exists"""
+    commands = []
+    run_command = clean.run_command
+    clean.run_command = lambda cmd, cwd=None: commands.append(cmd[-1])
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            ctx = _Context(Path(tmp))
+            _write(ctx, f"{ctx.out_dir}/args.gn", "is_debug = false\n")
+            assert clean_stale_outputs(ctx)
+            assert commands == []
+            assert changed_gn_args(ctx) is None
+
+            _write(ctx, f"{ctx.out_dir}/build.ninja", "")
+            assert clean_stale_outputs(ctx)
+            assert commands == ["cleandead", "restat"]
+            # The next stale clean compares against these args
+            assert changed_gn_args(ctx) == []
+    finally:
+        clean.run_command = run_command
+    print("✓ Stale outputs clean test passed")
+
+
+def run_all_tests():
+    """Run all clean tests"""
+    tests = [
+        test_restore_undoes_only_our_changes,
+        test_foreign_change_defers_to_full_reset,
+        test_missing_manifest_defers_to_full_reset,
+        test_changed_gn_args,
+        test_args_snapshot_round_trip,
+        test_clean_stale_outputs,
+    ]
+
+    print("Running clean tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
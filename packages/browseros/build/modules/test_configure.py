@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test script for GN configuration
+
+Covers rendering of args.gn, the digest the configure step is
+fingerprinted with, when gn gen can be skipped, and that unchanged
+args.gn and chrome/VERSION keep their mtimes.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.compiler_cache import CompilerCache
+from modules.compile import write_version_file
+from modules.configure import (
+    get_gn_args_digest,
+    gn_gen_reason,
+    read_gn_inputs,
+    render_gn_args,
+)
+from utils import write_if_changed
+
+
+class _Context:
+    def __init__(self, root: Path):
+        self.root_dir = root
+        self.chromium_src = root / "src"
+        self.architecture = "arm64"
+        self.out_dir = "out/Default_arm64"
+        (self.chromium_src / self.out_dir).mkdir(parents=True)
+        self.flags_file = root / "flags.gn"
+        self.flags_file.write_text("is_debug = false\nconcurrent_links = 2\n")
+        self.nxtscape_chromium_version = "137.0.7151.69"
+
+    def get_gn_flags_file(self) -> Path:
+        return self.flags_file
+
+    def get_gn_args_file(self) -> Path:
+        return self.chromium_src / self.out_dir / "args.gn"
+
+
+def test_render_gn_args():
+    """Test that args.gn gets the flags, target_cpu and cc_wrapper"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        content = render_gn_args(ctx, compiler_cache=CompilerCache("ccache"))
+        assert content.startswith("is_debug = false\n")
+        assert 'target_cpu = "arm64"' in content
+        assert 'cc_wrapper = "ccache"' in content
+        # concurrent_links from the flags file is kept as the only one
+        assert content.count("concurrent_links") == 1
+
+        ctx.flags_file.write_text('cc_wrapper = "sccache"\n')
+        content = render_gn_args(ctx, compiler_cache=CompilerCache("ccache"))
+        assert content.count("cc_wrapper") == 1
+    print("✓ Render args.gn test passed")
+
+
+def test_gn_args_digest_covers_all_inputs():
+    """Test that the digest changes with flags, architecture and cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        digest = get_gn_args_digest(ctx)
+        assert get_gn_args_digest(ctx) == digest
+        assert get_gn_args_digest(ctx, compiler_cache=CompilerCache("sccache")) != digest
+
+        ctx.architecture = "x64"
+        assert get_gn_args_digest(ctx) != digest
+        ctx.architecture = "arm64"
+
+        ctx.flags_file.write_text("is_debug = true\nconcurrent_links = 2\n")
+        assert get_gn_args_digest(ctx) != digest
+    print("✓ args.gn digest test passed")
+
+
+def _set_mtime(path: Path, seconds: int) -> None:
+    os.utime(path, ns=(seconds * 10**9, seconds * 10**9))
+
+
+def _write_gn_outputs(ctx: _Context) -> Path:
+    """args.gn, a BUILD.gn and the build.ninja generated from them"""
+    out_path = ctx.chromium_src / ctx.out_dir
+    (ctx.chromium_src / "BUILD.gn").write_text('group("all") {}')
+    (ctx.chromium_src / "dir with space").mkdir()
+    (ctx.chromium_src / "dir with space" / "BUILD.gn").write_text("")
+    ctx.get_gn_args_file().write_text("is_debug = false\n")
+    (out_path / "build.ninja.d").write_text(
+        "build.ninja: ../../BUILD.gn \\\n ../../dir\\ with\\ space/BUILD.gn\n"
+    )
+    build_ninja = out_path / "build.ninja"
+    build_ninja.write_text("")
+    for path in [
+        ctx.get_gn_args_file(),
+        ctx.chromium_src / "BUILD.gn",
+        ctx.chromium_src / "dir with space" / "BUILD.gn",
+    ]:
+        _set_mtime(path, 1000)
+    _set_mtime(build_ninja, 2000)
+    return build_ninja
+
+
+def test_read_gn_inputs():
+    """Test that the depfile is parsed, including escaped spaces"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        _write_gn_outputs(ctx)
+        inputs = read_gn_inputs(ctx.chromium_src / ctx.out_dir)
+        assert [p.resolve() for p in inputs] == [
+            (ctx.chromium_src / "BUILD.gn").resolve(),
+            (ctx.chromium_src / "dir with space" / "BUILD.gn").resolve(),
+        ]
+    print("✓ Read GN inputs test passed")
+
+
+def test_gn_gen_reason():
+    """Test that gn gen is skipped only while build.ninja is newest"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        assert gn_gen_reason(ctx) == "build.ninja missing"
+
+        build_ninja = _write_gn_outputs(ctx)
+        assert gn_gen_reason(ctx) is None
+
+        _set_mtime(ctx.get_gn_args_file(), 3000)
+        assert gn_gen_reason(ctx) == "args.gn is newer than build.ninja"
+        _set_mtime(build_ninja, 4000)
+
+        nested = ctx.chromium_src / "dir with space" / "BUILD.gn"
+        _set_mtime(nested, 5000)
+        assert gn_gen_reason(ctx) == "BUILD.gn is newer than build.ninja"
+        nested.unlink()
+        assert gn_gen_reason(ctx).endswith("missing")
+
+        (build_ninja.parent / "build.ninja.d").unlink()
+        assert gn_gen_reason(ctx) == "build.ninja.d unreadable"
+    print("✓ gn gen reason test passed")
+
+
+def test_unchanged_files_keep_mtime():
+    """Test that identical args.gn and chrome/VERSION are not rewritten"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        args_file = ctx.get_gn_args_file()
+        assert write_if_changed(args_file, "is_debug = false\n")
+        _set_mtime(args_file, 1000)
+        assert not write_if_changed(args_file, "is_debug = false\n")
+        assert args_file.stat().st_mtime_ns == 1000 * 10**9
+        assert write_if_changed(args_file, "is_debug = true\n")
+
+        version = ctx.chromium_src / "chrome" / "VERSION"
+        version.parent.mkdir()
+        write_version_file(ctx)
+        assert version.read_text() == "MAJOR=137\nMINOR=0\nBUILD=7151\nPATCH=69"
+        _set_mtime(version, 1000)
+        write_version_file(ctx)
+        assert version.stat().st_mtime_ns == 1000 * 10**9
+    print("✓ Unchanged file mtime test passed")
+
+
+def run_all_tests():
+    """Run all configure tests"""
+    tests = [
+        test_render_gn_args,
+        test_gn_args_digest_covers_all_inputs,
+        test_read_gn_inputs,
+        test_gn_gen_reason,
+        test_unchanged_files_keep_mtime,
+    ]
+
+    print("Running configure tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Test script for the download cache
+
+Serves files from a local HTTP server standing in for GitHub releases and
+covers verified downloads, refusing or trusting unpinned ones, streaming
+extraction of tar.xz archives, read-only cache entries and placement of
+cached trees.
+"""
+
+import hashlib
+import io
+import os
+import stat
+import sys
+import tarfile
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.download_cache import (
+    TRUST_FIRST_DOWNLOAD_ENV,
+    DownloadCache,
+    place_tree,
+)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        _QuietHandler.requests.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def _serve(directory: Path):
+    """Serve a directory over HTTP on a free local port"""
+    _QuietHandler.requests = []
+    handler = partial(_QuietHandler, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _make_archive(path: Path) -> bytes:
+    """Write a framework-like tar.xz with a nested file and a symlink"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:xz") as tar:
+        for name, data in [
+            ("Sparkle.framework/Versions/B/Sparkle", b"binary" * 1000),
+            ("Sparkle.framework/Versions/B/Resources/Info.plist", b"<plist/>"),
+        ]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        link = tarfile.TarInfo("Sparkle.framework/Versions/Current")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "B"
+        tar.addfile(link)
+    data = buffer.getvalue()
+    path.write_bytes(data)
+    return data
+
+
+def test_fetch_verifies_and_caches():
+    """Test that a download is verified, stored by hash and served from cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        served = Path(tmp) / "served"
+        served.mkdir()
+        data = b"#!/bin/sh\necho tool\n"
+        (served / "tool").write_bytes(data)
+        cache = DownloadCache(Path(tmp) / "cache")
+
+        with _serve(served) as base:
+            blob = cache.fetch(f"{base}/tool", _sha256(data))
+            assert blob.read_bytes() == data
+            assert blob.name == _sha256(data)
+
+            again = cache.fetch(f"{base}/tool", _sha256(data))
+            assert again == blob
+            assert _QuietHandler.requests == ["/tool"]
+
+            try:
+                cache.fetch(f"{base}/tool", "0" * 64)
+                assert False, "Mismatching checksum was accepted"
+            except RuntimeError as e:
+                assert "Checksum mismatch" in str(e)
+        assert not list((Path(tmp) / "cache" / "blobs").glob(".*.tmp"))
+    print("✓ Verified fetch test passed")
+
+
+def test_trust_on_first_use():
+    """Test that unpinned URLs need opting in, then must not change"""
+    with tempfile.TemporaryDirectory() as tmp:
+        served = Path(tmp) / "served"
+        served.mkdir()
+        (served / "tool").write_bytes(b"first")
+        cache = DownloadCache(Path(tmp) / "cache")
+
+        with _serve(served) as base:
+            url = f"{base}/tool"
+            try:
+                cache.fetch(url)
+                assert False, "Unpinned download was accepted"
+            except RuntimeError as e:
+                assert TRUST_FIRST_DOWNLOAD_ENV in str(e)
+            assert _QuietHandler.requests == []
+
+            os.environ[TRUST_FIRST_DOWNLOAD_ENV] = "1"
+            try:
+                blob = cache.fetch(url)
+            finally:
+                del os.environ[TRUST_FIRST_DOWNLOAD_ENV]
+            assert blob.read_bytes() == b"first"
+
+            # Cached by the recorded hash, no request
+            assert cache.fetch(url) == blob
+            assert len(_QuietHandler.requests) == 1
+
+            (served / "tool").write_bytes(b"second")
+            blob.unlink()
+            try:
+                cache.fetch(url)
+                assert False, "Changed content was accepted"
+            except RuntimeError as e:
+                assert "Checksum mismatch" in str(e)
+    print("✓ Trust on first use test passed")
+
+
+def test_fetch_tree_extracts_while_streaming():
+    """Test that an archive is extracted, verified and kept only as a tree"""
+    with tempfile.TemporaryDirectory() as tmp:
+        served = Path(tmp) / "served"
+        served.mkdir()
+        data = _make_archive(served / "Sparkle.tar.xz")
+        cache_root = Path(tmp) / "cache"
+        cache = DownloadCache(cache_root)
+
+        with _serve(served) as base:
+            url = f"{base}/Sparkle.tar.xz"
+            tree = cache.fetch_tree(url, _sha256(data))
+            assert tree == cache_root / "trees" / _sha256(data)
+            versions = tree / "Sparkle.framework" / "Versions"
+            assert (versions / "B" / "Sparkle").read_bytes() == b"binary" * 1000
+            assert os.readlink(versions / "Current") == "B"
+            assert not (cache_root / "blobs").exists()
+
+            assert cache.fetch_tree(url) == tree
+            assert len(_QuietHandler.requests) == 1
+
+            try:
+                DownloadCache(Path(tmp) / "other").fetch_tree(url, "0" * 64)
+                assert False, "Mismatching checksum was accepted"
+            except RuntimeError:
+                pass
+            assert not list((Path(tmp) / "other" / "trees").iterdir())
+    print("✓ Streaming extraction test passed")
+
+
+def test_place_tree_hardlinks():
+    """Test that placing a tree hardlinks files and recreates symlinks"""
+    with tempfile.TemporaryDirectory() as tmp:
+        served = Path(tmp) / "served"
+        served.mkdir()
+        data = _make_archive(served / "Sparkle.tar.xz")
+        cache = DownloadCache(Path(tmp) / "cache")
+        with _serve(served) as base:
+            tree = cache.fetch_tree(f"{base}/Sparkle.tar.xz", _sha256(data))
+
+        dest = Path(tmp) / "src" / "third_party" / "sparkle"
+        place_tree(tree, dest)
+        # Placing again over an existing tree works as well
+        place_tree(tree, dest)
+
+        binary = Path("Sparkle.framework") / "Versions" / "B" / "Sparkle"
+        assert (dest / binary).read_bytes() == b"binary" * 1000
+        assert os.path.samefile(dest / binary, tree / binary)
+        current = dest / "Sparkle.framework" / "Versions" / "Current"
+        assert current.is_symlink() and os.readlink(current) == "B"
+        # Cached files are read-only, so a hardlink can't be written through
+        assert not (tree / binary).stat().st_mode & stat.S_IWUSR
+    print("✓ Hardlinked placement test passed")
+
+
+def test_place_tree_copies():
+    """Test that copied trees are writable and independent of the cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        served = Path(tmp) / "served"
+        served.mkdir()
+        data = _make_archive(served / "Sparkle.tar.xz")
+        cache = DownloadCache(Path(tmp) / "cache")
+        with _serve(served) as base:
+            tree = cache.fetch_tree(f"{base}/Sparkle.tar.xz", _sha256(data))
+
+        dest = Path(tmp) / "sparkle"
+        place_tree(tree, dest, hardlink=False)
+        binary = Path("Sparkle.framework") / "Versions" / "B" / "Sparkle"
+        assert not os.path.samefile(dest / binary, tree / binary)
+
+        # What codesign --force does to a placed binary
+        (dest / binary).write_bytes(b"signed")
+        assert (tree / binary).read_bytes() == b"binary" * 1000
+        current = dest / "Sparkle.framework" / "Versions" / "Current"
+        assert os.readlink(current) == "B"
+    print("✓ Copied placement test passed")
+
+
+def run_all_tests():
+    """Run all download cache tests"""
+    tests = [
+        test_fetch_verifies_and_caches,
+        test_trust_on_first_use,
+        test_fetch_tree_extracts_while_streaming,
+        test_place_tree_hardlinks,
+        test_place_tree_copies,
+    ]
+
+    print("Running download cache tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for the structured build event log
+
+Covers the step index, failure deduplication, reading from step offsets in
+compressed logs, and that rotation only compresses logs of finished builds.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from events import (
+    EventLog,
+    find_event_logs,
+    is_finished,
+    load_index,
+    lock_path_for,
+    read_events,
+    rotate_logs,
+)
+
+
+def _write_build(log_dir: Path, name: str, close: bool = True) -> EventLog:
+    """Write a two-step build with a failing command; close it if asked"""
+    (log_dir / f"{name}.log").write_text("text log\n")
+    log = EventLog(log_dir / f"{name}.jsonl")
+    log.write(
+        [
+            {"ts": 1.0, "kind": "build_start"},
+            {"ts": 2.0, "kind": "step_start", "step": "configure[x64]"},
+            {"ts": 3.0, "kind": "step_end", "step": "configure[x64]", "status": "ran", "duration": 1.0},
+            {"ts": 4.0, "kind": "step_start", "step": "compile[x64]"},
+            {"ts": 5.0, "kind": "command_end", "step": "compile[x64]", "cmd": "autoninja", "exit_code": 1, "duration": 9.0},
+            {"ts": 6.0, "kind": "log", "step": "compile[x64]", "level": "error", "msg": "\nBuild failed"},
+            {"ts": 7.0, "kind": "step_end", "step": "compile[x64]", "status": "failed", "error": "exit 1"},
+            {"ts": 8.0, "kind": "build_end", "status": "failed"},
+        ]
+    )
+    if close:
+        log.close()
+    return log
+
+
+def test_index_steps_and_failures():
+    """Test that steps get offsets and a failure is recorded once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        _write_build(log_dir, "build_a")
+        index = load_index(log_dir / "build_a.jsonl")
+
+        assert index["closed"] and index["status"] == "failed"
+        assert set(index["steps"]) == {"configure[x64]", "compile[x64]"}
+        assert index["steps"]["compile[x64]"]["status"] == "failed"
+        assert len(index["failures"]) == 1
+        assert index["failures"][0]["cmd"] == "autoninja"
+        assert index["slow_commands"][0]["duration"] == 9.0
+
+        offset = index["steps"]["compile[x64]"]["offset"]
+        first = next(read_events(log_dir / "build_a.jsonl", offset))
+        assert first["kind"] == "step_start" and first["step"] == "compile[x64]"
+    print("✓ Index steps and failures test passed")
+
+
+def test_rotation_compresses_finished_builds():
+    """Test that closed logs are compressed and stay queryable by offset"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        _write_build(log_dir, "build_a")
+        rotate_logs(log_dir, "build_z")
+
+        assert not (log_dir / "build_a.jsonl").exists()
+        assert not (log_dir / "build_a.log").exists()
+        assert len(list(log_dir.glob("build_a.log.*"))) == 1
+        logs = find_event_logs(log_dir)
+        assert len(logs) == 1 and logs[0].name.startswith("build_a.jsonl.")
+
+        index = load_index(logs[0])
+        offset = index["steps"]["compile[x64]"]["offset"]
+        first = next(read_events(logs[0], offset))
+        assert first["step"] == "compile[x64]"
+    print("✓ Rotation of finished builds test passed")
+
+
+def test_rotation_skips_running_builds():
+    """Test that logs whose writer holds the lock are left alone"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        running = _write_build(log_dir, "build_b", close=False)
+        assert lock_path_for(running.path).exists()
+        assert not is_finished(log_dir / "build_b.log")
+
+        # Rotation started by another build
+        rotate_logs(log_dir, "build_z")
+        assert (log_dir / "build_b.jsonl").exists()
+        assert (log_dir / "build_b.log").exists()
+
+        running.close()
+        assert not lock_path_for(running.path).exists()
+        assert is_finished(log_dir / "build_b.jsonl")
+    print("✓ Running build skip test passed")
+
+
+def test_rotation_collects_killed_builds():
+    """Test that a log whose writer died without closing it is rotated"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        killed = _write_build(log_dir, "build_c", close=False)
+        # A dead process: its lock file is left behind but no longer held
+        killed.file.close()
+        killed.lock.close()
+
+        assert is_finished(log_dir / "build_c.jsonl")
+        rotate_logs(log_dir, "build_z")
+        assert not (log_dir / "build_c.jsonl").exists()
+        assert not lock_path_for(killed.path).exists()
+        assert len(find_event_logs(log_dir)) == 1
+    print("✓ Killed build collection test passed")
+
+
+def test_unlocked_incomplete_log_is_kept():
+    """Test that an unclosed log without a lock file is not compressed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        (log_dir / "build_d.log").write_text("written by an unknown process\n")
+        rotate_logs(log_dir, "build_z")
+        assert (log_dir / "build_d.log").exists()
+    print("✓ Unlocked incomplete log test passed")
+
+
+def run_all_tests():
+    """Run all event log tests"""
+    tests = [
+        test_index_steps_and_failures,
+        test_rotation_compresses_finished_builds,
+        test_rotation_skips_running_builds,
+        test_rotation_collects_killed_builds,
+        test_unlocked_incomplete_log_is_kept,
+    ]
+
+    print("Running event log tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
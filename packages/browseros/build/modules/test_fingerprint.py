@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script for the fingerprint store
+
+Covers why steps are stale, that unchanged files are only stat'ed, that
+records survive a restart, and skipping string replacements on targets
+that are already replaced.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import modules.fingerprint as fingerprint
+from modules.fingerprint import FingerprintStore
+from modules.pipeline import Pipeline, Step
+from modules.string_replaces import (
+    apply_string_replacements,
+    get_replacement_table_digest,
+    get_target_paths,
+    target_files,
+)
+
+
+def test_stale_reasons():
+    """Test that input, output, file set and configuration changes are reported"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "copy_resources.yaml"
+        output = Path(tmp) / "icon.png"
+        source.write_text("copy_operations: []")
+        output.write_text("icon")
+        store = FingerprintStore(Path(tmp) / "fingerprints.json")
+
+        def reason(outputs=(output,), extra="release"):
+            return store.stale_reason("copy", [source], list(outputs), extra)
+
+        assert reason() == "no previous successful run"
+        store.record("copy", [source], [output], "release")
+        assert reason() is None
+        assert reason(extra="debug") == "configuration changed"
+        assert reason(outputs=()) == "output file set changed"
+
+        source.write_text("copy_operations: [{}]")
+        assert reason().startswith("input changed")
+        store.record("copy", [source], [output], "release")
+
+        output.unlink()
+        assert reason().startswith("output missing")
+    print("✓ Stale reasons test passed")
+
+
+def test_unchanged_files_are_not_rehashed():
+    """Test that matching size and mtime reuse the cached hash"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "chromium_strings.grd"
+        path.write_text("BrowserOS")
+        store = FingerprintStore(Path(tmp) / "fingerprints.json")
+
+        hashed = []
+        original = fingerprint.hash_file
+
+        def counting_hash(p):
+            hashed.append(p)
+            return original(p)
+
+        fingerprint.hash_file = counting_hash
+        try:
+            digest = store.file_digest(path)
+            assert store.file_digest(path) == digest
+            assert len(hashed) == 1
+
+            path.write_text("BrowserOS Software Inc")
+            assert store.file_digest(path) != digest
+            assert len(hashed) == 2
+        finally:
+            fingerprint.hash_file = original
+    print("✓ Hash cache test passed")
+
+
+def test_records_persist():
+    """Test that a new store loaded from disk still skips the step"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "out.txt"
+        output.write_text("done")
+        store_path = Path(tmp) / "cache" / "fingerprints.json"
+        FingerprintStore(store_path).record("step", [], [output], "x")
+
+        reloaded = FingerprintStore(store_path)
+        assert reloaded.stale_reason("step", [], [output], "x") is None
+        reloaded.invalidate("step")
+        assert FingerprintStore(store_path).stale_reason("step", [], [output], "x")
+    print("✓ Persistence test passed")
+
+
+class _Context:
+    def __init__(self, root: Path):
+        self.chromium_src = root
+
+
+def test_string_replacements_skip_when_replaced():
+    """Test that the strings step reruns only when a target changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp) / "src")
+        for rel_path in target_files:
+            path = ctx.chromium_src / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                "The Chromium Authors. All rights reserved.\nGoogle Chrome\n"
+            )
+        store = FingerprintStore(Path(tmp) / "fingerprints.json")
+
+        def run_pipeline():
+            pipeline = Pipeline(store)
+            pipeline.add(
+                Step(
+                    "strings",
+                    lambda: apply_string_replacements(ctx),
+                    outputs=lambda: get_target_paths(ctx),
+                    extra=get_replacement_table_digest(),
+                )
+            )
+            pipeline.run()
+            return pipeline.results["strings"].status
+
+        assert run_pipeline() == "ran"
+        grd = get_target_paths(ctx)[0]
+        assert grd.read_text() == (
+            "The BrowserOS Authors. All rights reserved.\nBrowserOS\n"
+        )
+        assert run_pipeline() == "skipped"
+
+        # A git checkout brings back the original strings
+        grd.write_text("Chromium\n")
+        assert run_pipeline() == "ran"
+        assert grd.read_text() == "BrowserOS\n"
+        assert run_pipeline() == "skipped"
+    print("✓ String replacement skip test passed")
+
+
+def run_all_tests():
+    """Run all fingerprint tests"""
+    tests = [
+        test_stale_reasons,
+        test_unchanged_files_are_not_rehashed,
+        test_records_persist,
+        test_string_replacements_skip_when_replaced,
+    ]
+
+    print("Running fingerprint tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for skipping the git fetch and gclient sync
+
+Builds a small git repository standing in for chromium_src, tagged with
+the Chromium version, and covers when the recorded sync stamp still
+matches the checkout.
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.git import _save_sync_stamp, _sync_stamp_path, get_sync_state, is_synced
+
+CHROMIUM_VERSION = "137.0.7151.69"
+
+
+class _Context:
+    def __init__(self, root: Path):
+        self.chromium_src = root / "src"
+        self.chromium_version = CHROMIUM_VERSION
+
+    def get_build_cache_dir(self) -> Path:
+        return self.chromium_src / "out" / ".browseros_cache"
+
+
+def _git(ctx: _Context, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + list(args),
+        cwd=ctx.chromium_src,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _make_checkout(root: Path) -> _Context:
+    """Checkout at an annotated version tag, with DEPS and a .gclient"""
+    ctx = _Context(root)
+    ctx.chromium_src.mkdir()
+    (ctx.chromium_src / "DEPS").write_text("deps = {}\n")
+    (ctx.chromium_src / ".gitignore").write_text("out/\n")
+    (root / ".gclient").write_text('solutions = [{"name": "src"}]\n')
+    _git(ctx, "init", "-q")
+    _git(ctx, "add", "-A")
+    _git(ctx, "commit", "-q", "-m", "base")
+    _git(ctx, "tag", "-a", CHROMIUM_VERSION, "-m", "release")
+    return ctx
+
+
+def _record_sync(ctx: _Context) -> None:
+    _save_sync_stamp(ctx, get_sync_state(ctx), 1800.0)
+
+
+def test_sync_state():
+    """Test that the state needs HEAD at the tag and covers DEPS and .gclient"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_checkout(Path(tmp))
+        state = get_sync_state(ctx)
+        assert state["tag"] == CHROMIUM_VERSION
+        assert len(state["commit"]) == 40
+        assert state["deps"] and state["gclient"]
+
+        ctx.chromium_version = "138.0.0.0"
+        assert get_sync_state(ctx) is None
+        ctx.chromium_version = CHROMIUM_VERSION
+
+        (Path(tmp) / ".gclient").unlink()
+        assert get_sync_state(ctx)["gclient"] is None
+    print("✓ Sync state test passed")
+
+
+def test_stamp_mismatch():
+    """Test that edits to DEPS or .gclient force a sync"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_checkout(Path(tmp))
+        assert not is_synced(ctx)
+        _record_sync(ctx)
+        assert is_synced(ctx)
+
+        deps = ctx.chromium_src / "DEPS"
+        deps.write_text("deps = {'src/third_party/foo': 'abc'}\n")
+        assert not is_synced(ctx)
+        deps.write_text("deps = {}\n")
+        assert is_synced(ctx)
+
+        gclient = Path(tmp) / ".gclient"
+        gclient.write_text('solutions = [{"name": "src", "managed": False}]\n')
+        assert not is_synced(ctx)
+        gclient.unlink()
+        assert not is_synced(ctx)
+    print("✓ Stamp mismatch test passed")
+
+
+def test_head_moved_off_tag():
+    """Test that a checkout away from the tag forces a sync"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_checkout(Path(tmp))
+        _record_sync(ctx)
+
+        (ctx.chromium_src / "README").write_text("local commit")
+        _git(ctx, "add", "README")
+        _git(ctx, "commit", "-q", "-m", "local")
+        assert get_sync_state(ctx) is None
+        assert not is_synced(ctx)
+
+        _git(ctx, "checkout", "-q", CHROMIUM_VERSION)
+        assert is_synced(ctx)
+    print("✓ HEAD off tag test passed")
+
+
+def test_unreadable_stamp():
+    """Test that a corrupt stamp forces a sync instead of failing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _make_checkout(Path(tmp))
+        _record_sync(ctx)
+        _sync_stamp_path(ctx).write_text('{"tag": "137.0')
+        assert not is_synced(ctx)
+    print("✓ Unreadable stamp test passed")
+
+
+def run_all_tests():
+    """Run all git sync tests"""
+    tests = [
+        test_sync_state,
+        test_stamp_mismatch,
+        test_head_moved_off_tag,
+        test_unreadable_stamp,
+    ]
+
+    print("Running git sync tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
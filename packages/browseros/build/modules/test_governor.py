@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-aware parallelism governor
+
+Covers the -j arithmetic, that concurrent_links does not follow measured
+peaks (it is written into args.gn), and the peak history window.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.governor import (
+    GIB_KB,
+    HISTORY_SAMPLES,
+    PEAK_MARGIN,
+    compute_plan,
+    concurrent_links,
+    get_concurrent_links_arg,
+    load_history,
+    record_peaks,
+)
+
+
+class _Context:
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+
+    def get_build_cache_dir(self) -> Path:
+        return self.cache_dir
+
+
+def _meminfo(total_gib: float, available_gib: float):
+    return {"total": int(total_gib * GIB_KB), "available": int(available_gib * GIB_KB)}
+
+
+def test_concurrent_links_ignores_history():
+    """Test that concurrent_links depends on total memory and cores only"""
+    meminfo = _meminfo(64, 60)
+    light = compute_plan(meminfo, 16, {"link": [2 * GIB_KB]})
+    heavy = compute_plan(meminfo, 16, {"link": [20 * GIB_KB]})
+    assert light.links == heavy.links == concurrent_links(meminfo["total"], 16)
+
+    # (64 - 6.4 reserved) GiB * 0.5 / 10 GiB per link
+    assert light.links == 2
+    # MemTotal jitter between boots does not move it
+    assert concurrent_links(64 * GIB_KB - 100, 16) == concurrent_links(
+        64 * GIB_KB - 300, 16
+    )
+    assert concurrent_links(8 * GIB_KB, 16) == 1
+    assert concurrent_links(512 * GIB_KB, 4) == 4
+    print("✓ Stable concurrent_links test passed")
+
+
+def test_jobs_follow_measured_peaks():
+    """Test that -j shrinks as measured compile and link peaks grow"""
+    meminfo = _meminfo(64, 60)
+    default = compute_plan(meminfo, 64, {})
+    heavy_compile = compute_plan(meminfo, 64, {"compile": [3 * GIB_KB]})
+    heavy_link = compute_plan(meminfo, 64, {"link": [15 * GIB_KB]})
+    assert heavy_compile.jobs < default.jobs
+    assert heavy_link.jobs < default.jobs
+    assert heavy_compile.compile_peak_kb == int(3 * GIB_KB * PEAK_MARGIN)
+
+    # (60 - 6.4 - 2 links * 12 GiB) / 1.2 GiB per compile
+    plan = compute_plan(meminfo, 64, {"compile": [GIB_KB], "link": [10 * GIB_KB]})
+    assert plan.jobs == 24 and plan.load == 64
+
+    starved = compute_plan(_meminfo(16, 2), 8, {})
+    assert starved.jobs == 1 and starved.links == 1
+    print("✓ Job sizing test passed")
+
+
+def test_history_window():
+    """Test that only the most recent peaks are kept"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp) / "cache")
+        for peak in range(1, HISTORY_SAMPLES + 3):
+            record_peaks(ctx, {"compile": peak, "link": 0})
+        history = load_history(ctx)
+        assert history["compile"] == list(range(3, HISTORY_SAMPLES + 3))
+        assert "link" not in history
+    print("✓ History window test passed")
+
+
+def test_user_concurrent_links_wins():
+    """Test that a concurrent_links set in the flags file is kept"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        assert get_concurrent_links_arg(ctx, "is_debug = false\nconcurrent_links = 3\n") == ""
+    print("✓ User concurrent_links test passed")
+
+
+def run_all_tests():
+    """Run all governor tests"""
+    tests = [
+        test_concurrent_links_ignores_history,
+        test_jobs_follow_measured_peaks,
+        test_history_window,
+        test_user_concurrent_links_wins,
+    ]
+
+    print("Running governor tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched build log writer
+
+Covers that the queued tail is written when the build exits and that
+logging after close_log is harmless. Each test runs a short build in a
+fresh interpreter with its own log directory, since closing the log is
+process-wide.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BUILD_DIR = Path(__file__).parent.parent
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(BUILD_DIR))
+
+from utils import LOG_BATCH_SIZE
+
+
+def _run_build(log_dir: Path, script: str) -> subprocess.CompletedProcess:
+    """Run script with utils imported and the logs in log_dir"""
+    env = dict(os.environ, BROWSEROS_LOG_DIR=str(log_dir))
+    return subprocess.run(
+        [sys.executable, "-c", "from utils import *\n" + script],
+        cwd=BUILD_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def _read_logs(log_dir: Path):
+    """Text log and event log of the single build in log_dir"""
+    text_log = next(log_dir.glob("build_*.log")).read_text()
+    events = [
+        json.loads(line)
+        for line in next(log_dir.glob("build_*.jsonl")).read_text().splitlines()
+    ]
+    return text_log, events
+
+
+def test_logging_after_close():
+    """Test that log calls after close_log neither raise nor reopen the event log"""
+    with tempfile.TemporaryDirectory() as tmp:
+        result = _run_build(
+            Path(tmp),
+            "log_info('before close')\n"
+            "close_log()\n"
+            "log_info('after close')\n"
+            "log_event('late', value=1)\n",
+        )
+        assert result.returncode == 0, result.stderr
+        assert "Failed to write build log" not in result.stderr
+
+        text_log, events = _read_logs(Path(tmp))
+        assert "before close" in text_log
+        assert "after close" in text_log
+        assert [e["msg"] for e in events if e["kind"] == "log"] == ["before close"]
+        assert not [e for e in events if e["kind"] == "late"]
+    print("✓ Logging after close test passed")
+
+
+def test_close_flushes_queued_tail():
+    """Test that lines still queued at exit are written, across several batches"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # No explicit close_log: the atexit hook has to write the tail
+        result = _run_build(
+            Path(tmp),
+            "for i in range(3 * LOG_BATCH_SIZE + 7):\n"
+            "    log_info(f'line {i}')\n",
+        )
+        assert result.returncode == 0, result.stderr
+
+        text_log, events = _read_logs(Path(tmp))
+        count = 3 * LOG_BATCH_SIZE + 7
+        assert f"INFO: line {count - 1}\n" in text_log
+        assert text_log.count("INFO: line ") == count
+        messages = [e["msg"] for e in events if e["kind"] == "log"]
+        assert messages == [f"line {i}" for i in range(count)]
+    print("✓ Close flush test passed")
+
+
+def run_all_tests():
+    """Run all build log tests"""
+    tests = [
+        test_logging_after_close,
+        test_close_flushes_queued_tail,
+    ]
+
+    print("Running build log tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test script for the ninja log analyzer
+
+Covers incremental parsing, build boundary detection, recompacted logs,
+the critical path heuristic and build-to-build diffs.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.ninja_log import (
+    LogState,
+    analyze_ninja_log,
+    critical_path,
+    group_edges,
+    read_ninja_log,
+    summarize,
+    target_directory,
+)
+
+HEADER = "# ninja log v5\n"
+
+
+def _entry(start, end, output, cmd_hash="h"):
+    return f"{start}\t{end}\t0\t{output}\t{cmd_hash}{output}\n"
+
+
+def test_incremental_parse():
+    """Test that only appended entries are read on the second call"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / ".ninja_log"
+        log.write_text(HEADER + _entry(0, 100, "obj/a.o"))
+
+        state, new = read_ninja_log(log, LogState())
+        assert new
+        assert list(state.entries) == ["obj/a.o"]
+        offset = state.offset
+
+        state, new = read_ninja_log(log, state)
+        assert not new
+        assert state.offset == offset
+
+        with open(log, "a") as f:
+            f.write(_entry(100, 250, "obj/b.o"))
+            f.write("300\t400\t0\tobj/partial")  # still being written
+        state, new = read_ninja_log(log, state)
+        assert new
+        assert sorted(state.entries) == ["obj/a.o", "obj/b.o"]
+
+        with open(log, "a") as f:
+            f.write(".o\thpartial\n")
+        state, _ = read_ninja_log(log, state)
+        assert "obj/partial.o" in state.entries
+    print("✓ Incremental parse test passed")
+
+
+def test_new_build_resets_entries():
+    """Test that end times going backwards start a new build"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / ".ninja_log"
+        log.write_text(
+            HEADER
+            + _entry(0, 100, "obj/a.o")
+            + _entry(0, 900, "obj/b.o")
+            + _entry(0, 50, "obj/a.o")
+        )
+        state, _ = read_ninja_log(log, LogState())
+        assert list(state.entries) == ["obj/a.o"]
+        assert state.entries["obj/a.o"][1] == 50
+    print("✓ New build detection test passed")
+
+
+def test_recompacted_log_is_reread():
+    """Test that a log smaller than the saved offset is parsed from scratch"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / ".ninja_log"
+        entries = "".join(_entry(i, i + 10, f"obj/{i}.o") for i in range(20))
+        log.write_text(HEADER + entries)
+        state, _ = read_ninja_log(log, LogState())
+
+        log.write_text(HEADER + _entry(0, 10, "obj/only.o"))
+        state, new = read_ninja_log(log, state)
+        assert new
+        assert list(state.entries) == ["obj/only.o"]
+    print("✓ Recompacted log test passed")
+
+
+def test_multi_output_edges():
+    """Test that outputs of one command are grouped into one edge"""
+    entries = {
+        "gen/x.h": [0, 100, "same"],
+        "gen/x.cc": [0, 100, "same"],
+        "obj/y.o": [0, 100, "other"],
+    }
+    edges = group_edges(entries)
+    assert len(edges) == 2
+    assert any(edge.outputs == ["gen/x.cc", "gen/x.h"] for edge in edges)
+    print("✓ Multi-output edge test passed")
+
+
+def test_critical_path():
+    """Test the timing-based critical path"""
+    entries = {
+        "obj/a.o": [0, 100, "a"],
+        "obj/b.o": [0, 30, "b"],
+        "obj/c.o": [100, 400, "c"],
+        "obj/d.o": [120, 200, "d"],
+        "chrome": [400, 1000, "link"],
+    }
+    path = critical_path(group_edges(entries))
+    assert [edge.name for edge in path] == ["obj/a.o", "obj/c.o", "chrome"]
+    print("✓ Critical path test passed")
+
+
+def test_target_directory():
+    """Test directory attribution of outputs"""
+    assert target_directory("obj/chrome/browser/browser_os_api.o") == "chrome/browser"
+    assert target_directory("gen/components/foo.h") == "components"
+    assert target_directory("chrome") == "."
+    print("✓ Target directory test passed")
+
+
+def test_summary_and_diff():
+    """Test that a second build is diffed against the first"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / ".ninja_log"
+        cache = Path(tmp) / "cache"
+        log.write_text(
+            HEADER
+            + _entry(0, 200, "obj/base/x.o")
+            + _entry(0, 1000, "obj/chrome/browser/api.o")
+        )
+        first = analyze_ninja_log(log, cache)
+        assert first["diff"] is None
+        assert first["summary"]["edges"] == 2
+        assert first["summary"]["slowest"][0]["target"] == "obj/chrome/browser/api.o"
+
+        # No-op build: nothing appended
+        assert analyze_ninja_log(log, cache) is None
+
+        with open(log, "a") as f:
+            f.write(_entry(0, 3000, "obj/chrome/browser/api.o"))
+        second = analyze_ninja_log(log, cache)
+        diff = second["diff"]
+        assert second["summary"]["edges"] == 1
+        assert diff["wall_delta_s"] == 2.0
+        assert diff["targets"][0]["delta_s"] == 2.0
+        # First build: the two edges shared their first 200ms
+        changes = {c["directory"]: c["delta_s"] for c in diff["directories"]}
+        assert abs(changes["chrome/browser"] - 2.1) < 1e-9
+        assert abs(changes["base"] + 0.1) < 1e-9
+    print("✓ Summary and diff test passed")
+
+
+def test_weighted_directory_time():
+    """Test that directory time is weighted by parallelism"""
+    summary = summarize(
+        {
+            "obj/a/1.o": [0, 1000, "1"],
+            "obj/b/2.o": [0, 1000, "2"],
+            "obj/b/3.o": [1000, 2000, "3"],
+        }
+    )
+    assert summary["directories"]["a"]["weighted_s"] == 0.5
+    assert summary["directories"]["b"]["weighted_s"] == 1.5
+    assert summary["directories"]["b"]["time_s"] == 2.0
+    print("✓ Weighted directory time test passed")
+
+
+def run_all_tests():
+    """Run all tests"""
+    tests = [
+        test_incremental_parse,
+        test_new_build_resets_entries,
+        test_recompacted_log_is_reread,
+        test_multi_output_edges,
+        test_critical_path,
+        test_target_directory,
+        test_summary_and_diff,
+        test_weighted_directory_time,
+    ]
+
+    print("Running ninja log analyzer tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
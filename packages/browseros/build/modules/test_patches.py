@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the patch step's fingerprint paths
+
+Covers that patches and the deleted, binary and rename markers next to them
+all count as inputs, with the chromium_src files they touch as outputs.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.fingerprint import FingerprintStore
+from modules.patches import get_patch_fingerprint_paths
+
+
+class _Context:
+    def __init__(self, root: Path):
+        self.root_dir = root
+        self.chromium_src = root / "src"
+        self.chromium_src.mkdir()
+
+    def get_dev_patches_dir(self) -> Path:
+        return self.root_dir / "chromium_patches"
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_markers_are_fingerprinted():
+    """Test that marker files are inputs and the files they name outputs"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        patches = ctx.get_dev_patches_dir()
+        _write(patches / "chrome" / "BUILD.gn", "diff")
+        _write(patches / "chrome" / "old.cc.deleted", "File deleted in patch\n")
+        _write(
+            patches / "chrome" / "new.cc.rename",
+            "Renamed from: chrome/renamed.cc\nSimilarity: 100%\n",
+        )
+        _write(patches / "chrome" / ".DS_Store", "")
+
+        inputs, outputs = get_patch_fingerprint_paths(ctx)
+        assert sorted(p.name for p in inputs) == [
+            "BUILD.gn",
+            "new.cc.rename",
+            "old.cc.deleted",
+        ]
+        src = ctx.chromium_src / "chrome"
+        assert sorted(outputs) == sorted(
+            [src / "BUILD.gn", src / "old.cc", src / "new.cc", src / "renamed.cc"]
+        )
+    print("✓ Marker fingerprint paths test passed")
+
+
+def test_restored_deleted_file_invalidates():
+    """Test that a file a marker deletes coming back makes the step stale"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        _write(ctx.get_dev_patches_dir() / "old.cc.deleted", "File deleted in patch\n")
+        store = FingerprintStore(Path(tmp) / "fingerprints.json")
+
+        inputs, outputs = get_patch_fingerprint_paths(ctx)
+        store.record("patches", inputs, outputs)
+        assert store.stale_reason("patches", inputs, outputs) is None
+
+        (ctx.chromium_src / "old.cc").write_text("restored by git checkout")
+        assert store.stale_reason("patches", inputs, outputs) is not None
+    print("✓ Restored deleted file test passed")
+
+
+def run_all_tests():
+    """Run all patch fingerprint tests"""
+    tests = [
+        test_markers_are_fingerprinted,
+        test_restored_deleted_file_invalidates,
+    ]
+
+    print("Running patch fingerprint tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Test script for the build pipeline and journal
+
+Covers dependency scheduling, blocking on raised or returned failures,
+stopping running commands on an interrupt, fingerprint skips with file
+and callable inputs, and which steps the journal lets --resume skip.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.fingerprint import FingerprintStore
+from modules.journal import BuildJournal
+from modules.pipeline import Pipeline, Step
+import utils
+
+BUILD_KEY = {"chromium_version": "1.0", "architectures": ["x64"]}
+
+
+def test_dependency_order_and_blocking():
+    """Test that steps wait for deps, and failures block only dependents"""
+    ran = []
+    lock = threading.Lock()
+
+    def record(name, fail=False):
+        def run():
+            with lock:
+                ran.append(name)
+            if fail:
+                raise RuntimeError(f"{name} broke")
+
+        return run
+
+    pipeline = Pipeline(max_workers=4)
+    pipeline.add(Step("clean", record("clean"), enabled=False))
+    pipeline.add(Step("setup", record("setup"), deps=["clean"]))
+    pipeline.add(Step("compile", record("compile", fail=True), deps=["setup"]))
+    pipeline.add(Step("sign", record("sign"), deps=["compile"]))
+    pipeline.add(Step("docs", record("docs"), deps=["setup"]))
+    pipeline.run()
+
+    assert ran.index("setup") < ran.index("compile")
+    assert "clean" not in ran and "sign" not in ran and "docs" in ran
+    statuses = {name: result.status for name, result in pipeline.results.items()}
+    assert statuses == {
+        "clean": "disabled",
+        "setup": "ran",
+        "compile": "failed",
+        "sign": "blocked",
+        "docs": "ran",
+    }
+    assert pipeline.failures() == {"compile": "compile broke"}
+    print("✓ Dependency order and blocking test passed")
+
+
+def test_false_return_fails_and_blocks():
+    """Test that a step returning False fails the build and blocks dependents"""
+    ran = []
+    pipeline = Pipeline()
+    pipeline.add(Step("resources", lambda: False))
+    pipeline.add(
+        Step("configure", lambda: ran.append("configure"), deps=["resources"])
+    )
+    pipeline.add(Step("compile", lambda: ran.append("compile"), deps=["configure"]))
+    pipeline.run()
+
+    assert ran == []
+    statuses = {name: result.status for name, result in pipeline.results.items()}
+    assert statuses == {
+        "resources": "failed",
+        "configure": "blocked",
+        "compile": "blocked",
+    }
+    assert pipeline.failures() == {"resources": "step reported failure"}
+    print("✓ False return test passed")
+
+
+def test_interrupt_terminates_commands():
+    """Test that an interrupt stops running commands instead of waiting on them"""
+    started = []
+
+    def compile_step():
+        utils.run_command([sys.executable, "-c", "import time; time.sleep(60)"])
+
+    def interrupted_step():
+        deadline = time.time() + 10
+        while not utils._active_processes and time.time() < deadline:
+            time.sleep(0.05)
+        started.extend(utils._active_processes)
+        raise KeyboardInterrupt
+
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add(Step("compile", compile_step))
+    pipeline.add(Step("sign", interrupted_step))
+
+    start = time.time()
+    try:
+        pipeline.run()
+        assert False, "Interrupt was not raised"
+    except KeyboardInterrupt:
+        pass
+    assert time.time() - start < 20
+    assert len(started) == 1
+    # Already stopped, so this returns at once
+    assert started[0].wait(timeout=1) != 0
+    print("✓ Interrupt termination test passed")
+
+
+def test_fingerprint_skip_and_invalidation():
+    """Test that unchanged steps are skipped and changed inputs rerun them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "input.txt"
+        output = Path(tmp) / "output.txt"
+        source.write_text("v1")
+        store = FingerprintStore(Path(tmp) / "fingerprints.json")
+
+        def copy():
+            output.write_text(source.read_text())
+
+        def run_pipeline(returns=None):
+            pipeline = Pipeline(store)
+            pipeline.add(
+                Step(
+                    "copy",
+                    lambda: copy() if returns is None else returns,
+                    inputs=lambda: [source],
+                    outputs=lambda: [output],
+                )
+            )
+            pipeline.run()
+            return pipeline.results["copy"].status
+
+        assert run_pipeline() == "ran"
+        assert run_pipeline() == "skipped"
+        source.write_text("v2")
+        assert run_pipeline() == "ran"
+        output.write_text("edited")
+        assert run_pipeline() == "ran"
+
+        # A step returning False is not fingerprinted as done
+        source.write_text("v3")
+        assert run_pipeline(returns=False) == "failed"
+        assert run_pipeline(returns=False) == "failed"
+        assert run_pipeline() == "ran"
+    print("✓ Fingerprint skip test passed")
+
+
+def test_callable_extra():
+    """Test that a callable extra is evaluated on every check"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "args.gn"
+        store = FingerprintStore(Path(tmp) / "fingerprints.json")
+        settings = {"links": "2"}
+
+        def run_pipeline():
+            pipeline = Pipeline(store)
+            pipeline.add(
+                Step(
+                    "configure",
+                    lambda: output.write_text(settings["links"]),
+                    outputs=lambda: [output],
+                    extra=lambda: settings["links"],
+                )
+            )
+            pipeline.run()
+            return pipeline.results["configure"].status
+
+        assert run_pipeline() == "ran"
+        assert run_pipeline() == "skipped"
+        settings["links"] = "4"
+        assert run_pipeline() == "ran"
+        assert output.read_text() == "4"
+    print("✓ Callable extra test passed")
+
+
+def test_journal_resume():
+    """Test that only successful steps with intact artifacts are resumed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        journal_path = Path(tmp) / "build_journal.json"
+        package = Path(tmp) / "browser.dmg"
+
+        def make_package():
+            package.write_bytes(b"dmg")
+
+        def run_pipeline(resume):
+            pipeline = Pipeline(journal=BuildJournal(journal_path, BUILD_KEY, resume))
+            pipeline.add(
+                Step("package", make_package, artifacts=lambda: [package])
+            )
+            pipeline.add(Step("sign", lambda: False, deps=["package"]))
+            pipeline.run()
+            return {name: result.status for name, result in pipeline.results.items()}
+
+        assert run_pipeline(resume=False) == {"package": "ran", "sign": "failed"}
+        # sign returned False, so resume runs it again
+        assert run_pipeline(resume=True) == {"package": "resumed", "sign": "failed"}
+
+        package.write_bytes(b"rebuilt dmg")
+        assert run_pipeline(resume=True)["package"] == "ran"
+
+        other = BuildJournal(journal_path, {**BUILD_KEY, "architectures": ["arm64"]}, True)
+        assert other.completed_intact("package") == "not completed in previous run"
+    print("✓ Journal resume test passed")
+
+
+def test_resume_sees_through_disabled_steps():
+    """Test that a rerun behind a disabled step prevents resuming"""
+    with tempfile.TemporaryDirectory() as tmp:
+        journal_path = Path(tmp) / "build_journal.json"
+        args_gn = Path(tmp) / "args.gn"
+        args_gn.write_text("is_debug = false")
+        store = FingerprintStore(Path(tmp) / "fingerprints.json")
+
+        def run_pipeline(resume):
+            pipeline = Pipeline(
+                store, journal=BuildJournal(journal_path, BUILD_KEY, resume)
+            )
+            pipeline.add(Step("configure", lambda: None, outputs=lambda: [args_gn]))
+            pipeline.add(
+                Step("clean_stale", lambda: None, deps=["configure"], enabled=False)
+            )
+            pipeline.add(Step("compile", lambda: None, deps=["clean_stale"]))
+            pipeline.run()
+            return {name: result.status for name, result in pipeline.results.items()}
+
+        assert run_pipeline(resume=False)["compile"] == "ran"
+        assert run_pipeline(resume=True) == {
+            "configure": "resumed",
+            "clean_stale": "disabled",
+            "compile": "resumed",
+        }
+
+        args_gn.write_text("is_debug = true")
+        statuses = run_pipeline(resume=True)
+        assert statuses["configure"] == "ran"
+        assert statuses["compile"] == "ran"
+    print("✓ Transitive resume test passed")
+
+
+def test_journal_app_bundle_markers():
+    """Test that changes inside a .app bundle invalidate its journal entry"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Path(tmp) / "BrowserOS.app"
+        macos_dir = app / "Contents" / "MacOS"
+        macos_dir.mkdir(parents=True)
+        (app / "Contents" / "Info.plist").write_text("<plist/>")
+        executable = macos_dir / "BrowserOS"
+        executable.write_bytes(b"binary")
+
+        journal = BuildJournal(Path(tmp) / "journal.json", BUILD_KEY)
+        journal.record("compile[arm64]", [app])
+        assert journal.completed_intact("compile[arm64]") is None
+
+        executable.write_bytes(b"rebuilt binary")
+        assert "artifact changed" in journal.completed_intact("compile[arm64]")
+
+        journal.record("compile[arm64]", [app])
+        executable.unlink()
+        assert "artifact changed" in journal.completed_intact("compile[arm64]")
+    print("✓ App bundle marker test passed")
+
+
+def run_all_tests():
+    """Run all pipeline tests"""
+    tests = [
+        test_dependency_order_and_blocking,
+        test_false_return_fails_and_blocks,
+        test_interrupt_terminates_commands,
+        test_fingerprint_skip_and_invalidation,
+        test_callable_extra,
+        test_journal_resume,
+        test_resume_sees_through_disabled_steps,
+        test_journal_app_bundle_markers,
+    ]
+
+    print("Running pipeline tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script for the progress renderers
+
+Covers parsing ninja and gclient status lines, which other lines are
+printed under a status line, and the fallback to printing every line when
+stdout is not a terminal or other steps are running.
+"""
+
+import io
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import modules.progress as progress
+from modules.progress import GclientProgress, NinjaProgress
+from utils import OutputCapture, capture_output
+
+
+def test_ninja_status_lines():
+    """Test both ninja's default status and autoninja's format"""
+    ninja = NinjaProgress()
+    assert ninja.parse("[12/345] CXX obj/chrome/browser/a.o") == (
+        12,
+        345,
+        "CXX obj/chrome/browser/a.o",
+    )
+    assert ninja.parse(
+        "[32 processes, 1200/54321 @ 35.2/s : 61.3s ] LINK ./chrome"
+    ) == (1200, 54321, "LINK ./chrome")
+    assert ninja.parse("[1/1] STAMP obj/x.stamp")[:2] == (1, 1)
+
+    assert ninja.parse("../../chrome/a.cc:10:5: error: expected ';'") is None
+    assert ninja.parse("ninja: Entering directory `out/Default_x64'") is None
+    assert ninja.parse("[chrome] not a status line") is None
+    print("✓ Ninja status line test passed")
+
+
+def test_gclient_status_lines():
+    """Test project and hook counters and the notable-line filter"""
+    gclient = GclientProgress()
+    assert gclient.parse("Syncing projects:  45% (45/100) src/v8") == (
+        45,
+        100,
+        "Syncing projects: src/v8",
+    )
+    assert gclient.parse("Syncing projects: 100% (100/100), done.") == (
+        100,
+        100,
+        "Syncing projects: done.",
+    )
+    assert gclient.parse("Running hooks:   10% ( 3/30) lastchange") == (
+        3,
+        30,
+        "Running hooks: lastchange",
+    )
+    assert gclient.parse("Running hooks:  50% (15/30)") == (15, 30, "Running hooks")
+    assert gclient.parse("________ running 'vpython3 lastchange.py'") is None
+
+    assert gclient.is_notable("Error: Command 'git fetch' returned 128")
+    assert gclient.is_notable("fatal: unable to access 'https://...'")
+    assert not gclient.is_notable("src/v8 (Elapsed: 0:00:12)")
+    print("✓ gclient status line test passed")
+
+
+def _feed_live(renderer, lines):
+    """Feed lines as on a terminal with only this step running"""
+    live_console, running_steps = progress.live_console, progress.running_steps
+    stdout = sys.stdout
+    progress.live_console = lambda: True
+    progress.running_steps = lambda: 1
+    sys.stdout = io.StringIO()
+    try:
+        with capture_output() as printed:
+            for line in lines:
+                renderer.feed(line)
+            renderer._clear()
+        return printed, sys.stdout.getvalue()
+    finally:
+        progress.live_console, progress.running_steps = live_console, running_steps
+        sys.stdout = stdout
+
+
+def test_status_line_on_terminal():
+    """Test that only notable lines are printed under the status line"""
+    lines = [
+        "Syncing projects:  50% (1/2) src/v8",
+        "src/v8 (Elapsed: 0:00:12)",
+        "Error: checkout failed",
+        "Syncing projects: 100% (2/2), done.",
+    ]
+    gclient = GclientProgress()
+    printed, status = _feed_live(gclient, lines)
+    assert printed == ["Error: checkout failed"]
+    assert "[2/2] 100.0%" in status
+    assert gclient.hidden
+    print("✓ Terminal status line test passed")
+
+
+def test_plain_output_fallback():
+    """Test that every line is printed when not on a terminal or not alone"""
+    lines = [
+        "[1/3] CXX a.o",
+        "warning: unused variable",
+        "[2/3] CXX b.o",
+        "[3/3] LINK chrome",
+    ]
+    # Not a terminal: console output is captured by capture_output
+    ninja = NinjaProgress()
+    with capture_output() as printed:
+        for line in lines:
+            ninja.feed(line)
+    assert printed == lines
+    assert (ninja.done, ninja.total) == (3, 3)
+
+    # Another step running alongside this one
+    live_console, running_steps = progress.live_console, progress.running_steps
+    progress.live_console = lambda: True
+    progress.running_steps = lambda: 2
+    try:
+        ninja = NinjaProgress()
+        with capture_output() as printed:
+            for line in lines:
+                ninja.feed(line)
+        assert printed == lines
+        assert not ninja.hidden
+    finally:
+        progress.live_console, progress.running_steps = live_console, running_steps
+
+    # Nothing was hidden, so a failure doesn't repeat the output
+    gclient = GclientProgress()
+    capture = OutputCapture()
+    with capture_output() as printed:
+        gclient.feed("fatal: repository not found")
+        capture.append("fatal: repository not found")
+        gclient.finish(1, capture)
+    assert printed == ["fatal: repository not found"]
+    print("✓ Plain output fallback test passed")
+
+
+def run_all_tests():
+    """Run all progress tests"""
+    tests = [
+        test_ninja_status_lines,
+        test_gclient_status_lines,
+        test_status_line_on_terminal,
+        test_plain_output_fallback,
+    ]
+
+    print("Running progress tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
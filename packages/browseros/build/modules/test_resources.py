@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for resource copying
+
+Covers copy plan compilation and caching, failure reporting through
+copy_resources' return value, and pruning of files sync operations no
+longer place.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.resources import (
+    compile_copy_plan,
+    copy_resources,
+    get_copy_fingerprint,
+    get_copy_plan,
+)
+
+
+class _Context:
+    def __init__(self, root: Path):
+        self.root_dir = root / "root"
+        self.chromium_src = root / "src"
+        self.architecture = "x64"
+        self.build_type = "release"
+        self.chromium_src.mkdir(parents=True)
+        (self.root_dir / "resources").mkdir(parents=True)
+
+    def get_copy_resources_config(self) -> Path:
+        return self.root_dir / "resources" / "copy_resources.yaml"
+
+    def get_build_cache_dir(self) -> Path:
+        return self.chromium_src / "out" / ".browseros_cache"
+
+
+def _write_config(ctx: _Context, operations: list) -> None:
+    with open(ctx.get_copy_resources_config(), "w") as f:
+        yaml.safe_dump({"copy_operations": operations}, f)
+
+
+def _touch_config(ctx: _Context) -> None:
+    """Move the config's mtime forward so its cached plan is recompiled"""
+    config_path = ctx.get_copy_resources_config()
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def _write_icons(ctx: _Context, names: list) -> None:
+    icons = ctx.root_dir / "resources" / "icons"
+    icons.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (icons / name).write_text(name)
+
+
+ICONS_OPERATION = {
+    "name": "Icons",
+    "source": "resources/icons",
+    "destination": "chrome/app/theme",
+    "type": "directory",
+}
+
+
+def test_duplicate_operation_names_rejected():
+    """Test that two operations with one name are a configuration error"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        config = {"copy_operations": [ICONS_OPERATION, dict(ICONS_OPERATION)]}
+        try:
+            compile_copy_plan(ctx, config)
+            assert False, "Duplicate operation names were accepted"
+        except ValueError as e:
+            assert "Icons" in str(e)
+    print("✓ Duplicate operation name test passed")
+
+
+def test_plan_compiled_once():
+    """Test that the plan is reused until the configuration changes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        _write_config(ctx, [ICONS_OPERATION])
+        _write_icons(ctx, ["a.png"])
+
+        _, plan = get_copy_plan(ctx)
+        assert get_copy_plan(ctx)[1] is plan
+        inputs, outputs = get_copy_fingerprint(ctx)
+        assert inputs[0] == ctx.get_copy_resources_config()
+        assert [p.name for p in outputs] == ["a.png"]
+        # Other selectors compile their own plan
+        assert get_copy_plan(ctx, ["arm64"])[1] is not plan
+
+        _write_config(ctx, [{**ICONS_OPERATION, "destination": "chrome/icons"}])
+        _touch_config(ctx)
+        _, replanned = get_copy_plan(ctx)
+        assert replanned is not plan
+        assert replanned.operations[0].destination == "chrome/icons"
+    print("✓ Plan caching test passed")
+
+
+def test_skipped_operations_recorded():
+    """Test that operations for other selectors are listed with a reason"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        config = {
+            "copy_operations": [
+                ICONS_OPERATION,
+                {**ICONS_OPERATION, "name": "Debug icons", "build_type": "debug"},
+            ]
+        }
+        plan = compile_copy_plan(ctx, config)
+        assert [op.name for op in plan.operations] == ["Icons"]
+        assert plan.skipped[0][0] == "Debug icons"
+        assert "build_type" in plan.skipped[0][1]
+    print("✓ Skipped operations test passed")
+
+
+def test_copy_and_prune():
+    """Test that files are copied, and ones no longer placed are removed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        _write_config(ctx, [ICONS_OPERATION])
+        _write_icons(ctx, ["a.png", "b.png"])
+        theme = ctx.chromium_src / "chrome" / "app" / "theme"
+
+        assert copy_resources(ctx) is True
+        assert (theme / "a.png").read_text() == "a.png"
+
+        (ctx.root_dir / "resources" / "icons" / "b.png").unlink()
+        _touch_config(ctx)
+        assert copy_resources(ctx) is True
+        assert (theme / "a.png").exists() and not (theme / "b.png").exists()
+    print("✓ Copy and prune test passed")
+
+
+def test_failed_operation_returns_false():
+    """Test that a failed copy is reported as False"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = _Context(Path(tmp))
+        _write_config(ctx, [ICONS_OPERATION])
+        _write_icons(ctx, ["a.png"])
+        # A file where the destination directory has to go
+        (ctx.chromium_src / "chrome").write_text("not a directory")
+
+        assert copy_resources(ctx) is False
+    print("✓ Failed operation test passed")
+
+
+def run_all_tests():
+    """Run all resource tests"""
+    tests = [
+        test_duplicate_operation_names_rejected,
+        test_plan_compiled_once,
+        test_skipped_operations_recorded,
+        test_copy_and_prune,
+        test_failed_operation_returns_false,
+    ]
+
+    print("Running resource tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
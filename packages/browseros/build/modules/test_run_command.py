@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for run_command's bounded output capture
+
+Covers the ring buffer tail, the gzip file the full output spills to,
+and that callers reading run_command(...).stdout still get everything.
+"""
+
+import gc
+import gzip
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import CapturedProcess, OutputCapture, run_command
+
+
+def _print_lines(count: int, exit_code: int = 0):
+    script = (
+        f"for i in range({count}): print(f'line {{i}}')\n"
+        f"raise SystemExit({exit_code})"
+    )
+    return [sys.executable, "-c", script]
+
+
+def test_tail_kept_after_overflow():
+    """Test that only the last lines stay in memory once output overflows"""
+    capture = OutputCapture(tail_lines=5)
+    for i in range(3):
+        capture.append(f"line {i}")
+    assert capture.spill_path is None
+    assert capture.text() == "line 0\nline 1\nline 2"
+
+    for i in range(3, 12):
+        capture.append(f"line {i}")
+    capture.close()
+    assert capture.line_count == 12
+    assert list(capture.tail) == [f"line {i}" for i in range(7, 12)]
+    assert capture.tail_text() == "\n".join(f"line {i}" for i in range(7, 12))
+    print("✓ Tail after overflow test passed")
+
+
+def test_spill_file_is_readable():
+    """Test that the spilled gzip file holds every line and is deleted after"""
+    capture = OutputCapture(tail_lines=5)
+    for i in range(20):
+        capture.append(f"line {i}")
+    capture.close()
+
+    spill_path = capture.spill_path
+    with gzip.open(spill_path, "rt", encoding="utf-8") as f:
+        assert f.read().splitlines() == [f"line {i}" for i in range(20)]
+    assert capture.text() == "\n".join(f"line {i}" for i in range(20))
+
+    del capture
+    gc.collect()
+    assert not spill_path.exists()
+    print("✓ Spill file test passed")
+
+
+def test_run_command_stdout():
+    """Test that run_command(...).stdout has the full output, past the tail"""
+    result = run_command(_print_lines(50), tail_lines=10)
+    assert isinstance(result, CapturedProcess)
+    assert result.returncode == 0
+    assert result.stdout.splitlines() == [f"line {i}" for i in range(50)]
+    assert result.capture.line_count == 50
+
+    # Callers may replace stdout, as with a CompletedProcess
+    result.stdout = "replaced"
+    assert result.stdout == "replaced"
+
+    short = run_command(_print_lines(3))
+    assert short.stdout == "line 0\nline 1\nline 2"
+    assert short.capture.spill_path is None
+    print("✓ run_command stdout test passed")
+
+
+def test_failure_carries_tail():
+    """Test that a failed command raises with only the last lines"""
+    try:
+        run_command(_print_lines(50, exit_code=2), tail_lines=10)
+        assert False, "Failing command was not raised"
+    except subprocess.CalledProcessError as e:
+        assert e.returncode == 2
+        assert e.stdout.splitlines() == [f"line {i}" for i in range(40, 50)]
+
+    result = run_command(_print_lines(50, exit_code=2), check=False, tail_lines=10)
+    assert result.returncode == 2
+    print("✓ Failure tail test passed")
+
+
+def run_all_tests():
+    """Run all output capture tests"""
+    tests = [
+        test_tail_kept_after_overflow,
+        test_spill_file_is_readable,
+        test_run_command_stdout,
+        test_failure_carries_tail,
+    ]
+
+    print("Running output capture tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
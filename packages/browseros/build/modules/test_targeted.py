@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Test script for targeted dev builds
+
+Builds a small git repository standing in for chromium_src and answers
+`gn refs` from a table, covering the chunked git status, the recorded
+source baseline, mapping changed files to the targets that own them, and
+when the plan falls back to building chrome alone.
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import modules.targeted as targeted
+from modules.targeted import (
+    CHROME_LABEL,
+    get_changed_files,
+    get_git_status,
+    map_files_to_targets,
+    plan_targeted_build,
+    record_build_sources,
+)
+
+# path: (ninja outputs of its owners, labels depending on it)
+GN_REFS = {
+    "chrome/a.cc": (["obj/chrome/browser.stamp"], [CHROME_LABEL]),
+    "base/b.cc": (["obj/base/base.stamp"], [CHROME_LABEL, "//base:base_unittests"]),
+    "base/test_only.cc": (["obj/base/test_support.stamp"], ["//base:base_unittests"]),
+}
+
+
+class _Context:
+    def __init__(self, root: Path):
+        self.chromium_src = root / "src"
+        self.architecture = "x64"
+        self.out_dir = "out/Default_x64"
+
+    def get_build_cache_dir(self) -> Path:
+        return self.chromium_src / "out" / ".browseros_cache"
+
+    def get_gn_args_file(self) -> Path:
+        return self.chromium_src / self.out_dir / "args.gn"
+
+
+class _FakeSubprocess:
+    """Runs git for real, answers gn refs from GN_REFS and records both"""
+
+    def __init__(self):
+        self.git_calls = []
+        self.gn_calls = []
+
+    def run(self, cmd, **kwargs):
+        if cmd[0] == "git":
+            self.git_calls.append(cmd)
+            return subprocess.run(cmd, **kwargs)
+
+        self.gn_calls.append(cmd)
+        path = cmd[3][2:]
+        if path not in GN_REFS:
+            return subprocess.CompletedProcess(cmd, 1, "", f"no target owns {path}")
+        owners, dependents = GN_REFS[path]
+        lines = dependents if "--all" in cmd else owners
+        return subprocess.CompletedProcess(cmd, 0, "\n".join(lines) + "\n", "")
+
+
+def _git(ctx: _Context, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+        + list(args),
+        cwd=ctx.chromium_src,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _write(ctx: _Context, rel_path: str, content: str) -> None:
+    path = ctx.chromium_src / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _make_checkout(root: Path) -> _Context:
+    """Committed tree with every file in GN_REFS and an args.gn"""
+    ctx = _Context(root)
+    ctx.chromium_src.mkdir()
+    _git(ctx, "init", "-q")
+    _write(ctx, ".gitignore", "out/\n*.gen\n")
+    for rel_path in GN_REFS:
+        _write(ctx, rel_path, f"original {rel_path}")
+    _write(ctx, "chrome/BUILD.gn", 'group("chrome") {}')
+    _git(ctx, "add", "-A")
+    _git(ctx, "commit", "-q", "-m", "base")
+    _write(ctx, f"{ctx.out_dir}/args.gn", "is_debug = false\n")
+    return ctx
+
+
+def _with_fake_subprocess(test):
+    """Run test(ctx, fake) against a fresh checkout with subprocess stubbed"""
+    fake = _FakeSubprocess()
+    original = targeted.subprocess
+    targeted.subprocess = fake
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            test(_make_checkout(Path(tmp)), fake)
+    finally:
+        targeted.subprocess = original
+
+
+def test_chunked_git_status():
+    """Test that pathspecs are split across git calls and merged"""
+    original_chunk = targeted.STATUS_PATHSPEC_CHUNK
+    targeted.STATUS_PATHSPEC_CHUNK = 2
+
+    def check(ctx, fake):
+        _write(ctx, "chrome/a.cc", "patched a")
+        _write(ctx, "chrome/new.cc", "added")
+        _write(ctx, "chrome/res.gen", "ignored resource")
+        _write(ctx, "base/untouched_dir/x.cc", "untracked in a directory")
+        _git(ctx, "mv", "base/b.cc", "base/moved.cc")
+
+        status = get_git_status(
+            ctx,
+            ["chrome/a.cc", "chrome/new.cc", "chrome/res.gen", "base/moved.cc", "base"],
+            ignored=True,
+        )
+        assert len(fake.git_calls) == 3
+        assert all(len(call[call.index("--") + 1 :]) <= 2 for call in fake.git_calls)
+        assert status == {
+            "chrome/a.cc": " M",
+            "chrome/new.cc": "??",
+            "chrome/res.gen": "!!",
+            # The rename's source path is not listed as a file of its own
+            "base/moved.cc": "R ",
+            "base/untouched_dir/x.cc": "??",
+        }
+        # Without pathspecs git is asked once; out/ is never reported
+        assert set(get_git_status(ctx)) == {
+            "chrome/a.cc",
+            "chrome/new.cc",
+            "base/moved.cc",
+            "base/untouched_dir/x.cc",
+        }
+
+    try:
+        _with_fake_subprocess(check)
+    finally:
+        targeted.STATUS_PATHSPEC_CHUNK = original_chunk
+    print("✓ Chunked git status test passed")
+
+
+def test_baseline_recording():
+    """Test that only files changed since the recorded build are returned"""
+
+    def check(ctx, fake):
+        assert get_changed_files(ctx) is None
+
+        _write(ctx, "chrome/a.cc", "patched a")
+        record_build_sources(ctx)
+        assert get_changed_files(ctx) == []
+
+        _write(ctx, "chrome/a.cc", "patched a again")
+        _write(ctx, "base/b.cc", "patched b")
+        assert get_changed_files(ctx) == ["base/b.cc", "chrome/a.cc"]
+        record_build_sources(ctx)
+
+        # Restored to upstream: still a change since the last build
+        _git(ctx, "checkout", "--", "chrome/a.cc")
+        assert get_changed_files(ctx) == ["chrome/a.cc"]
+
+    _with_fake_subprocess(check)
+    print("✓ Baseline recording test passed")
+
+
+def test_plan_maps_changes_to_owners():
+    """Test that changed files map to the owners chrome depends on"""
+
+    def check(ctx, fake):
+        record_build_sources(ctx)
+        _write(ctx, "chrome/a.cc", "patched a")
+        _write(ctx, "base/b.cc", "patched b")
+        _write(ctx, "base/test_only.cc", "patched test support")
+
+        assert plan_targeted_build(ctx) == [
+            "obj/base/base.stamp",
+            "obj/chrome/browser.stamp",
+        ]
+        assert len(fake.gn_calls) == 6
+
+        # Cached until args.gn changes
+        mappings = map_files_to_targets(ctx, ["chrome/a.cc"])
+        assert mappings == {
+            "chrome/a.cc": {"owners": ["obj/chrome/browser.stamp"], "chrome": True}
+        }
+        assert len(fake.gn_calls) == 6
+        _write(ctx, f"{ctx.out_dir}/args.gn", "is_debug = true\n")
+        map_files_to_targets(ctx, ["chrome/a.cc"])
+        assert len(fake.gn_calls) == 8
+
+    _with_fake_subprocess(check)
+    print("✓ Owner mapping test passed")
+
+
+def test_plan_falls_back_to_chrome():
+    """Test that the plan is empty whenever targets can't be trusted"""
+
+    def check(ctx, fake):
+        # No build recorded yet
+        assert plan_targeted_build(ctx) == []
+        record_build_sources(ctx)
+        assert plan_targeted_build(ctx) == []
+
+        _write(ctx, "chrome/BUILD.gn", 'group("chrome") { deps = [] }')
+        assert get_changed_files(ctx) == ["chrome/BUILD.gn"]
+        assert plan_targeted_build(ctx) == []
+        _git(ctx, "checkout", "--", "chrome/BUILD.gn")
+        record_build_sources(ctx)
+
+        (ctx.chromium_src / "base" / "b.cc").unlink()
+        assert get_changed_files(ctx) == ["base/b.cc"]
+        assert plan_targeted_build(ctx) == []
+        _git(ctx, "checkout", "--", "base/b.cc")
+        record_build_sources(ctx)
+
+        # gn refs failing for a file no target owns
+        _write(ctx, "chrome/unowned.cc", "new file")
+        assert plan_targeted_build(ctx) == []
+        assert fake.gn_calls and not fake.gn_calls[0][3].endswith(".gn")
+
+    _with_fake_subprocess(check)
+    print("✓ Full build fallback test passed")
+
+
+def run_all_tests():
+    """Run all targeted build tests"""
+    tests = [
+        test_chunked_git_status,
+        test_baseline_recording,
+        test_plan_maps_changes_to_owners,
+        test_plan_falls_back_to_chrome,
+    ]
+
+    print("Running targeted build tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
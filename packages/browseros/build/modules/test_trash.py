@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script for the trash module
+
+Covers moving a directory into the trash, that purging removes nested
+trees completely while only unlinking symlinks (never what they point
+to), picking up trash left by earlier runs, and the background purge.
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import modules.trash as trash
+from modules.trash import (
+    TRASH_DIR_NAME,
+    collect_trash,
+    move_to_trash,
+    parallel_rmtree,
+    purge_trash,
+    remove_tree,
+)
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def _make_out_dir(root: Path, outside: Path) -> Path:
+    """Nested out dir with a read-only file and links to a directory outside"""
+    out_dir = root / "out" / "Default_x64"
+    for depth in range(4):
+        level = out_dir.joinpath(*[f"dir{d}" for d in range(depth)])
+        for i in range(3):
+            _write(level / f"file{i}.o", f"object {depth}.{i}")
+    read_only = out_dir / "dir0" / "read_only.stamp"
+    _write(read_only, "stamp")
+    os.chmod(read_only, stat.S_IREAD)
+
+    _write(outside / "keep" / "important.txt", "not part of the build")
+    os.symlink(outside, out_dir / "dir0" / "outside_link", target_is_directory=True)
+    os.symlink(outside / "keep" / "important.txt", out_dir / "file_link")
+    return out_dir
+
+
+def _assert_outside_intact(outside: Path) -> None:
+    assert (outside / "keep" / "important.txt").read_text() == "not part of the build"
+
+
+def test_move_to_trash():
+    """Test that a directory is renamed into a sibling trash directory"""
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = _make_out_dir(Path(tmp), Path(tmp) / "outside")
+        trashed = move_to_trash(out_dir)
+
+        assert not out_dir.exists()
+        assert trashed.parent == out_dir.parent / TRASH_DIR_NAME
+        assert trashed.name.startswith("Default_x64.")
+        assert (trashed / "dir0" / "dir1" / "file0.o").exists()
+
+        assert move_to_trash(out_dir) is None
+    print("✓ Move to trash test passed")
+
+
+def test_parallel_rmtree_removes_links_only():
+    """Test that nested trees go entirely and link targets are kept"""
+    with tempfile.TemporaryDirectory() as tmp:
+        outside = Path(tmp) / "outside"
+        out_dir = _make_out_dir(Path(tmp), outside)
+
+        parallel_rmtree(out_dir, workers=4)
+
+        assert not out_dir.exists()
+        _assert_outside_intact(outside)
+    print("✓ Parallel rmtree test passed")
+
+
+def test_purge_trash():
+    """Test that every trashed entry and the trash directory are removed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        outside = Path(tmp) / "outside"
+        first = move_to_trash(_make_out_dir(Path(tmp), outside))
+        trash_dir = first.parent
+        _write(trash_dir / "stray.log", "file left in the trash")
+        os.symlink(outside, trash_dir / "dir_link", target_is_directory=True)
+
+        purge_trash(trash_dir)
+
+        assert not trash_dir.exists()
+        _assert_outside_intact(outside)
+        # Nothing to do on a second purge
+        purge_trash(trash_dir)
+    print("✓ Purge trash test passed")
+
+
+def test_collect_trash():
+    """Test that only non-empty leftover trash starts a purge"""
+    purged = []
+    start_purge = trash.start_purge
+    trash.start_purge = purged.append
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            parent = Path(tmp)
+            collect_trash(parent)
+            (parent / TRASH_DIR_NAME).mkdir()
+            collect_trash(parent)
+            assert purged == []
+
+            _write(parent / TRASH_DIR_NAME / "Default_x64.1.2" / "a.o", "object")
+            collect_trash(parent)
+            assert purged == [parent / TRASH_DIR_NAME]
+    finally:
+        trash.start_purge = start_purge
+    print("✓ Collect trash test passed")
+
+
+def test_remove_tree_purges_in_background():
+    """Test that remove_tree returns at once and the purge process finishes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        outside = Path(tmp) / "outside"
+        out_dir = _make_out_dir(Path(tmp), outside)
+        trash_dir = out_dir.parent / TRASH_DIR_NAME
+
+        remove_tree(out_dir)
+        assert not out_dir.exists()
+
+        deadline = time.time() + 30
+        while trash_dir.exists() and time.time() < deadline:
+            time.sleep(0.1)
+        assert not trash_dir.exists()
+        _assert_outside_intact(outside)
+    print("✓ Background purge test passed")
+
+
+def run_all_tests():
+    """Run all trash tests"""
+    tests = [
+        test_move_to_trash,
+        test_parallel_rmtree_removes_links_only,
+        test_purge_trash,
+        test_collect_trash,
+        test_remove_tree_purges_in_background,
+    ]
+
+    print("Running trash tests...")
+    print("=" * 60)
+
+    failed_tests = []
+    for test in tests:
+        try:
+            test()
+        except Exception as e:
+            test_name = test.__name__
+            print(f"✗ {test_name} failed: {e}")
+            failed_tests.append((test_name, str(e)))
+
+    print("=" * 60)
+    if failed_tests:
+        print(f"\n{len(failed_tests)} tests failed:")
+        for name, error in failed_tests:
+            print(f"  - {name}: {error}")
+        return False
+    else:
+        print(f"\nAll {len(tests)} tests passed!")
+        return True
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
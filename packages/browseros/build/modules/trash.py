@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Trash module for Nxtscape build system
+
+Removing an out dir of several hundred GB takes minutes. remove_tree()
+instead renames the directory into a trash directory next to it (same
+filesystem, so the rename is atomic and instant) and leaves the deletion
+to a detached background process that walks the tree with parallel
+os.scandir calls. Trash left behind by an interrupted purge is collected
+on later runs.
+
+The purge process runs as: python -m modules.trash <trash_dir>
+"""
+
+import os
+import stat
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+from utils import log_info, log_warning, safe_rmtree, IS_WINDOWS
+
+
+TRASH_DIR_NAME = ".trash"
+
+# Deletion is bound by filesystem metadata operations, not CPU
+PURGE_WORKERS = min(32, (os.cpu_count() or 4) * 2)
+
+
+def get_trash_dir(path: Path) -> Path:
+    """Trash directory for a path: a sibling, so renames stay on one filesystem"""
+    return path.parent / TRASH_DIR_NAME
+
+
+def move_to_trash(path: Path) -> Optional[Path]:
+    """Rename a directory into its trash directory
+
+    Returns:
+        The path in the trash, or None if the rename failed (e.g. a file
+        is open on Windows, or the path is a mount point)
+    """
+    trash_dir = get_trash_dir(path)
+    target = trash_dir / f"{path.name}.{int(time.time())}.{os.getpid()}"
+    try:
+        trash_dir.mkdir(exist_ok=True)
+        os.rename(path, target)
+    except OSError as e:
+        log_warning(f"Could not move {path.name} to trash: {e}")
+        return None
+    return target
+
+
+def start_purge(trash_dir: Path) -> None:
+    """Delete the contents of a trash directory in a detached process"""
+    cmd = [sys.executable, "-m", "modules.trash", str(trash_dir)]
+    kwargs = {}
+    if IS_WINDOWS:
+        kwargs["creationflags"] = (
+            subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        )
+    else:
+        # Own session: survives the build and Ctrl+C in its terminal
+        kwargs["start_new_session"] = True
+    subprocess.Popen(
+        cmd,
+        cwd=Path(__file__).parent.parent,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True,
+        **kwargs,
+    )
+
+
+def remove_tree(path: Path) -> None:
+    """Remove a directory tree without waiting for the deletion
+
+    Falls back to deleting in the foreground if the rename fails.
+    """
+    if not path.exists():
+        return
+    trashed = move_to_trash(path)
+    if trashed is None:
+        safe_rmtree(path)
+        return
+    log_info(f"🗑️  Moved {path.name} to trash, deleting in the background")
+    start_purge(trashed.parent)
+
+
+def collect_trash(parent: Path) -> None:
+    """Start purging trash that an earlier run left in a directory"""
+    trash_dir = parent / TRASH_DIR_NAME
+    try:
+        leftovers = next(os.scandir(trash_dir), None)
+    except OSError:
+        return
+    if leftovers is not None:
+        log_info(f"🗑️  Deleting leftover trash in {trash_dir} in the background")
+        start_purge(trash_dir)
+
+
+def _is_link(entry: os.DirEntry) -> bool:
+    """Symlinks, and on Windows junctions, are removed, never descended into"""
+    if entry.is_symlink():
+        return True
+    if IS_WINDOWS:
+        attributes = entry.stat(follow_symlinks=False).st_file_attributes
+        return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+    return False
+
+
+def _remove(path: str, directory: bool = False) -> None:
+    remove = os.rmdir if directory else os.unlink
+    try:
+        remove(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        # Read-only files (Windows) need write permission to be deleted
+        os.chmod(path, stat.S_IWRITE)
+        remove(path)
+
+
+def _clear_files(directory: str) -> List[str]:
+    """Delete the files and links in a directory, return its subdirectories"""
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if _is_link(entry):
+                        _remove(entry.path, directory=IS_WINDOWS and entry.is_dir())
+                    elif entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    else:
+                        _remove(entry.path)
+                except OSError:
+                    continue  # Left for the next purge
+    except FileNotFoundError:
+        pass
+    return subdirs
+
+
+def parallel_rmtree(path: Path, workers: int = PURGE_WORKERS) -> None:
+    """Delete a directory tree, clearing directories of a level in parallel"""
+    levels = []
+    level = [str(path)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while level:
+            levels.append(level)
+            level = [
+                subdir
+                for subdirs in executor.map(_clear_files, level)
+                for subdir in subdirs
+            ]
+        # Directories are empty now; remove them deepest first
+        for directories in reversed(levels):
+            for directory in directories:
+                try:
+                    _remove(directory, directory=True)
+                except OSError:
+                    pass
+
+
+def purge_trash(trash_dir: Path) -> None:
+    """Delete everything in a trash directory, then the directory itself"""
+    try:
+        entries = list(os.scandir(trash_dir))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            parallel_rmtree(Path(entry.path))
+        else:
+            try:
+                _remove(entry.path)
+            except OSError:
+                pass
+    try:
+        os.rmdir(trash_dir)
+    except OSError:
+        pass  # Something was trashed meanwhile; its purge removes the dir
+
+
+if __name__ == "__main__":
+    if hasattr(os, "nice"):
+        os.nice(10)  # Leave the CPU to the build that is starting
+    purge_trash(Path(sys.argv[1]))
@@ -3,14 +3,26 @@
 Shared utilities for the build system
 """
 
+import asyncio
+import atexit
+import gzip
 import os
+import queue
+import signal
 import sys
 import subprocess
+import tempfile
+import threading
+import time
+import weakref
 import yaml
 import shutil
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Dict, Union
+from typing import Iterator, Optional, List, Dict, Union
 from datetime import datetime
+from events import EventLog, rotate_logs, split_step
 
 
 # Platform detection
@@ -18,36 +30,265 @@ IS_WINDOWS = sys.platform == "win32"
 IS_MACOS = sys.platform == "darwin"
 IS_LINUX = sys.platform.startswith("linux")
 
-# Global log file handle
+# BROWSEROS_LOG_DIR moves the build logs, e.g. out of the tree for tests
+LOG_DIR = Path(
+    os.environ.get("BROWSEROS_LOG_DIR") or Path(__file__).parent.parent / "logs"
+)
+
+# Global log file handles: the text log and the structured event log
 _log_file = None
+_event_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+_log_file_lock = threading.Lock()
+
+# Pipeline step of the current thread, attached to its events
+_log_context = threading.local()
+
+# Per-thread console buffer used to group output of concurrent steps
+_capture = threading.local()
+
+# Log lines are queued and written in batches by a background thread.
+# The queue is bounded so a stalled disk slows producers instead of
+# growing memory; items are message strings, event dicts, flush Events or
+# None (stop).
+LOG_QUEUE_SIZE = 10000
+LOG_BATCH_SIZE = 1000
+_log_queue: "queue.Queue" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_log_writer: Optional[threading.Thread] = None
+_log_closed = False
+
+
+def _rotate_logs(current: str):
+    try:
+        rotate_logs(LOG_DIR, current)
+    except Exception as e:
+        print(f"Failed to compress old build logs: {e}", file=sys.stderr)
+
+
+def start_log_rotation():
+    """Compress logs of finished builds without holding up this one
+
+    Called by the build entry point only; logs that are still being
+    written, by this or any other process, are left alone.
+    """
+    _ensure_log_file()
+    current = _event_log.path.name.split(".", 1)[0]
+    threading.Thread(
+        target=_rotate_logs,
+        args=(current,),
+        name="build-log-rotate",
+        daemon=True,
+    ).start()
 
 
 def _ensure_log_file():
     """Ensure log file is created with timestamp"""
-    global _log_file
-    if _log_file is None:
-        # Create logs directory if it doesn't exist
-        log_dir = Path(__file__).parent.parent / "logs"
-        log_dir.mkdir(exist_ok=True)
-
-        # Create log file with timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        log_file_path = log_dir / f"build_{timestamp}.log"
-        # Open with UTF-8 encoding to handle any characters
-        _log_file = open(log_file_path, "w", encoding="utf-8")
-        _log_file.write(
-            f"Nxtscape Build Log - Started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        )
-        _log_file.write("=" * 80 + "\n\n")
+    global _log_file, _event_log
+    with _log_file_lock:
+        if _log_file is None:
+            # Create logs directory if it doesn't exist
+            log_dir = LOG_DIR
+            log_dir.mkdir(parents=True, exist_ok=True)
+
+            # Create log file with timestamp
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            log_file_path = log_dir / f"build_{timestamp}.log"
+            _event_log = EventLog(log_dir / f"build_{timestamp}.jsonl")
+            # Open with UTF-8 encoding to handle any characters
+            _log_file = open(log_file_path, "w", encoding="utf-8")
+            _log_file.write(
+                f"Nxtscape Build Log - Started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            )
+            _log_file.write("=" * 80 + "\n\n")
     return _log_file
 
 
+def _write_log_lines(messages: List[str], events: List[Dict] = ()):
+    """Write messages under one timestamp and flush once"""
+    try:
+        log_file = _ensure_log_file()
+        if messages:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            log_file.write("".join(f"[{timestamp}] {m}\n" for m in messages))
+            log_file.flush()
+        if events and _event_log is not None:
+            _event_log.write(events)
+    except (OSError, ValueError) as e:
+        # ValueError is a write to a file closed under us
+        # Keep draining the queue so producers never block on a dead log
+        print(f"Failed to write build log: {e}", file=sys.stderr)
+
+
+def _log_writer_loop():
+    """Drain the log queue in batches until the stop marker arrives"""
+    while True:
+        batch = [_log_queue.get()]
+        while len(batch) < LOG_BATCH_SIZE:
+            try:
+                batch.append(_log_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        messages = [item for item in batch if isinstance(item, str)]
+        events = [item for item in batch if isinstance(item, dict)]
+        if messages or events:
+            _write_log_lines(messages, events)
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+        if None in batch:
+            return
+
+
+def _start_log_writer():
+    """Start the background log writer on first use"""
+    global _log_writer
+    with _log_lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(
+                target=_log_writer_loop, name="build-log-writer", daemon=True
+            )
+            _log_writer.start()
+            atexit.register(close_log)
+
+
+def _queue_log_item(item: Union[str, Dict]):
+    if _log_closed:
+        # The event log is closed for good; late messages still reach the
+        # text log, late events are dropped
+        if isinstance(item, str):
+            with _log_lock:
+                _write_log_lines([item])
+        return
+    if _log_writer is None:
+        _start_log_writer()
+    _log_queue.put(item)
+
+
 def _log_to_file(message: str):
-    """Write message to log file with timestamp"""
-    log_file = _ensure_log_file()
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_file.write(f"[{timestamp}] {message}\n")
-    log_file.flush()
+    """Queue message for the log file"""
+    _queue_log_item(message)
+
+
+def log_event(kind: str, **fields):
+    """Record a structured event in the build's JSONL event log
+
+    The current thread's pipeline step (see log_context) is attached
+    unless the caller passes a step.
+    """
+    event = {"ts": round(time.time(), 3), "kind": kind}
+    step = fields.pop("step", None) or getattr(_log_context, "step", None)
+    if step:
+        event.update(split_step(step))
+    event.update(fields)
+    _queue_log_item(event)
+
+
+@contextmanager
+def log_context(step: str) -> Iterator[None]:
+    """Attribute events of the current thread to a pipeline step"""
+    previous = getattr(_log_context, "step", None)
+    _log_context.step = step
+    try:
+        yield
+    finally:
+        _log_context.step = previous
+
+
+def flush_log(timeout: float = 10.0):
+    """Block until every line queued so far is written"""
+    if _log_writer is None or _log_closed:
+        return
+    done = threading.Event()
+    _log_queue.put(done)
+    done.wait(timeout)
+
+
+def close_log():
+    """Write the remaining queued lines and stop the writer
+
+    Registered with atexit; later messages are written to the text log
+    directly and later events are dropped.
+    """
+    global _log_closed, _event_log
+    if _log_writer is None or _log_closed:
+        return
+    _log_queue.put(None)
+    _log_writer.join(timeout=10.0)
+    with _log_lock:
+        _log_closed = True
+        # Lines queued after the stop marker, or left by a stuck writer
+        leftover = []
+        leftover_events = []
+        while True:
+            try:
+                item = _log_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, str):
+                leftover.append(item)
+            elif isinstance(item, dict):
+                leftover_events.append(item)
+        if leftover or leftover_events:
+            _write_log_lines(leftover, leftover_events)
+        if _event_log is not None:
+            try:
+                _event_log.close()
+            except OSError:
+                pass
+            _event_log = None
+
+
+def _interrupt_on_signal(signum, frame):
+    # Unwind the main thread like Ctrl+C, so the build's interrupt handling
+    # runs and atexit flushes the log
+    raise KeyboardInterrupt(f"signal {signum}")
+
+
+def install_signal_handlers():
+    """Turn SIGTERM/SIGHUP into KeyboardInterrupt so the build ends cleanly"""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    signals = [signal.SIGTERM]
+    if hasattr(signal, "SIGHUP"):
+        signals.append(signal.SIGHUP)
+    for sig in signals:
+        # Leave handlers installed by the embedding process alone
+        if signal.getsignal(sig) == signal.SIG_DFL:
+            signal.signal(sig, _interrupt_on_signal)
+
+
+def _print(message: str):
+    """Print to the console, or to the current thread's capture buffer"""
+    lines = getattr(_capture, "lines", None)
+    if lines is not None:
+        lines.append(message)
+    else:
+        print(message)
+
+
+@contextmanager
+def capture_output() -> Iterator[List[str]]:
+    """Buffer console output of the current thread instead of printing it
+
+    The log file is still written immediately. The caller prints the
+    returned lines as one block, so output of steps running in parallel
+    threads doesn't interleave.
+    """
+    previous = getattr(_capture, "lines", None)
+    lines: List[str] = []
+    _capture.lines = lines
+    try:
+        yield lines
+    finally:
+        _capture.lines = previous
+
+
+def print_block(lines: List[str]):
+    """Print buffered lines without interleaving with other threads"""
+    with _log_lock:
+        for line in lines:
+            print(line)
 
 
 def _sanitize_for_windows(message: str) -> str:
@@ -58,37 +299,145 @@ def _sanitize_for_windows(message: str) -> str:
     return message
 
 
+def console_print(message: str):
+    """Print to the console only; the caller logs to file separately"""
+    _print(_sanitize_for_windows(message))
+
+
+def live_console() -> bool:
+    """Whether this thread's output goes straight to an interactive terminal"""
+    return getattr(_capture, "lines", None) is None and sys.stdout.isatty()
+
+
 def log_info(message: str):
     """Print info message"""
-    print(_sanitize_for_windows(message))
+    _print(_sanitize_for_windows(message))
     _log_to_file(f"INFO: {message}")
+    log_event("log", level="info", msg=message)
 
 
 def log_warning(message: str):
     """Print warning message"""
     if sys.platform == "win32":
-        print(f"[WARN] {_sanitize_for_windows(message)}")
+        _print(f"[WARN] {_sanitize_for_windows(message)}")
     else:
-        print(f"⚠️ {message}")
+        _print(f"⚠️ {message}")
     _log_to_file(f"WARNING: {message}")
+    log_event("log", level="warning", msg=message)
 
 
 def log_error(message: str):
     """Print error message"""
     if sys.platform == "win32":
-        print(f"[ERROR] {_sanitize_for_windows(message)}")
+        _print(f"[ERROR] {_sanitize_for_windows(message)}")
     else:
-        print(f"❌ {message}")
+        _print(f"❌ {message}")
     _log_to_file(f"ERROR: {message}")
+    log_event("log", level="error", msg=message)
 
 
 def log_success(message: str):
     """Print success message"""
     if sys.platform == "win32":
-        print(f"[SUCCESS] {_sanitize_for_windows(message)}")
+        _print(f"[SUCCESS] {_sanitize_for_windows(message)}")
     else:
-        print(f"✅ {message}")
+        _print(f"✅ {message}")
     _log_to_file(f"SUCCESS: {message}")
+    log_event("log", level="success", msg=message)
+
+
+# Lines of command output run_command keeps in memory; longer output is
+# spilled to a compressed temp file and read back only when asked for
+CAPTURE_TAIL_LINES = 2000
+
+
+class OutputCapture:
+    """Bounded capture of a command's output lines
+
+    Keeps the last `tail_lines` lines in a ring buffer. Once the output
+    outgrows it, the full stream goes to a gzip file that is deleted
+    together with this object.
+    """
+
+    def __init__(self, tail_lines: int = CAPTURE_TAIL_LINES):
+        self.tail = deque(maxlen=tail_lines)
+        self.line_count = 0
+        self.spill_path: Optional[Path] = None
+        self._spill = None
+
+    def append(self, line: str):
+        if self._spill is None and len(self.tail) == self.tail.maxlen:
+            fd, path = tempfile.mkstemp(prefix="run_command_", suffix=".log.gz")
+            self.spill_path = Path(path)
+            self._spill = gzip.open(os.fdopen(fd, "wb"), "wt", encoding="utf-8")
+            weakref.finalize(self, self.spill_path.unlink, missing_ok=True)
+            for earlier in self.tail:
+                self._spill.write(earlier + "\n")
+        if self._spill is not None:
+            self._spill.write(line + "\n")
+        self.tail.append(line)
+        self.line_count += 1
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+
+    def tail_text(self) -> str:
+        return "\n".join(self.tail)
+
+    def text(self) -> str:
+        """Full output, read back from disk if it was spilled"""
+        if self.spill_path is None:
+            return self.tail_text()
+        self.close()
+        with gzip.open(self.spill_path, "rt", encoding="utf-8") as f:
+            return f.read().rstrip("\n")
+
+
+class CapturedProcess(subprocess.CompletedProcess):
+    """CompletedProcess whose stdout is built from an OutputCapture on access"""
+
+    def __init__(self, args, returncode: int, capture: OutputCapture):
+        self.capture = capture
+        self._stdout: Optional[str] = None
+        super().__init__(args, returncode, stdout=None, stderr="")
+
+    @property
+    def stdout(self) -> str:
+        if self._stdout is not None:
+            return self._stdout
+        return self.capture.text()
+
+    @stdout.setter
+    def stdout(self, value: Optional[str]):
+        self._stdout = value
+
+
+# Processes started by run_command that have not exited yet
+_active_processes: "set[subprocess.Popen]" = set()
+_active_processes_lock = threading.Lock()
+
+
+def terminate_commands(timeout: float = 5.0):
+    """Stop every command run_command is still waiting on
+
+    Used when the build is interrupted, so worker threads are not left
+    waiting on a long compile. Commands get SIGTERM first and are killed
+    if they haven't exited after `timeout` seconds.
+    """
+    with _active_processes_lock:
+        processes = list(_active_processes)
+    for process in processes:
+        try:
+            process.terminate()
+        except OSError:
+            pass
+    deadline = time.time() + timeout
+    for process in processes:
+        try:
+            process.wait(max(0.0, deadline - time.time()))
+        except subprocess.TimeoutExpired:
+            process.kill()
 
 
 def run_command(
@@ -96,11 +445,23 @@ def run_command(
     cwd: Optional[Path] = None,
     env: Optional[Dict] = None,
     check: bool = True,
+    tail_lines: int = CAPTURE_TAIL_LINES,
+    progress=None,
 ) -> subprocess.CompletedProcess:
-    """Run a command with real-time streaming output and full capture"""
+    """Run a command with real-time streaming output and bounded capture
+
+    The returned result's stdout holds the full output; past `tail_lines`
+    lines it is kept on disk and read back on access. A failed command's
+    CalledProcessError carries only the last `tail_lines` lines.
+
+    With a progress renderer (modules.progress) the console shows a status
+    line instead of every line; the log file still gets all output.
+    """
     cmd_str = " ".join(cmd)
     _log_to_file(f"RUN_COMMAND: 🔧 Running: {cmd_str}")
     log_info(f"🔧 Running: {cmd_str}")
+    log_event("command_start", cmd=cmd_str)
+    start = time.time()
 
     try:
         # Always use Popen for real-time streaming and capturing
@@ -115,34 +476,47 @@ def run_command(
             universal_newlines=True,
         )
 
-        stdout_lines = []
+        with _active_processes_lock:
+            _active_processes.add(process)
 
-        # Stream output line by line
-        for line in iter(process.stdout.readline, ""):
-            line = line.rstrip()
-            if line:
-                print(line)  # Print to console in real-time
-                _log_to_file(f"RUN_COMMAND: STDOUT: {line}")  # Log to file
-                stdout_lines.append(line)
+        capture = OutputCapture(tail_lines)
 
-        # Wait for process to complete
-        process.wait()
+        # Stream output line by line
+        try:
+            for line in iter(process.stdout.readline, ""):
+                line = line.rstrip()
+                if line:
+                    if progress:
+                        progress.feed(line)
+                    else:
+                        _print(line)  # Print to console in real-time
+                    _log_to_file(f"RUN_COMMAND: STDOUT: {line}")  # Log to file
+                    capture.append(line)
+
+            # Wait for process to complete
+            process.wait()
+        finally:
+            capture.close()
+            with _active_processes_lock:
+                _active_processes.discard(process)
+        if progress:
+            progress.finish(process.returncode, capture)
 
         _log_to_file(
             f"RUN_COMMAND: ✅ Command completed with exit code: {process.returncode}"
         )
-
-        # Create a CompletedProcess object with captured output
-        result = subprocess.CompletedProcess(
-            cmd,
-            process.returncode,
-            stdout="\n".join(stdout_lines) if stdout_lines else "",
-            stderr="",
+        log_event(
+            "command_end",
+            cmd=cmd_str,
+            exit_code=process.returncode,
+            duration=round(time.time() - start, 3),
         )
 
+        result = CapturedProcess(cmd, process.returncode, capture)
+
         if check and process.returncode != 0:
             raise subprocess.CalledProcessError(
-                process.returncode, cmd, result.stdout, result.stderr
+                process.returncode, cmd, capture.tail_text(), result.stderr
             )
 
         return result
@@ -169,12 +543,155 @@ def run_command(
         return e
     except Exception as e:
         _log_to_file(f"RUN_COMMAND: ❌ Unexpected error: {str(e)}")
+        log_event(
+            "command_end",
+            cmd=cmd_str,
+            exit_code=None,
+            error=str(e),
+            duration=round(time.time() - start, 3),
+        )
         if check:
             log_error(f"Unexpected error running command: {cmd_str}")
             log_error(f"Error: {str(e)}")
         raise
 
 
+# Concurrent processes per tool class for AsyncRunner; other tools get
+# one per CPU
+TOOL_CONCURRENCY = {
+    "codesign": 8,
+}
+
+
+class AsyncRunner:
+    """Run commands concurrently with asyncio, limited per tool class
+
+    Results are CapturedProcess objects like run_command's. Each command's
+    output goes to the log file as it streams and to the console as one
+    block once the command exits, so parallel commands don't interleave.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = {**TOOL_CONCURRENCY, **(limits or {})}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+
+    def _semaphore(self, tool: str) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; each run_all has its own
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        if tool not in self._semaphores:
+            limit = self.limits.get(tool, os.cpu_count() or 4)
+            self._semaphores[tool] = asyncio.Semaphore(limit)
+        return self._semaphores[tool]
+
+    async def run(
+        self,
+        cmd: List[str],
+        cwd: Optional[Path] = None,
+        env: Optional[Dict] = None,
+        check: bool = True,
+        timeout: Optional[float] = None,
+        tool: Optional[str] = None,
+    ) -> subprocess.CompletedProcess:
+        """Run one command once a slot for its tool class is free
+
+        Raises:
+            subprocess.CalledProcessError: non-zero exit with check=True
+            subprocess.TimeoutExpired: the command ran longer than timeout
+        """
+        tool = tool or Path(cmd[0]).name
+        cmd_str = " ".join(cmd)
+        async with self._semaphore(tool):
+            _log_to_file(f"RUN_COMMAND: 🔧 Running: {cmd_str}")
+            log_event("command_start", cmd=cmd_str)
+            start = time.time()
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=cwd,
+                env=env or os.environ,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            capture = OutputCapture()
+
+            async def pump():
+                async for raw in process.stdout:
+                    line = raw.decode("utf-8", errors="replace").rstrip()
+                    if line:
+                        _log_to_file(f"RUN_COMMAND: STDOUT: {line}")
+                        capture.append(line)
+                await process.wait()
+
+            try:
+                await asyncio.wait_for(pump(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                _log_to_file(f"RUN_COMMAND: ❌ Timed out after {timeout}s: {cmd_str}")
+                log_event(
+                    "command_end",
+                    cmd=cmd_str,
+                    exit_code=process.returncode,
+                    error="timeout",
+                    duration=round(time.time() - start, 3),
+                )
+                raise subprocess.TimeoutExpired(cmd, timeout, capture.tail_text())
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                _log_to_file(f"RUN_COMMAND: ❌ Cancelled: {cmd_str}")
+                raise
+            finally:
+                capture.close()
+
+        _log_to_file(
+            f"RUN_COMMAND: ✅ Command completed with exit code: {process.returncode}"
+        )
+        log_event(
+            "command_end",
+            cmd=cmd_str,
+            exit_code=process.returncode,
+            duration=round(time.time() - start, 3),
+        )
+        for line in [_sanitize_for_windows(f"🔧 Ran: {cmd_str}")] + list(capture.tail):
+            _print(line)
+
+        if check and process.returncode != 0:
+            log_error(f"Command failed: {cmd_str}")
+            raise subprocess.CalledProcessError(
+                process.returncode, cmd, capture.tail_text(), ""
+            )
+        return CapturedProcess(cmd, process.returncode, capture)
+
+    def run_all(
+        self, cmds: List[List[str]], check: bool = True, **kwargs
+    ) -> List[subprocess.CompletedProcess]:
+        """Run commands concurrently and return their results in order
+
+        With check=True the first failure cancels the remaining commands
+        and is raised.
+        """
+
+        async def run_batch():
+            tasks = [
+                asyncio.ensure_future(self.run(cmd, check=check, **kwargs))
+                for cmd in cmds
+            ]
+            try:
+                return await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        return asyncio.run(run_batch())
+
+
 def load_config(config_path: Path) -> Dict:
     """Load configuration from YAML file"""
     if not config_path.exists():
@@ -288,3 +805,22 @@ def safe_rmtree(path: Union[str, Path]) -> None:
     else:
         # On Unix-like systems, regular rmtree works fine
         shutil.rmtree(path)
+
+
+def write_if_changed(path: Union[str, Path], content: str) -> bool:
+    """Write text to a file only if its content differs
+
+    Leaving unchanged files untouched keeps their mtime, so ninja doesn't
+    treat them as modified.
+
+    Returns:
+        True if the file was written
+    """
+    path = Path(path)
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    path.write_text(content, encoding="utf-8")
+    return True